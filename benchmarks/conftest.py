@@ -0,0 +1,282 @@
+import datetime
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import time_machine
+
+from homeschool.courses.tests.factories import CourseFactory, CourseTaskFactory
+from homeschool.schools.tests.factories import (
+    GradeLevelFactory,
+    SchoolBreakFactory,
+    SchoolYearFactory,
+)
+from homeschool.students.tests.factories import CourseworkFactory, EnrollmentFactory
+from homeschool.users.tests.factories import UserFactory
+
+# Freeze the clock on a Wednesday so the generated data and the pages
+# see the same week on every run.
+TODAY = datetime.date(2024, 1, 10)
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "page benchmarks")
+    group.addoption(
+        "--benchmark-students",
+        type=int,
+        default=4,
+        help="The number of students in the synthetic school",
+    )
+    group.addoption(
+        "--benchmark-courses",
+        type=int,
+        default=6,
+        help="The number of courses for each student",
+    )
+    group.addoption(
+        "--benchmark-tasks",
+        type=int,
+        default=60,
+        help="The number of tasks in each course",
+    )
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=5,
+        help="The number of timed requests for each page (the fastest is kept)",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="The JSON file that stores the baseline measurements",
+    )
+    group.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="Write the measurements to the baseline instead of checking them",
+    )
+    # Wall time and memory depend on the machine and the Python version
+    # so they are only checked against the baseline when a tolerance is given.
+    group.addoption(
+        "--benchmark-time-tolerance",
+        type=float,
+        default=None,
+        help="Check the wall time with this allowed ratio to the baseline",
+    )
+    group.addoption(
+        "--benchmark-memory-tolerance",
+        type=float,
+        default=None,
+        help="Check the peak memory with this allowed ratio to the baseline",
+    )
+
+
+@dataclass
+class Measurement:
+    queries: int
+    seconds: float
+    peak_kib: int
+
+
+class BenchmarkRecorder:
+    """Collect the page measurements and compare them to a stored baseline.
+
+    The baseline is keyed by the size of the synthetic school
+    so that runs of different sizes don't overwrite each other.
+    Query counts are always checked since they are the same on every machine.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.path = config.getoption("benchmark_baseline")
+        self.update = config.getoption("benchmark_update")
+        self.time_tolerance = config.getoption("benchmark_time_tolerance")
+        self.memory_tolerance = config.getoption("benchmark_memory_tolerance")
+        self.size = "students={}-courses={}-tasks={}".format(
+            config.getoption("benchmark_students"),
+            config.getoption("benchmark_courses"),
+            config.getoption("benchmark_tasks"),
+        )
+        self.baseline = {}
+        if self.path.exists():
+            self.baseline = json.loads(self.path.read_text())
+        self.results: dict[str, Measurement] = {}
+
+    def record(self, page: str, measurement: Measurement) -> list[str]:
+        """Record a measurement and return any regressions from the baseline."""
+        self.results[page] = measurement
+        expected = self.baseline.get(self.size, {}).get(page)
+        if self.update or expected is None:
+            return []
+
+        regressions = []
+        if measurement.queries > expected["queries"]:
+            regressions.append(
+                f"{measurement.queries} queries (baseline {expected['queries']})"
+            )
+        if (
+            self.time_tolerance is not None
+            and measurement.seconds > expected["seconds"] * self.time_tolerance
+        ):
+            regressions.append(
+                f"{measurement.seconds:.4f}s (baseline {expected['seconds']:.4f}s)"
+            )
+        if (
+            self.memory_tolerance is not None
+            and measurement.peak_kib > expected["peak_kib"] * self.memory_tolerance
+        ):
+            regressions.append(
+                f"{measurement.peak_kib} KiB peak "
+                f"(baseline {expected['peak_kib']} KiB)"
+            )
+        return regressions
+
+    def write(self):
+        """Store the recorded measurements as the baseline for this size."""
+        sizes = self.baseline.setdefault(self.size, {})
+        sizes.update(
+            {page: asdict(measurement) for page, measurement in self.results.items()}
+        )
+        self.path.write_text(json.dumps(self.baseline, indent=2, sort_keys=True) + "\n")
+
+    def report(self, terminalreporter):
+        terminalreporter.section(f"page benchmarks ({self.size})")
+        expected = self.baseline.get(self.size, {})
+        for page, measurement in sorted(self.results.items()):
+            line = (
+                f"{page:<32} {measurement.queries:>5} queries "
+                f"{measurement.seconds * 1000:>9.1f} ms "
+                f"{measurement.peak_kib:>8} KiB"
+            )
+            if page in expected:
+                line += "  (baseline {} queries {:.1f} ms {} KiB)".format(
+                    expected[page]["queries"],
+                    expected[page]["seconds"] * 1000,
+                    expected[page]["peak_kib"],
+                )
+            else:
+                line += "  (no baseline)"
+            terminalreporter.write_line(line)
+        if self.update:
+            terminalreporter.write_line(f"Baseline written to {self.path}")
+
+
+@dataclass
+class CodecMeasurement:
+    ops_per_second: int
+    peak_bytes_per_op: int
+
+
+class CodecRecorder:
+    """Collect the hashid measurements of each configuration.
+
+    Operations per second depend too much on the machine to keep a baseline,
+    so each configuration is compared to the uncached codec from the same run.
+    """
+
+    reference = "uncached"
+
+    def __init__(self):
+        self.results: dict[str, dict[str, CodecMeasurement]] = {}
+
+    def record(self, benchmark: str, configuration: str, measurement):
+        self.results.setdefault(benchmark, {})[configuration] = measurement
+
+    def report(self, terminalreporter):
+        terminalreporter.section("hashid benchmarks")
+        for benchmark, measurements in self.results.items():
+            reference = measurements.get(self.reference)
+            for configuration, measurement in measurements.items():
+                line = (
+                    f"{benchmark:<36} {configuration:<9} "
+                    f"{measurement.ops_per_second:>11,} ops/s "
+                    f"{measurement.peak_bytes_per_op:>7,} B/op"
+                )
+                if reference and configuration != self.reference:
+                    speedup = measurement.ops_per_second / reference.ops_per_second
+                    line += f" {speedup:>6.2f}x"
+                terminalreporter.write_line(line)
+
+
+def pytest_configure(config):
+    config.benchmark_recorder = BenchmarkRecorder(config)
+    config.codec_recorder = CodecRecorder()
+
+
+def pytest_sessionfinish(session):
+    recorder = session.config.benchmark_recorder
+    if recorder.update and recorder.results:
+        recorder.write()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    for recorder in (config.benchmark_recorder, config.codec_recorder):
+        if recorder.results:
+            recorder.report(terminalreporter)
+
+
+@pytest.fixture
+def benchmark_recorder(request):
+    return request.config.benchmark_recorder
+
+
+@pytest.fixture
+def codec_recorder(request):
+    return request.config.codec_recorder
+
+
+@pytest.fixture(scope="session", autouse=True)
+def frozen_today():
+    with time_machine.travel(TODAY, tick=False):
+        yield TODAY
+
+
+@pytest.fixture(scope="module")
+def school(request, frozen_today, django_db_setup, django_db_blocker):
+    """Build a synthetic school that is shared by every page in the module.
+
+    Each student is in their own grade level with a set of courses.
+    A third of the tasks in each course are complete
+    and there is an upcoming break so the schedules have to skip days.
+    """
+    config = request.config
+    with django_db_blocker.unblock():
+        user = UserFactory()
+        school_year = SchoolYearFactory(
+            school=user.school,
+            start_date=frozen_today - datetime.timedelta(days=60),
+            end_date=frozen_today + datetime.timedelta(days=240),
+        )
+        SchoolBreakFactory(
+            school_year=school_year,
+            start_date=frozen_today + datetime.timedelta(days=14),
+            end_date=frozen_today + datetime.timedelta(days=18),
+        )
+
+        courses = []
+        for _ in range(config.getoption("benchmark_students")):
+            grade_level = GradeLevelFactory(school_year=school_year)
+            enrollment = EnrollmentFactory(
+                student__school=user.school, grade_level=grade_level
+            )
+            for _ in range(config.getoption("benchmark_courses")):
+                course = CourseFactory(grade_levels=[grade_level])
+                courses.append(course)
+                tasks = CourseTaskFactory.create_batch(
+                    config.getoption("benchmark_tasks"), course=course
+                )
+                completed_tasks = tasks[: len(tasks) // 3]
+                for days_ago, task in enumerate(reversed(completed_tasks), start=1):
+                    CourseworkFactory(
+                        student=enrollment.student,
+                        course_task=task,
+                        completed_date=frozen_today - datetime.timedelta(days=days_ago),
+                    )
+
+        yield SimpleNamespace(
+            user=user, school_year=school_year, course=courses[0], today=frozen_today
+        )
@@ -0,0 +1,206 @@
+"""Measure the hashid conversions that run for every id in a request.
+
+Each benchmark converts a batch of ids with the course task primary key
+and reports the ids converted per second and the peak memory for each id.
+The field and its descriptor are switched between a codec without caches,
+a codec with the default caches, and a lazy configuration
+to show what each one saves.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from unittest import mock
+
+import pytest
+from django.db import connection
+from hashid_field.codec import HashidCodec
+from hashid_field.hashid import Hashid
+
+from homeschool.courses.models import CourseTask
+
+from .conftest import CodecMeasurement
+
+# Production ids are large enough that their hashids are longer than the minimum.
+FIRST_ID = 100_000
+
+
+def make_codec(field, cache_size=None):
+    return HashidCodec(field.salt, field.min_length, field.alphabet, cache_size)
+
+
+CONFIGURATIONS = {
+    "uncached": lambda field: (make_codec(field, cache_size=0), False),
+    "cached": lambda field: (make_codec(field), False),
+    "lazy": lambda field: (make_codec(field), True),
+}
+
+
+@contextmanager
+def configured(configuration):
+    """Use a configuration for the course task primary key and its descriptor."""
+    field = CourseTask._meta.pk
+    descriptor = CourseTask.__dict__[field.attname]
+    codec, lazy = CONFIGURATIONS[configuration](field)
+    with (
+        mock.patch.object(field, "_codec", codec),
+        mock.patch.object(field, "_hashids", codec.hashids),
+        mock.patch.object(field, "lazy", lazy),
+        mock.patch.object(descriptor, "codec", codec),
+        mock.patch.object(descriptor, "hashids", codec.hashids),
+        mock.patch.object(descriptor, "lazy", lazy),
+    ):
+        yield field, descriptor
+
+
+def ids(count):
+    return range(FIRST_ID, FIRST_ID + count)
+
+
+def hashids(field, count):
+    return [str(field.get_hashid(id_)) for id_ in ids(count)]
+
+
+class Row:
+    """A stand in for a model instance that the descriptor sets the id on."""
+
+
+def construct_from_ids(field, descriptor):
+    return lambda: [field.get_hashid(id_) for id_ in ids(1000)]
+
+
+def construct_from_hashids(field, descriptor):
+    values = hashids(field, 1000)
+    return lambda: [field.get_hashid(value) for value in values]
+
+
+def encode_id(field, descriptor):
+    return lambda: [field.encode_id(id_) for id_ in ids(1000)]
+
+
+def get_prep_value(field, descriptor):
+    values = hashids(field, 1000)
+    return lambda: [field.get_prep_value(value) for value in values]
+
+
+def descriptor_set(field, descriptor):
+    def run():
+        rows = []
+        for id_ in ids(1000):
+            row = Row()
+            descriptor.__set__(row, id_)
+            rows.append(row.__dict__[field.attname])
+        return rows
+
+    return run
+
+
+def lookup(value_count):
+    """Build the SQL of enough `id__in` lookups to check at least 1000 ids."""
+
+    def setup(field, descriptor):
+        values = hashids(field, value_count)
+        lookups = max(1, 1000 // value_count)
+
+        def run():
+            return [
+                CourseTask.objects.filter(id__in=values).query.sql_with_params()
+                for _ in range(lookups)
+            ][-1]
+
+        return run
+
+    return setup
+
+
+def from_db_value(row_count):
+    def setup(field, descriptor):
+        return lambda: [
+            field.from_db_value(id_, None, connection) for id_ in ids(row_count)
+        ]
+
+    return setup
+
+
+def dict_keys(row_count):
+    """Use loaded ids as dict keys, which hashes them like their strings."""
+
+    def setup(field, descriptor):
+        return lambda: list(
+            {field.from_db_value(id_, None, connection): None for id_ in ids(row_count)}
+        )
+
+    return setup
+
+
+# Each benchmark sets up a function to time for a field and its descriptor.
+# The operations are the number of ids that one timed call converts.
+BENCHMARKS = {
+    "Hashid from int": (construct_from_ids, 1000),
+    "Hashid from str": (construct_from_hashids, 1000),
+    "encode_id": (encode_id, 1000),
+    "get_prep_value": (get_prep_value, 1000),
+    "descriptor __set__": (descriptor_set, 1000),
+    "lookup in (1 value)": (lookup(1), 1000),
+    "lookup in (100 values)": (lookup(100), 1000),
+    "lookup in (10,000 values)": (lookup(10_000), 10_000),
+    "from_db_value (20 rows)": (from_db_value(20), 20),
+    "from_db_value (500 rows)": (from_db_value(500), 500),
+    "from_db_value (5,000 rows)": (from_db_value(5000), 5000),
+    "dict keys (500 rows)": (dict_keys(500), 500),
+}
+
+
+def measure(run, operations, rounds):
+    """Measure the operations per second of the fastest round and the peak memory.
+
+    A warm up call runs first so the cached configurations
+    are measured the way a busy server sees them.
+    """
+    result = run()
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc slows down allocations so it is kept out of the timed calls.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    measurement = CodecMeasurement(
+        ops_per_second=round(operations / min(timings)),
+        peak_bytes_per_op=peak // operations,
+    )
+    return measurement, result
+
+
+def as_comparable(result):
+    """Make Hashid objects from different codecs compare by their values."""
+    if isinstance(result, list):
+        return [as_comparable(item) for item in result]
+    if isinstance(result, Hashid):
+        return (result.id, str(result))
+    return result
+
+
+@pytest.mark.parametrize("benchmark", BENCHMARKS)
+def test_hashid(benchmark, codec_recorder, request):
+    setup, operations = BENCHMARKS[benchmark]
+    rounds = request.config.getoption("benchmark_rounds")
+
+    results = {}
+    for configuration in CONFIGURATIONS:
+        with configured(configuration) as (field, descriptor):
+            run = setup(field, descriptor)
+            measurement, result = measure(run, operations, rounds)
+            results[configuration] = as_comparable(result)
+        codec_recorder.record(benchmark, configuration, measurement)
+
+    assert results["cached"] == results["uncached"]
+    assert results["lazy"] == results["uncached"]
@@ -0,0 +1,93 @@
+import datetime
+import time
+import tracemalloc
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from .conftest import Measurement
+
+
+def date_kwargs(day):
+    return {"year": day.year, "month": day.month, "day": day.day}
+
+
+PAGES = {
+    "core:dashboard": lambda school: reverse("core:dashboard"),
+    "core:daily": lambda school: reverse("core:daily"),
+    "core:weekly": lambda school: reverse(
+        "core:weekly",
+        kwargs=date_kwargs(school.today + datetime.timedelta(days=7)),
+    ),
+    "teachers:checklist": lambda school: reverse(
+        "teachers:checklist",
+        # The checklist expects the Sunday that starts the week.
+        kwargs=date_kwargs(school.today - datetime.timedelta(days=3)),
+    ),
+    "schools:school_year_forecast": lambda school: reverse(
+        "schools:school_year_forecast", kwargs={"pk": school.school_year.id}
+    ),
+    "courses:detail": lambda school: reverse(
+        "courses:detail", kwargs={"pk": school.course.id}
+    ),
+}
+
+
+class QueryCounter:
+    """Count the queries that run through a connection.
+
+    CaptureQueriesContext can't be used around a test client request
+    because the request_started signal resets the query log.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, url, rounds):
+    """Measure the query count, the fastest wall time, and the peak memory.
+
+    A warm up request runs first so the measurements
+    don't include one time costs like template loading.
+    """
+    response = client.get(url)
+    assert response.status_code == 200
+
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        client.get(url)
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        client.get(url)
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc slows down allocations so it is kept out of the timed requests.
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(
+        queries=queries.count, seconds=round(min(timings), 4), peak_kib=peak // 1024
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("page", PAGES)
+def test_page(page, school, client, benchmark_recorder, request):
+    client.force_login(school.user)
+    url = PAGES[page](school)
+
+    measurement = measure(client, url, request.config.getoption("benchmark_rounds"))
+
+    regressions = benchmark_recorder.record(page, measurement)
+    assert not regressions, f"{page} regressed: {', '.join(regressions)}"
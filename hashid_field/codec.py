@@ -0,0 +1,94 @@
+import threading
+from functools import lru_cache
+
+from hashids import Hashids
+
+from .conf import settings
+
+
+def valid_hashids_object(hashids, salt, min_length, alphabet):
+    # The hashids.Hashids class randomizes the alphabet and pulls out separators and guards, thus not being
+    # reversible. So all we can test is that the length of the alphabet, separators and guards are equal to the
+    # original alphabet we gave it. We could also check that all of the characters we gave it are present, but that
+    # seems excessive... this test will catch most errors.
+    return (
+        salt == hashids._salt
+        and min_length == hashids._min_length
+        and len(alphabet)
+        == len(hashids._alphabet + hashids._separators + hashids._guards)
+    )
+
+
+class HashidCodec:
+    """
+    Encodes and decodes ids for one salt, min_length and alphabet.
+
+    Every Hashid of a field shares the field's codec, so the Hashids object is built and validated once per codec
+    instead of once per value.
+
+    Hashids is a pure Python, shuffle heavy algorithm and the same ids are converted over and over (every row that is
+    loaded and every lookup), so the conversions are kept in bounded LRU caches. The cache hits and misses are
+    available from `cache_info()` to help size HASHID_FIELD_CACHE_SIZE.
+    """
+
+    def __init__(self, salt, min_length, alphabet, cache_size=None):
+        self.salt = salt
+        self.min_length = min_length
+        self.alphabet = alphabet
+        self.hashids = Hashids(salt=salt, min_length=min_length, alphabet=alphabet)
+        if not valid_hashids_object(self.hashids, salt, min_length, alphabet):
+            raise Exception("Invalid hashids.Hashids object")
+        if cache_size is None:
+            cache_size = settings.HASHID_FIELD_CACHE_SIZE
+        self._encode = lru_cache(maxsize=cache_size)(self.hashids.encode)
+        self._decode = lru_cache(maxsize=cache_size)(self._decode_one)
+
+    def encode(self, id):
+        return self._encode(id)
+
+    def decode(self, hashid):
+        """Returns the single id in the hashid, or None if it isn't a valid hashid."""
+        return self._decode(hashid)
+
+    def _decode_one(self, hashid):
+        ret = self.hashids.decode(hashid)
+        if len(ret) == 1:
+            return ret[0]
+        return None
+
+    def cache_info(self):
+        return {
+            "encode": self._encode.cache_info(),
+            "decode": self._decode.cache_info(),
+        }
+
+    def cache_clear(self):
+        self._encode.cache_clear()
+        self._decode.cache_clear()
+
+
+_codecs = {}
+_codecs_lock = threading.Lock()
+
+
+def get_codec(salt, min_length, alphabet):
+    """Returns the shared codec for a salt, min_length and alphabet so fields with the same settings share a cache."""
+    key = (salt, min_length, alphabet)
+    codec = _codecs.get(key)
+    if codec is None:
+        with _codecs_lock:
+            # Another thread may have made the codec while this one waited for the lock.
+            codec = _codecs.get(key)
+            if codec is None:
+                codec = _codecs[key] = HashidCodec(salt, min_length, alphabet)
+    return codec
+
+
+def cache_info():
+    """Returns the total encode and decode cache hits and misses across every codec."""
+    totals = {"encode": {"hits": 0, "misses": 0}, "decode": {"hits": 0, "misses": 0}}
+    for codec in list(_codecs.values()):
+        for name, info in codec.cache_info().items():
+            totals[name]["hits"] += info.hits
+            totals[name]["misses"] += info.misses
+    return totals
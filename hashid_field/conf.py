@@ -22,3 +22,10 @@ settings.HASHID_FIELD_ENABLE_HASHID_OBJECT = getattr(
 settings.HASHID_FIELD_ENABLE_DESCRIPTOR = getattr(
     settings, "HASHID_FIELD_ENABLE_DESCRIPTOR", True
 )
+# Lazy Hashid objects only encode their hashid when it is needed as a string. A Hashid equals its string, so it hashes
+# like it and is also encoded when it is used as a dict key or in a set.
+settings.HASHID_FIELD_LAZY = getattr(settings, "HASHID_FIELD_LAZY", False)
+# The number of encoded and decoded ids that each codec keeps in its LRU caches. A cache that is smaller than the ids
+# used together (like a large `__in` lookup or a page of rows) evicts every id before it is used again. Each cached id
+# takes about 150 bytes, so a full codec uses about 5 MiB at the default size.
+settings.HASHID_FIELD_CACHE_SIZE = getattr(settings, "HASHID_FIELD_CACHE_SIZE", 16384)
@@ -1,5 +1,4 @@
-from hashids import Hashids
-
+from .codec import get_codec
 from .hashid import Hashid
 
 
@@ -13,16 +12,18 @@ class HashidDescriptor:
         prefix="",
         hashids=None,
         enable_hashid_object=True,
+        codec=None,
+        lazy=False,
     ):
         self.field_name = field_name
         self.salt = salt
         self.min_length = min_length
         self.alphabet = alphabet
         self.prefix = prefix
-        self.hashids = hashids or Hashids(
-            salt=self.salt, min_length=self.min_length, alphabet=self.alphabet
-        )
+        self.codec = codec or get_codec(self.salt, self.min_length, self.alphabet)
+        self.hashids = hashids or self.codec.hashids
         self.enable_hashid_object = enable_hashid_object
+        self.lazy = lazy
 
     def __get__(self, instance, owner=None):
         if instance is not None and self.field_name in instance.__dict__:
@@ -59,6 +60,8 @@ class HashidDescriptor:
                     alphabet=self.alphabet,
                     prefix=self.prefix,
                     hashids=self.hashids,
+                    codec=self.codec,
+                    lazy=self.lazy,
                 )
                 if enable_hashid_object:
                     instance.__dict__[name] = h
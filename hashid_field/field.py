@@ -1,3 +1,5 @@
+import contextlib
+
 from django import forms
 from django.contrib.admin import widgets as admin_widgets
 from django.core import checks, exceptions
@@ -6,18 +8,20 @@ from django.db import models
 from django.db.models import Field
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
-from hashids import Hashids
 
+from .codec import get_codec
 from .conf import settings
 from .descriptor import HashidDescriptor
 from .hashid import Hashid
 from .lookups import (
+    DecodedIds,
     HashidExactLookup,
     HashidGreaterThan,
     HashidGreaterThanOrEqual,
     HashidIterableLookup,
     HashidLessThan,
     HashidLessThanOrEqual,
+    get_id_for_hashid_field,
 )
 from .validators import HashidMaxValueValidator, HashidMinValueValidator
 
@@ -52,6 +56,7 @@ class HashidFieldMixin:
         enable_hashid_object=settings.HASHID_FIELD_ENABLE_HASHID_OBJECT,
         enable_descriptor=settings.HASHID_FIELD_ENABLE_DESCRIPTOR,
         prefix="",
+        lazy=settings.HASHID_FIELD_LAZY,
         *args,
         **kwargs,
     ):
@@ -62,13 +67,13 @@ class HashidFieldMixin:
             raise exceptions.ImproperlyConfigured(
                 "'alphabet' must contain a minimum of 16 unique characters"
             )
-        self._hashids = Hashids(
-            salt=self.salt, min_length=self.min_length, alphabet=self.alphabet
-        )
+        self._codec = get_codec(self.salt, self.min_length, self.alphabet)
+        self._hashids = self._codec.hashids
         self.allow_int_lookup = allow_int_lookup
         self.enable_hashid_object = enable_hashid_object
         self.enable_descriptor = enable_descriptor
         self.prefix = prefix
+        self.lazy = lazy
         super().__init__(*args, **kwargs)
 
     def deconstruct(self):
@@ -149,8 +154,43 @@ class HashidFieldMixin:
             alphabet=self.alphabet,
             prefix=self.prefix,
             hashids=self._hashids,
+            codec=self._codec,
+            lazy=self.lazy,
         )
 
+    def decode_many(self, values, ignore_invalid=False):
+        """
+        Returns the ids of many hashid strings or Hashid objects, in the order they were given and without duplicates.
+
+        Each distinct value is decoded once through the codec's cache without building a Hashid. Integers are only
+        accepted when int lookups are allowed. A ValueError is raised for the first invalid value, or invalid values
+        are skipped if ignore_invalid is set. The returned ids can be used in `__in` lookups of the field.
+        """
+        # Unhashable values can't be deduplicated up front.
+        with contextlib.suppress(TypeError):
+            values = dict.fromkeys(values)
+        ids = {}
+        for value in values:
+            try:
+                id_ = self._decode_for_lookup(value)
+            except ValueError:
+                if ignore_invalid:
+                    continue
+                raise
+            ids[id_] = None
+        return DecodedIds(ids)
+
+    def _decode_for_lookup(self, value):
+        if isinstance(value, str) and value.startswith(self.prefix):
+            id_ = self._codec.decode(value[len(self.prefix) :])
+            if id_ is not None:
+                return id_
+        return get_id_for_hashid_field(self, value)
+
+    def cache_info(self):
+        """Returns the encode and decode cache hits and misses of the field's codec."""
+        return self._codec.cache_info()
+
     def from_db_value(self, value, expression, connection):
         if value is None:
             return value
@@ -206,6 +246,8 @@ class HashidFieldMixin:
                 prefix=self.prefix,
                 hashids=self._hashids,
                 enable_hashid_object=self.enable_hashid_object,
+                codec=self._codec,
+                lazy=self.lazy,
             )
             setattr(cls, self.attname, descriptor)
 
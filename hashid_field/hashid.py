@@ -2,6 +2,8 @@ from functools import total_ordering
 
 from hashids import Hashids
 
+from .codec import get_codec, valid_hashids_object
+
 
 def _is_uint(candidate):
     """Returns whether a value is an unsigned integer."""
@@ -15,6 +17,10 @@ def _is_str(candidate):
 
 @total_ordering
 class Hashid:
+    # There can be tens of thousands of Hashids in memory, so each one only keeps its own values. The salt,
+    # min_length, alphabet and Hashids object are shared by every Hashid of a field through the codec.
+    __slots__ = ("_id", "_hashid", "_prefix", "_codec", "_lazy")
+
     def __init__(
         self,
         value,
@@ -23,18 +29,22 @@ class Hashid:
         alphabet=Hashids.ALPHABET,
         prefix="",
         hashids=None,
+        codec=None,
+        lazy=False,
     ):
-        self._salt = salt
-        self._min_length = min_length
-        self._alphabet = alphabet
         self._prefix = str(prefix)
-
-        # If hashids is provided, it's for optimization only, and should be initialized with the same salt, min_length
-        # and alphabet, or else we will run into problems
-        self._hashids = hashids or Hashids(
-            salt=self._salt, min_length=self._min_length, alphabet=self._alphabet
-        )
-        if not self._valid_hashids_object():
+        # A lazy Hashid defers encoding an integer id until the hashid string is used or it is hashed.
+        self._lazy = lazy
+
+        # If codec is provided, it's for optimization only, and should be initialized with the same salt, min_length
+        # and alphabet, or else we will run into problems. The codec validates its Hashids object once when it's
+        # created, so only a different Hashids object needs to be checked here.
+        self._codec = codec or get_codec(salt, min_length, alphabet)
+        if (
+            hashids is not None
+            and hashids is not self._codec.hashids
+            and not valid_hashids_object(hashids, salt, min_length, alphabet)
+        ):
             raise Exception("Invalid hashids.Hashids object")
 
         if value is None:
@@ -44,7 +54,7 @@ class Hashid:
         # This presumes hashids will only ever be strings, even if they are made up entirely of numbers
         if _is_uint(value):
             self._id = value
-            self._hashid = self.encode(value)
+            self._hashid = None if lazy else self.encode(value)
         elif _is_str(value):
             # Verify that it begins with the prefix, which could be the default ""
             if value.startswith(self._prefix):
@@ -94,6 +104,8 @@ class Hashid:
 
     @property
     def hashid(self):
+        if self._hashid is None:
+            self._hashid = self.encode(self._id)
         return self._hashid
 
     @property
@@ -102,39 +114,19 @@ class Hashid:
 
     @property
     def hashids(self):
-        return self._hashids
+        return self._codec.hashids
 
     def encode(self, id):
-        return self._hashids.encode(id)
+        return self._codec.encode(id)
 
     def decode(self, hashid):
-        ret = self._hashids.decode(hashid)
-        if len(ret) == 1:
-            return ret[0]
-        else:
-            return None
-
-    def _valid_hashids_object(self):
-        # The hashids.Hashids class randomizes the alphabet and pulls out separators and guards, thus not being
-        # reversible. So all we can test is that the length of the alphabet, separators and guards are equal to the
-        # original alphabet we gave it. We could also check that all of the characters we gave it are present, but that
-        # seems excessive... this test will catch most errors.
-        return (
-            self._salt == self._hashids._salt
-            and self._min_length == self._hashids._min_length
-            and len(self._alphabet)
-            == len(
-                self._hashids._alphabet
-                + self._hashids._separators
-                + self._hashids._guards
-            )
-        )
+        return self._codec.decode(hashid)
 
     def __repr__(self):
         return f"Hashid({self._id}): {str(self)}"
 
     def __str__(self):
-        return self._prefix + self._hashid
+        return self._prefix + self.hashid
 
     def __int__(self):
         return self._id
@@ -144,11 +136,10 @@ class Hashid:
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return (
-                self._id == other._id
-                and self._hashid == other._hashid
-                and self._prefix == other._prefix
-            )
+            if self._id != other._id or self._prefix != other._prefix:
+                return False
+            # Hashids from the same codec have the same hashid for the same id, so there is no need to encode.
+            return self._codec is other._codec or self.hashid == other.hashid
         if isinstance(other, str):
             return str(self) == other
         if isinstance(other, int):
@@ -166,27 +157,29 @@ class Hashid:
         return len(str(self))
 
     def __hash__(self):
+        # A Hashid equals its string, so it must hash like it in both modes. A lazy Hashid encodes the first time that
+        # it's hashed.
         return hash(str(self))
 
     def __getstate__(self):
         return (
             self._id,
-            self._salt,
-            self._min_length,
-            self._alphabet,
+            self._codec.salt,
+            self._codec.min_length,
+            self._codec.alphabet,
             self._prefix,
             self._hashid,
+            self._lazy,
         )
 
     def __setstate__(self, state):
-        (
-            self._id,
-            self._salt,
-            self._min_length,
-            self._alphabet,
-            self._prefix,
-            self._hashid,
-        ) = state
+        # Hashids pickled before lazy mode existed don't have the lazy flag.
+        if len(state) == 6:
+            state = (*state, False)
+        self._id, salt, min_length, alphabet, self._prefix, self._hashid, self._lazy = (
+            state
+        )
+        self._codec = get_codec(salt, min_length, alphabet)
 
     def __add__(self, other):
         return self._id + other
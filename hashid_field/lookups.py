@@ -24,6 +24,15 @@ def _is_int_representation(number):
         return True
 
 
+class DecodedIds(list):
+    """
+    The ids that a field decoded from hashids with decode_many.
+
+    Iterable lookups use them as they are, even when int lookups aren't allowed, since the ids were decoded by the
+    application instead of given as integers by a user.
+    """
+
+
 def get_id_for_hashid_field(field, value):
     if isinstance(value, Hashid):
         return value.id
@@ -56,22 +65,16 @@ class HashidFieldGetDbPrepValueMixin:
     def get_db_prep_lookup(self, value, connection):
         # There are two modes this method can be called in... a single value or an iterable of values (usually a set)
         # For a single value, just try to process it, then return the value, or else throw EmptyResultSet
-        # For multiple values, process each one in turn. If any of them are invalid, throw it away. If all are invalid,
+        # For multiple values, decode them all at once. If any of them are invalid, throw it away. If all are invalid,
         # throw EmptyResultSet
         # For relational fields, use the 'field' attribute of the output_field
         field = getattr(self.lhs.output_field, "field", self.lhs.output_field)
         if self.get_db_prep_lookup_value_is_iterable:
-            lookup_ids = []
-            for val in value:
-                try:
-                    lookup_id = get_id_for_hashid_field(field, val)
-                except ValueError:
-                    if settings.HASHID_FIELD_LOOKUP_EXCEPTION:
-                        raise
-                    # Ignore this value
-                    pass
-                else:
-                    lookup_ids.append(lookup_id)
+            if isinstance(value, DecodedIds):
+                return "%s", value
+            lookup_ids = field.decode_many(
+                value, ignore_invalid=not settings.HASHID_FIELD_LOOKUP_EXCEPTION
+            )
             if len(lookup_ids) == 0:
                 raise EmptyResultSet
             return "%s", lookup_ids
@@ -115,7 +118,7 @@ class HashidIterableLookup(HashidExactLookup):
                 self.rhs.clear_select_clause()
                 self.rhs.add_fields(["pk"])
 
-        if hasattr(self.rhs, "resolve_expression"):
+        if hasattr(self.rhs, "resolve_expression") or isinstance(self.rhs, DecodedIds):
             return self.rhs
         prepared_values = []
         if hasattr(self.rhs, "_prepare"):
@@ -139,10 +142,14 @@ class HashidIterableLookup(HashidExactLookup):
             )
 
         if self.rhs_is_direct_value():
-            try:
-                rhs = OrderedSet(self.rhs)
-            except TypeError:  # Unhashable items in self.rhs
+            if isinstance(self.rhs, DecodedIds):
+                # The decoded ids are already unique, and the type marks them as safe to look up.
                 rhs = self.rhs
+            else:
+                try:
+                    rhs = OrderedSet(self.rhs)
+                except TypeError:  # Unhashable items in self.rhs
+                    rhs = self.rhs
 
             if not rhs:
                 raise EmptyResultSet
@@ -0,0 +1,40 @@
+"""Version tokens for caches that are invalidated by replacing a token.
+
+The key of a cached value includes the version tokens of its inputs.
+When an input changes, its token is replaced
+so stale values are never read again and age out of the cache.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from django.core.cache import cache
+
+
+class VersionTokens:
+    """The version tokens of one cache, like the forecasts or the reports."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def key(self, kind: str, id) -> str:
+        """Get the cache key of the version token for an object."""
+        return f"{self.prefix}-version:{kind}:{id}"
+
+    def get_many(self, version_keys: set[str]) -> dict[str, str]:
+        """Get the version tokens and create any that are missing."""
+        versions = cache.get_many(version_keys)
+        missing_keys = version_keys - versions.keys()
+        if missing_keys:
+            new_versions = {key: uuid.uuid4().hex for key in missing_keys}
+            for key, version in new_versions.items():
+                cache.add(key, version, timeout=None)
+            # Another process may have won the race to add a version.
+            versions.update(new_versions)
+            versions.update(cache.get_many(missing_keys))
+        return versions
+
+    def invalidate(self, kind: str, id) -> None:
+        """Replace the version token for an object."""
+        cache.set(self.key(kind, id), uuid.uuid4().hex, None)
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from homeschool.core.cache_versions import VersionTokens
+from homeschool.test import TestCase
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "cache-versions-tests",
+        }
+    }
+)
+class TestVersionTokens(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_key(self):
+        """The keys of each cache are separate."""
+        assert VersionTokens("forecast").key("student", 1) != VersionTokens(
+            "report"
+        ).key("student", 1)
+
+    def test_get_many(self):
+        """Missing tokens are created and kept."""
+        versions = VersionTokens("test")
+        keys = {versions.key("student", 1), versions.key("course", 2)}
+
+        tokens = versions.get_many(keys)
+
+        assert tokens.keys() == keys
+        assert versions.get_many(keys) == tokens
+
+    def test_get_many_race(self):
+        """A token that another process added first wins."""
+        versions = VersionTokens("test")
+        key = versions.key("student", 1)
+
+        with mock.patch.object(cache, "add") as mock_add:
+            mock_add.side_effect = lambda key, *args, **kwargs: cache.set(key, "won")
+            tokens = versions.get_many({key})
+
+        assert tokens == {key: "won"}
+
+    def test_invalidate(self):
+        """An invalidated object gets a new token."""
+        versions = VersionTokens("test")
+        key = versions.key("course", 2)
+        token = versions.get_many({key})[key]
+
+        versions.invalidate("course", 2)
+
+        assert versions.get_many({key})[key] != token
@@ -0,0 +1,146 @@
+import pickle
+from unittest import mock
+
+from hashid_field import Hashid
+from hashid_field import codec as codec_module
+from hashid_field.codec import HashidCodec, get_codec
+
+from homeschool.courses.models import CourseTask
+from homeschool.courses.tests.factories import CourseTaskFactory
+from homeschool.test import TestCase
+
+
+class TestHashid(TestCase):
+    def make_hashid(self, id_, *, lazy):
+        field = CourseTask._meta.pk
+        return Hashid(id_, salt=field.salt, min_length=field.min_length, lazy=lazy)
+
+    def test_lazy_encodes_for_string(self):
+        """A lazy Hashid only encodes when it is used as a string or hashed."""
+        field = CourseTask._meta.pk
+        codec = HashidCodec(field.salt, field.min_length, field.alphabet)
+        lazy_hashid = Hashid(42, codec=codec, lazy=True)
+
+        assert lazy_hashid == Hashid(42, codec=codec, lazy=True)
+        assert lazy_hashid == 42
+        assert lazy_hashid < 43
+        assert codec.cache_info()["encode"].misses == 0
+
+        assert str(lazy_hashid) == str(self.make_hashid(42, lazy=False))
+        hash(Hashid(42, codec=codec, lazy=True))
+        assert codec.cache_info()["encode"].misses == 1
+
+    def test_lazy_pickle(self):
+        """A pickled lazy Hashid stays lazy."""
+        pickled_hashid = pickle.dumps(self.make_hashid(42, lazy=True))
+        lazy_hashid = pickle.loads(pickled_hashid)  # noqa: S301
+
+        assert lazy_hashid._lazy
+        assert lazy_hashid == self.make_hashid(42, lazy=False)
+
+    def test_lazy_in_dict_by_string(self):
+        """A lazy Hashid finds the value keyed by its string and the reverse."""
+        lazy_hashid = self.make_hashid(42, lazy=True)
+
+        assert {lazy_hashid: 1}[str(lazy_hashid)] == 1
+        assert {str(lazy_hashid): 1}[self.make_hashid(42, lazy=True)] == 1
+
+    def test_lazy_and_eager_in_set(self):
+        """Lazy and eager Hashids of the same id are one set member."""
+        lazy_hashid = self.make_hashid(42, lazy=True)
+        eager_hashid = self.make_hashid(42, lazy=False)
+
+        assert lazy_hashid == eager_hashid
+        assert hash(lazy_hashid) == hash(eager_hashid)
+        assert len({lazy_hashid, eager_hashid}) == 1
+        assert eager_hashid in {self.make_hashid(42, lazy=True)}
+
+
+class TestHashidCodec(TestCase):
+    def make_codec(self):
+        field = CourseTask._meta.pk
+        return HashidCodec(field.salt, field.min_length, field.alphabet)
+
+    def test_cache_reuse(self):
+        """Repeated conversions of an id come from the caches."""
+        codec = self.make_codec()
+
+        hashid = codec.encode(42)
+        assert codec.encode(42) == hashid
+        assert codec.decode(hashid) == 42
+        assert codec.decode(hashid) == 42
+
+        info = codec.cache_info()
+        assert (info["encode"].hits, info["encode"].misses) == (1, 1)
+        assert (info["decode"].hits, info["decode"].misses) == (1, 1)
+
+    def test_cache_clear(self):
+        """Clearing the caches converts the ids again."""
+        codec = self.make_codec()
+        codec.decode(codec.encode(42))
+
+        codec.cache_clear()
+
+        info = codec.cache_info()
+        assert info["encode"].currsize == info["decode"].currsize == 0
+
+    def test_shared_codec(self):
+        """Fields and their Hashids with the same settings share a codec."""
+        field = CourseTask._meta.pk
+        codec = get_codec(field.salt, field.min_length, field.alphabet)
+
+        assert field._codec is codec
+        assert CourseTask.__dict__[field.attname].codec is codec
+        assert CourseTaskFactory().id._codec is codec
+        assert get_codec("other salt", field.min_length, field.alphabet) is not codec
+
+    def test_codec_made_while_waiting(self):
+        """A codec made by another thread while waiting for the lock is used."""
+        field = CourseTask._meta.pk
+        codec = get_codec(field.salt, field.min_length, field.alphabet)
+
+        with (
+            mock.patch.object(codec_module, "_codecs") as mock_codecs,
+            mock.patch.object(codec_module, "HashidCodec") as mock_codec,
+        ):
+            mock_codecs.get.side_effect = [None, codec]
+            raced_codec = get_codec(field.salt, field.min_length, field.alphabet)
+
+        assert raced_codec is codec
+        mock_codec.assert_not_called()
+
+    def test_cache_info_totals(self):
+        """The module cache info adds up the hits and misses of every codec."""
+        field = CourseTask._meta.pk
+        with mock.patch.dict(codec_module._codecs, clear=True):
+            codec = get_codec(field.salt, field.min_length, field.alphabet)
+            other_codec = get_codec("other salt", field.min_length, field.alphabet)
+            codec.encode(42)
+            codec.encode(42)
+            codec.decode(other_codec.encode(42))
+
+            totals = codec_module.cache_info()
+
+        assert totals == {
+            "encode": {"hits": 1, "misses": 2},
+            "decode": {"hits": 0, "misses": 1},
+        }
+
+
+class TestDecodeMany(TestCase):
+    def test_lookup_decoded_ids(self):
+        """The decoded ids of a field work in its `__in` lookups."""
+        task, other_task = CourseTaskFactory.create_batch(2)
+        field = CourseTask._meta.pk
+
+        task_ids = field.decode_many([str(task.id), str(task.id)])
+
+        assert task_ids == [task.id.id]
+        assert list(CourseTask.objects.filter(id__in=task_ids)) == [task]
+        assert not CourseTask.objects.filter(id__in=field.decode_many([]))
+
+    def test_plain_ints_ignored(self):
+        """Integers from a user still don't work in lookups."""
+        task = CourseTaskFactory()
+
+        assert not CourseTask.objects.filter(id__in=[task.id.id]).exists()
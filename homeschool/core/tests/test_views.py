@@ -978,6 +978,77 @@ class TestDaily(TestCase):
             student=student, course_task=task, completed_date=today
         ).exists()
 
+    @mock.patch("homeschool.core.views.report_cache")
+    def test_complete_daily_invalidates_reports(self, mock_report_cache):
+        """Completed tasks replace the student's cached reports."""
+        user = self.make_user()
+        student = StudentFactory(school=user.school)
+        grade_level = GradeLevelFactory(school_year__school=user.school)
+        task = CourseTaskFactory(course__grade_levels=[grade_level])
+        data = {f"task-{student.id}-{task.id}": "on"}
+
+        with self.login(user):
+            self.post("core:daily", data=data)
+
+        mock_report_cache.invalidate_student.assert_called_once_with(student.id)
+
+    def test_complete_daily_updates_progress(self):
+        """A completed task is no longer one of the student's incomplete tasks."""
+        user = self.make_user()
+        grade_level = GradeLevelFactory(school_year__school=user.school)
+        enrollment = EnrollmentFactory(
+            student__school=user.school, grade_level=grade_level
+        )
+        student = enrollment.student
+        course = CourseFactory(grade_levels=[grade_level])
+        task, next_task = CourseTaskFactory.create_batch(2, course=course)
+        data = {f"task-{student.id}-{task.id}": "on"}
+
+        with self.login(user):
+            self.post("core:daily", data=data)
+
+        tasks_by_course = student.get_tasks_in_windows({course: (0, 2)})
+        assert tasks_by_course[course.id] == [next_task]
+
+    def test_complete_daily_already_complete(self):
+        """Tasks that are already complete keep their original coursework."""
+        today = timezone.now().date()
+        user = self.make_user()
+        student = StudentFactory(school=user.school)
+        grade_level = GradeLevelFactory(school_year__school=user.school)
+        task = CourseTaskFactory(course__grade_levels=[grade_level])
+        other_task = CourseTaskFactory(course=task.course)
+        yesterday = today - datetime.timedelta(days=1)
+        CourseworkFactory(student=student, course_task=task, completed_date=yesterday)
+        data = {
+            "completed_date": f"{today:%Y-%m-%d}",
+            f"task-{student.id}-{task.id}": "on",
+            f"task-{student.id}-{other_task.id}": "on",
+        }
+
+        with self.login(user):
+            self.post("core:daily", data=data)
+
+        assert (
+            Coursework.objects.get(student=student, course_task=task).completed_date
+            == yesterday
+        )
+        assert Coursework.objects.filter(
+            student=student, course_task=other_task, completed_date=today
+        ).exists()
+
+    def test_complete_daily_invalid_task(self):
+        """A task ID that isn't a valid hashid is ignored."""
+        user = self.make_user()
+        student = StudentFactory(school=user.school)
+        data = {f"task-{student.id}-nope": "on"}
+
+        with self.login(user):
+            response = self.post("core:daily", data=data)
+
+        self.response_302(response)
+        assert not Coursework.objects.filter(student=student).exists()
+
     def test_incomplete_daily(self):
         today = timezone.now().date()
         user = self.make_user()
@@ -21,8 +21,17 @@ from homeschool.core.forms import StartSetupForm
 from homeschool.core.schedules import Week
 from homeschool.courses.models import Course, CourseTask, GradedWork
 from homeschool.notifications.models import Notification
+from homeschool.reports import report_cache
+from homeschool.schools import forecast_cache
 from homeschool.schools.models import GradeLevel, SchoolYear
-from homeschool.students.models import Coursework, Enrollment, Grade, Student
+from homeschool.students.models import (
+    Coursework,
+    Enrollment,
+    Grade,
+    Student,
+    StudentCourseProgress,
+)
+from homeschool.students.schedules import DailyScheduleBuilder
 
 
 @allow
@@ -294,21 +303,24 @@ class DailyView(TemplateView):
             context["tomorrow"] = day + datetime.timedelta(days=1)
             context["overmorrow"] = day + datetime.timedelta(days=2)
 
-        is_break_day = self.is_break_for_everyone(day, school_year)
+        students = Student.get_students_for(school_year) if school_year else []
+        is_break_day = self.is_break_for_everyone(day, school_year, students)
         context["is_break_day"] = is_break_day
-        context["schedules"] = self.get_schedules(school_year, today, day, is_break_day)
+        context["schedules"] = self.get_schedules(
+            school_year, today, day, is_break_day, students
+        )
         return context
 
     def is_break_for_everyone(
-        self, day: datetime.date, school_year: SchoolYear | None
+        self,
+        day: datetime.date,
+        school_year: SchoolYear | None,
+        students: list[Student],
     ) -> bool:
         """Check if this is a break day for all students."""
         if school_year is None:
             return False
-        return all(
-            school_year.is_break(day, student=student)
-            for student in Student.get_students_for(school_year)
-        )
+        return all(school_year.is_break(day, student=student) for student in students)
 
     def get_schedules(
         self,
@@ -316,63 +328,13 @@ class DailyView(TemplateView):
         today: datetime.date,
         day: datetime.date,
         is_break_for_everyone,
+        students: list[Student],
     ):
         """Get the schedules for each student."""
-        schedules: list = []
         if not school_year or not school_year.runs_on(day) or is_break_for_everyone:
-            return schedules
-
-        for student in Student.get_students_for(school_year):
-            schedule = self.get_student_schedule(student, today, day, school_year)
-            schedules.append(schedule)
-
-        return schedules
-
-    def get_student_schedule(
-        self, student, today: datetime.date, day: datetime.date, school_year
-    ):
-        """Get the daily schedule for the student."""
-        is_break = school_year.is_break(day, student=student)
-        schedule = {"student": student, "courses": [], "is_break": is_break}
-        if is_break:
-            return schedule
-
-        courses = student.get_active_courses(school_year)
-        day_coursework = student.get_day_coursework(day)
-        completed_task_ids = list(
-            Coursework.objects.filter(
-                student=student, course_task__course__in=courses
-            ).values_list("course_task_id", flat=True)
-        )
+            return []
 
-        for course in courses:
-            course_schedule = {"course": course}
-            if course.id in day_coursework:
-                course_schedule["coursework"] = day_coursework[course.id]
-            elif course.runs_on(day):
-                task_index = max(
-                    student.get_incomplete_task_count_in_range(
-                        course, today, day, school_year
-                    )
-                    - 1,
-                    0,
-                )
-                # Doing this query in a loop is definitely an N+1 bug.
-                # If it's possible to do a single query of all tasks
-                # that groups by course then that would be better.
-                # No need to over-optimize until that's a real issue.
-                # I brought this up on the forum. It doesn't look like it's easy to fix.
-                # https://forum.djangoproject.com/t/grouping-by-foreignkey-with-a-limit-per-group/979
-                try:
-                    course_schedule["task"] = (
-                        student.get_tasks_for(course)
-                        .exclude(id__in=completed_task_ids)
-                        .select_related("graded_work", "resource")[task_index]
-                    )
-                except IndexError:
-                    course_schedule["no_scheduled_task"] = True
-            schedule["courses"].append(course_schedule)
-        return schedule
+        return DailyScheduleBuilder(school_year, today, day).build(students)
 
     def post(self, request, *args, **kwargs):
         """Process students' work."""
@@ -383,8 +345,14 @@ class DailyView(TemplateView):
         tasks_by_student = self.get_task_completions_by_student(request.POST)
         work_to_grade = False
         if tasks_by_student:
+            students = {
+                str(student.id): student
+                for student in request.user.school.students.filter(
+                    id__in=tasks_by_student.keys()
+                )
+            }
             for student_id, tasks in tasks_by_student.items():
-                student = request.user.school.students.filter(id=student_id).first()
+                student = students.get(student_id)
                 if student:
                     has_work_to_grade = self.mark_completion(
                         student, tasks, completed_date
@@ -413,6 +381,13 @@ class DailyView(TemplateView):
 
             category = "complete" if value == "on" else "incomplete"
             tasks[student_id][category].append(task_id)
+
+        task_id_field = CourseTask._meta.pk
+        for student_tasks in tasks.values():
+            for category, task_ids in student_tasks.items():
+                student_tasks[category] = task_id_field.decode_many(
+                    task_ids, ignore_invalid=True
+                )
         return tasks
 
     def get_grade_url(self):
@@ -431,11 +406,12 @@ class DailyView(TemplateView):
     def process_complete_tasks(self, student, complete_task_ids, completed_date):
         """Add coursework for any tasks that do not have it."""
         has_work_to_grade = False
-        existing_complete_task_ids = set(
-            Coursework.objects.filter(
+        existing_complete_task_ids = {
+            int(task_id)
+            for task_id in Coursework.objects.filter(
                 student=student, course_task__in=complete_task_ids
             ).values_list("course_task_id", flat=True)
-        )
+        }
         newly_complete_task_ids = set(complete_task_ids) - existing_complete_task_ids
         if newly_complete_task_ids:
             new_coursework = []
@@ -448,6 +424,17 @@ class DailyView(TemplateView):
                     )
                 )
             Coursework.objects.bulk_create(new_coursework)
+            # bulk_create skips the post_save signals that update the progress
+            # and clear stale forecasts and reports.
+            course_ids = set(
+                Coursework.objects.filter(
+                    student=student, course_task__in=newly_complete_task_ids
+                ).values_list("course_task__course_id", flat=True)
+            )
+            for course_id in course_ids:
+                StudentCourseProgress.refresh(student.id, course_id)
+            forecast_cache.invalidate_student(student.id)
+            report_cache.invalidate_student(student.id)
 
             pluralized = pluralize(len(newly_complete_task_ids))
             message = (
@@ -73,23 +73,31 @@ class CourseTaskBulkDeleteForm(forms.Form):
         if not task_ids:
             raise forms.ValidationError("You need to select at least one task.")
 
+        try:
+            decoded_task_ids = CourseTask._meta.pk.decode_many(task_ids)
+        except ValueError:
+            raise forms.ValidationError(
+                "Sorry, you do not have permission to delete the selected tasks."
+            ) from None
+
         grade_levels = GradeLevel.objects.filter(
             school_year__school__admin=self.user
         ).values_list("id", flat=True)
         users_deletable_tasks = CourseTask.objects.filter(
-            course__grade_levels__in=grade_levels, id__in=task_ids
+            course__grade_levels__in=grade_levels, id__in=decoded_task_ids
         ).distinct()
-        if len(task_ids) != users_deletable_tasks.count():
+        if len(decoded_task_ids) != users_deletable_tasks.count():
             raise forms.ValidationError(
                 "Sorry, you do not have permission to delete the selected tasks."
             )
 
+        self.cleaned_data["task_ids"] = decoded_task_ids
         return self.cleaned_data
 
     def save(self):
         """Delete the selected tasks."""
-        task_ids = [id_ for key, id_ in self.data.items() if key.startswith("task-")]
-        _, deleted_info = CourseTask.objects.filter(id__in=task_ids).delete()
+        tasks = CourseTask.objects.filter(id__in=self.cleaned_data["task_ids"])
+        _, deleted_info = tasks.delete()
         return deleted_info["courses.CourseTask"]
 
 
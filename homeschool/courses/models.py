@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Exists, OuterRef
 from django.utils.functional import cached_property
 from hashid_field import HashidAutoField
-from ordered_model.models import OrderedModel, OrderedModelManager
+from ordered_model.models import (
+    OrderedModel,
+    OrderedModelManager,
+    OrderedModelQuerySet,
+)
 
 from homeschool.core.models import DaysOfWeekModel
 from homeschool.schools.models import GradeLevel, SchoolYear
+from homeschool.students.models import Coursework
 from homeschool.users.models import User
 
 from .exceptions import NoSchoolYearError
@@ -106,6 +112,12 @@ class GradeLevelCoursesThroughModel(OrderedModel):
         ordering = ("grade_level", "order")
 
 
+class CourseTaskQuerySet(OrderedModelQuerySet):
+    def incomplete_for(self, student) -> CourseTaskQuerySet:
+        """Filter to the tasks that the student has not completed."""
+        return self.filter(CourseTask.get_incomplete_condition(student))
+
+
 class CourseTask(OrderedModel):
     """A student's required action in a course."""
 
@@ -141,6 +153,19 @@ class CourseTask(OrderedModel):
 
     order_with_respect_to = "course"
 
+    objects = OrderedModelManager.from_queryset(CourseTaskQuerySet)()
+
+    @classmethod
+    def get_incomplete_condition(cls, student) -> Exists:
+        """Get a condition that matches tasks the student has not completed.
+
+        This is a NOT EXISTS subquery so the query stays the same size
+        no matter how much coursework the student has.
+        """
+        return ~Exists(
+            Coursework.objects.filter(student=student, course_task=OuterRef("pk"))
+        )
+
     @classmethod
     def get_by_id(cls, user: User, id_str: str) -> CourseTask | None:
         """Get a task for a user by an id."""
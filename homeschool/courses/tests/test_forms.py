@@ -7,6 +7,8 @@ from homeschool.courses.forms import (
 from homeschool.courses.tests.factories import CourseFactory, CourseTaskFactory
 from homeschool.schools.models import SchoolYear
 from homeschool.schools.tests.factories import GradeLevelFactory, SchoolYearFactory
+from homeschool.students.models import StudentCourseProgress
+from homeschool.students.tests.factories import CourseworkFactory, EnrollmentFactory
 from homeschool.test import TestCase
 
 
@@ -105,6 +107,57 @@ class TestCourseTaskBulkDeleteForm(TestCase):
             in form.non_field_errors()
         )
 
+    def test_invalid_task_id(self):
+        """A task ID that isn't a valid hashid can't be deleted."""
+        user = self.make_user()
+        data = {"task-nope": "nope"}
+        form = CourseTaskBulkDeleteForm(user=user, data=data)
+
+        is_valid = form.is_valid()
+
+        assert not is_valid
+        assert (
+            "Sorry, you do not have permission to delete the selected tasks."
+            in form.non_field_errors()
+        )
+
+    def test_duplicate_task_ids(self):
+        """A task that is selected twice is only counted once."""
+        user = self.make_user()
+        grade_level = GradeLevelFactory(school_year__school=user.school)
+        task = CourseTaskFactory(course__grade_levels=[grade_level])
+        data = {"task-1": str(task.id), "task-2": str(task.id)}
+        form = CourseTaskBulkDeleteForm(user=user, data=data)
+
+        is_valid = form.is_valid()
+
+        assert is_valid
+
+    def test_save_refreshes_progress(self):
+        """The progress has the task order after the remaining tasks move up."""
+        user = self.make_user()
+        grade_level = GradeLevelFactory(school_year__school=user.school)
+        enrollment = EnrollmentFactory(
+            student__school=user.school, grade_level=grade_level
+        )
+        course = CourseFactory(grade_levels=[grade_level])
+        tasks = CourseTaskFactory.create_batch(4, course=course)
+        for task in tasks[:3]:
+            CourseworkFactory(student=enrollment.student, course_task=task)
+        data = {f"task-{tasks[0].id}": str(tasks[0].id)}
+        form = CourseTaskBulkDeleteForm(user=user, data=data)
+        assert form.is_valid()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            form.save()
+
+        progress = StudentCourseProgress.objects.get(
+            student=enrollment.student, course=course
+        )
+        tasks[2].refresh_from_db()
+        assert progress.last_task_order == tasks[2].order
+        assert progress.is_in_order
+
     def test_error_no_tasks(self):
         """When no tasks are selected, inform the user."""
         user = self.make_user()
@@ -9,6 +9,7 @@ from homeschool.courses.tests.factories import (
     GradedWorkFactory,
 )
 from homeschool.schools.tests.factories import GradeLevelFactory
+from homeschool.students.tests.factories import CourseworkFactory
 from homeschool.test import TestCase
 
 
@@ -142,6 +143,19 @@ class TestCourseTask(TestCase):
 
         assert list(CourseTask.objects.all()) == [task_1, task_2, task_3]
 
+    def test_incomplete_for(self):
+        """The tasks can be filtered to the ones a student has not completed."""
+        coursework = CourseworkFactory()
+        course = coursework.course_task.course
+        task = CourseTaskFactory(course=course)
+        CourseworkFactory(course_task=task)
+
+        tasks = CourseTask.objects.filter(course=course).incomplete_for(
+            coursework.student
+        )
+
+        assert list(tasks) == [task]
+
     def test_get_by_id(self):
         """A user can get a task by its ID for their courses."""
         user = self.make_user()
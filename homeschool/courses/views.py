@@ -217,7 +217,7 @@ def get_course_tasks_context(course, course_tasks, enrollments, show_completed_t
         enrollment.student: enrollment.grade_level_id for enrollment in enrollments
     }
 
-    forecasts = _get_forecasts(students, course)
+    forecasts = Forecaster().forecast_course(course, enrollments)
 
     task_details = []
     for number, task in enumerate(course_tasks, start=1):
@@ -239,7 +239,7 @@ def get_course_tasks_context(course, course_tasks, enrollments, show_completed_t
                 "coursework": work,
                 "grade": grades[student.id].get(task.id),
                 "assigned": assigned,
-                "planned_date": forecasts[student].get(task, {}).get("planned_date"),
+                "planned_date": forecasts[student].get(task.id),
             }
             task_detail["student_details"].append(student_detail)
 
@@ -251,9 +251,7 @@ def get_course_tasks_context(course, course_tasks, enrollments, show_completed_t
                 task_detail["complete"] = False
 
         if not students:
-            task_detail["planned_date"] = (
-                forecasts[None].get(task, {}).get("planned_date")
-            )
+            task_detail["planned_date"] = forecasts[None].get(task.id)
 
         if task_detail["complete"] and not show_completed_tasks:
             continue
@@ -262,22 +260,6 @@ def get_course_tasks_context(course, course_tasks, enrollments, show_completed_t
     return {"task_details": task_details}
 
 
-def _get_forecasts(students, course):
-    """Get the forecast dates for all the students.
-
-    If there are no students, a generic forecast is added to the None key.
-    """
-    forecaster = Forecaster()
-    forecasts = {}
-    for student in students:
-        forecasts[student] = forecaster.get_items_by_task(student, course)
-
-    if not students:
-        forecasts[None] = forecaster.get_items_by_task(student=None, course=course)
-
-    return forecasts
-
-
 @method_decorator(authorize(course_authorized), "dispatch")
 class CourseEditView(UpdateView):
     form_class = CourseForm
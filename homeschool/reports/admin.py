@@ -5,5 +5,12 @@ from .models import Bundle
 
 @admin.register(Bundle)
 class BundleAdmin(admin.ModelAdmin):
-    list_display = ("id", "school_year", "status")
+    list_display = (
+        "id",
+        "school_year",
+        "status",
+        "completed_reports",
+        "total_reports",
+        "build_seconds",
+    )
     list_filter = ("status",)
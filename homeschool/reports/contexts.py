@@ -1,67 +1,134 @@
 from __future__ import annotations
 
+import copy
 import datetime
 from collections import defaultdict
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from decimal import ROUND_HALF_UP, Decimal
 
 from django.db.models import Q
 
-from homeschool.courses.models import Course, CourseResource
+from homeschool.courses.models import (
+    Course,
+    CourseResource,
+    GradeLevelCoursesThroughModel,
+)
 from homeschool.schools.models import GradeLevel, SchoolYear
+from homeschool.schools.school_calendar import SchoolCalendar
 from homeschool.students.models import Coursework, Enrollment, Grade, Student
 
 
+class SchoolDates(Sequence):
+    """The dates of a school year for an attendance report.
+
+    A row for a date is only built when it is accessed
+    so the rows are never all held in memory at once.
+    """
+
+    def __init__(
+        self,
+        school_year: SchoolYear,
+        school_calendar: SchoolCalendar,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        dates_with_work: set[datetime.date],
+    ):
+        self.school_year = school_year
+        self.school_calendar = school_calendar
+        self.dates_with_work = dates_with_work
+        self._start_ordinal = start_date.toordinal()
+        self._length = max(end_date.toordinal() - self._start_ordinal + 1, 0)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("School date index out of range")
+        return self._build(datetime.date.fromordinal(self._start_ordinal + index))
+
+    def __iter__(self):
+        for ordinal in range(self._start_ordinal, self._start_ordinal + self._length):
+            yield self._build(datetime.date.fromordinal(ordinal))
+
+    def __deepcopy__(self, memo):
+        # The dates are read only so asdict can share them instead of copying.
+        return self
+
+    def _build(self, school_date: datetime.date) -> dict:
+        return {
+            "date": school_date,
+            "is_school_day": self.school_year.runs_on(school_date),
+            "is_break": self.school_calendar.is_break(school_date),
+            "attended": school_date in self.dates_with_work,
+        }
+
+
 @dataclass
 class AttendanceReportContext:
     student: Student
     grade_level: GradeLevel
     school_year: SchoolYear
-    school_dates: list
+    school_dates: SchoolDates
     total_days_attended: int
 
     @classmethod
     def from_enrollment(
         cls, enrollment: Enrollment, today: datetime.date
     ) -> AttendanceReportContext:
-        school_dates = cls._build_school_dates(enrollment, today)
-        total_days_attended = sum(
-            1 for school_date in school_dates if school_date["attended"]
-        )
-        return cls(
-            enrollment.student,
-            enrollment.grade_level,
-            enrollment.grade_level.school_year,
-            school_dates,
-            total_days_attended,
-        )
+        """Build the context from the distinct dates with coursework.
 
-    @classmethod
-    def _build_school_dates(cls, enrollment: Enrollment, today: datetime.date) -> list:
-        """Collect all the school dates in the year to the end or today."""
-        dates_with_work = set(
+        The school dates are from the start of the year to the end or today.
+        """
+        school_year = enrollment.grade_level.school_year
+        end_date = min(school_year.end_date, today)
+        completed_dates = (
             Coursework.objects.filter(
                 student=enrollment.student,
-                course_task__course__grade_levels__in=[enrollment.grade_level],
-            ).values_list("completed_date", flat=True)
+                course_task__course__grade_levels=enrollment.grade_level,
+                completed_date__range=[school_year.start_date, end_date],
+            )
+            .order_by()
+            .values_list("completed_date", flat=True)
+            .distinct()
         )
-        school_dates = []
+        return cls.from_completed_dates(enrollment, today, completed_dates)
+
+    @classmethod
+    def from_completed_dates(
+        cls,
+        enrollment: Enrollment,
+        today: datetime.date,
+        completed_dates: Iterable[datetime.date],
+    ) -> AttendanceReportContext:
+        """Build the context from the dates of the student's coursework."""
         school_year = enrollment.grade_level.school_year
-        school_date = school_year.start_date
         end_date = min(school_year.end_date, today)
-        while school_date <= end_date:
-            school_dates.append(
-                {
-                    "date": school_date,
-                    "is_school_day": school_year.runs_on(school_date),
-                    "is_break": school_year.is_break(
-                        school_date, student=enrollment.student
-                    ),
-                    "attended": school_date in dates_with_work,
-                }
-            )
-            school_date += datetime.timedelta(days=1)
-        return school_dates
+        dates_with_work = {
+            completed_date
+            for completed_date in completed_dates
+            if school_year.start_date <= completed_date <= end_date
+        }
+        school_dates = SchoolDates(
+            school_year,
+            school_year.get_calendar(enrollment.student),
+            school_year.start_date,
+            end_date,
+            dates_with_work,
+        )
+        return cls(
+            enrollment.student,
+            enrollment.grade_level,
+            school_year,
+            school_dates,
+            # Every date with work is a date in the report.
+            len(dates_with_work),
+        )
 
 
 @dataclass
@@ -81,7 +148,19 @@ class CourseworkReportContext:
             .select_related("course_task")
             .order_by("completed_date")
         )
+        return cls.from_coursework(enrollment, courses, all_coursework)
 
+    @classmethod
+    def from_coursework(
+        cls,
+        enrollment: Enrollment,
+        courses: list[Course],
+        all_coursework: Iterable[Coursework],
+    ) -> CourseworkReportContext:
+        """Build the context from the student's coursework in completed date order.
+
+        Any coursework for a course outside of the courses is ignored.
+        """
         coursework_by_course = defaultdict(list)
         for coursework in all_coursework:
             coursework_by_course[coursework.course_task.course_id].append(
@@ -131,6 +210,16 @@ class ProgressReportContext:
         )
 
         cls._mixin_coursework(grades, enrollment.student)
+        return cls.from_grades(enrollment, grades)
+
+    @classmethod
+    def from_grades(
+        cls, enrollment: Enrollment, grades: Sequence[Grade]
+    ) -> ProgressReportContext:
+        """Build the context from grades that have their coursework mixed in.
+
+        Grades must be sorted by course then by task.
+        """
         courses = cls._build_courses_info(grades)
         return cls(
             enrollment.student,
@@ -219,3 +308,140 @@ class ResourceReportContext:
             enrollment.grade_level,
             enrollment.grade_level.school_year,
         )
+
+
+class SchoolYearReportData:
+    """The report data for every enrollment in a school year.
+
+    The coursework, grades, courses, and resources for the whole school year
+    are loaded in a handful of queries and then sliced for each enrollment
+    so the number of queries doesn't grow with the number of enrollments.
+    """
+
+    def __init__(self, school_year: SchoolYear):
+        self.school_year = school_year
+        self.enrollments = list(
+            Enrollment.objects.filter(
+                grade_level__school_year=school_year
+            ).select_related("student", "grade_level")
+        )
+        for enrollment in self.enrollments:
+            # Share the school year so its breaks are loaded once for all students.
+            enrollment.grade_level.school_year = school_year
+
+        school_year_courses = Course.objects.filter(
+            grade_levels__school_year=school_year
+        )
+        students = [enrollment.student for enrollment in self.enrollments]
+
+        self._courses_by_grade_level: dict = defaultdict(list)
+        for grade_level_course in GradeLevelCoursesThroughModel.objects.filter(
+            grade_level__school_year=school_year
+        ).select_related("course"):
+            grade_level_course.course.school_year = school_year
+            self._courses_by_grade_level[grade_level_course.grade_level_id].append(
+                grade_level_course.course
+            )
+
+        self._coursework_by_student: dict = defaultdict(list)
+        all_coursework = (
+            Coursework.objects.filter(
+                student__in=students, course_task__course__in=school_year_courses
+            )
+            .select_related("course_task")
+            .order_by("completed_date")
+        )
+        for coursework in all_coursework:
+            self._coursework_by_student[coursework.student_id].append(coursework)
+
+        self._grades_by_student: dict = defaultdict(list)
+        grades = (
+            Grade.objects.filter(
+                student__in=students,
+                graded_work__course_task__course__in=school_year_courses,
+            )
+            # Include secondary ordering so tasks are ordered in the course.
+            .order_by("graded_work__course_task__course", "graded_work__course_task")
+            .select_related(
+                "graded_work__course_task",
+                "graded_work__course_task__course",
+                "graded_work__course_task__resource",
+            )
+        )
+        for grade in grades:
+            self._grades_by_student[grade.student_id].append(grade)
+
+        self._resources_by_course: dict = defaultdict(list)
+        resources = (
+            CourseResource.objects.filter(course__in=school_year_courses)
+            .select_related("course")
+            .order_by("course", "id")
+        )
+        for resource in resources:
+            self._resources_by_course[resource.course_id].append(resource)
+
+    def _get_course_ids(self, enrollment: Enrollment) -> set:
+        return {
+            course.id
+            for course in self._courses_by_grade_level[enrollment.grade_level_id]
+        }
+
+    def _get_coursework(self, enrollment: Enrollment) -> list[Coursework]:
+        """Get the student's coursework for the courses of the grade level."""
+        course_ids = self._get_course_ids(enrollment)
+        return [
+            coursework
+            for coursework in self._coursework_by_student[enrollment.student_id]
+            if coursework.course_task.course_id in course_ids
+        ]
+
+    def get_attendance_context(
+        self, enrollment: Enrollment, today: datetime.date
+    ) -> AttendanceReportContext:
+        completed_dates = [
+            coursework.completed_date for coursework in self._get_coursework(enrollment)
+        ]
+        return AttendanceReportContext.from_completed_dates(
+            enrollment, today, completed_dates
+        )
+
+    def get_coursework_context(self, enrollment: Enrollment) -> CourseworkReportContext:
+        # Each student gets their own course copies
+        # because the coursework is attached to the courses.
+        courses = [
+            copy.copy(course)
+            for course in self._courses_by_grade_level[enrollment.grade_level_id]
+        ]
+        return CourseworkReportContext.from_coursework(
+            enrollment, courses, self._get_coursework(enrollment)
+        )
+
+    def get_progress_context(self, enrollment: Enrollment) -> ProgressReportContext:
+        course_ids = self._get_course_ids(enrollment)
+        grades = [
+            grade
+            for grade in self._grades_by_student[enrollment.student_id]
+            if grade.graded_work.course_task.course_id in course_ids
+        ]
+        coursework_by_task_id = {
+            coursework.course_task_id: coursework
+            for coursework in self._coursework_by_student[enrollment.student_id]
+        }
+        for grade in grades:
+            grade.coursework = coursework_by_task_id.get(
+                grade.graded_work.course_task_id
+            )
+        return ProgressReportContext.from_grades(enrollment, grades)
+
+    def get_resource_context(self, enrollment: Enrollment) -> ResourceReportContext:
+        resources = [
+            resource
+            for course_id in sorted(self._get_course_ids(enrollment))
+            for resource in self._resources_by_course[course_id]
+        ]
+        return ResourceReportContext(
+            resources,
+            enrollment.student,
+            enrollment.grade_level,
+            enrollment.grade_level.school_year,
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 6.1 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bundle",
+            name="build_seconds",
+            field=models.FloatField(
+                blank=True, help_text="The duration of the latest build", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="bundle",
+            name="build_started_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the latest build started", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="bundle",
+            name="completed_reports",
+            field=models.PositiveIntegerField(
+                default=0, help_text="The number of reports built so far"
+            ),
+        ),
+        migrations.AddField(
+            model_name="bundle",
+            name="report_timings",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="The render time, size, and reuse of each report",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bundle",
+            name="total_reports",
+            field=models.PositiveIntegerField(
+                default=0, help_text="The number of reports in the bundle"
+            ),
+        ),
+    ]
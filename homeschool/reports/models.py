@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+from typing import IO
+
 from django.conf import settings
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 from hashid_field import HashidAutoField
 
-from homeschool.schools.models import SchoolYear
+from homeschool.courses.models import Course, CourseResource, CourseTask
+from homeschool.schools.models import GradeLevel, SchoolBreak, SchoolYear
+from homeschool.students.models import Coursework, Enrollment, Grade, Student
+
+from . import report_cache
 
 
 def report_path(bundle, filename):
@@ -38,21 +47,149 @@ class Bundle(models.Model):
     school_year = models.ForeignKey("schools.SchoolYear", on_delete=models.CASCADE)
     report = models.FileField(upload_to=report_path)
     status = models.IntegerField(choices=Status.choices, default=Status.PENDING)
+    build_started_at = models.DateTimeField(
+        null=True, blank=True, help_text="When the latest build started"
+    )
+    build_seconds = models.FloatField(
+        null=True, blank=True, help_text="The duration of the latest build"
+    )
+    total_reports = models.PositiveIntegerField(
+        default=0, help_text="The number of reports in the bundle"
+    )
+    completed_reports = models.PositiveIntegerField(
+        default=0, help_text="The number of reports built so far"
+    )
+    report_timings = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="The render time, size, and reuse of each report",
+    )
 
     objects = BundleManager()
 
-    def store(self, report_data: bytes) -> None:
-        """Store the report data into the bundle."""
+    @property
+    def progress_percent(self) -> int:
+        """Get the percentage of reports that are built."""
+        if not self.total_reports:
+            return 0
+        return self.completed_reports * 100 // self.total_reports
+
+    @property
+    def slowest_report(self) -> dict | None:
+        """Get the timing of the report that took the longest to render."""
+        if not self.report_timings:
+            return None
+        return max(self.report_timings, key=lambda timing: timing["seconds"])
+
+    def start_build(self, total_reports: int) -> None:
+        """Reset the progress for a new build of the bundle."""
+        self.build_started_at = timezone.now()
+        self.build_seconds = None
+        self.total_reports = total_reports
+        self.completed_reports = 0
+        self.report_timings = []
+        self.save(
+            update_fields=[
+                "build_started_at",
+                "build_seconds",
+                "total_reports",
+                "completed_reports",
+                "report_timings",
+                "updated_at",
+            ]
+        )
+
+    def track_report(self, name: str, seconds: float, size: int, reused: bool) -> None:
+        """Record that a report in the bundle is built.
+
+        This also refreshes updated_at so a long build isn't mistaken as stuck.
+        """
+        self.completed_reports += 1
+        self.report_timings.append(
+            {"name": name, "seconds": seconds, "size": size, "reused": reused}
+        )
+        self.save(update_fields=["completed_reports", "report_timings", "updated_at"])
+
+    def store(self, report_file: IO[bytes]) -> None:
+        """Store the report file into the bundle.
+
+        The file is read in chunks by the storage
+        so a large bundle is never loaded into memory for the upload.
+        """
         name = f"School Desk bundle {self.school_year}.zip"
         # The "dash" character is an emdash from the SchoolYear.__str__ method.
         # Replace with a regular dash to avoid header character encoding weirdness.
         name = name.replace("–", "-")
 
-        self.report = ContentFile(report_data, name=name)
+        self.report = File(report_file, name=name)
         self.status = self.Status.COMPLETE
+        if self.build_started_at:
+            self.build_seconds = (
+                timezone.now() - self.build_started_at
+            ).total_seconds()
         self.save()
 
-    def recreate(self) -> None:
-        """Recreate the bundle by queueing it back up."""
+    def recreate(self) -> bool:
+        """Recreate the bundle by queueing it back up.
+
+        Return True if the bundle changed to pending.
+        A bundle that is already pending is left alone
+        so that repeat requests don't queue duplicate builds.
+        """
+        updated = (
+            Bundle.objects.filter(id=self.id)
+            .exclude(status=self.Status.PENDING)
+            .update(status=self.Status.PENDING, updated_at=timezone.now())
+        )
         self.status = self.Status.PENDING
-        self.save()
+        return bool(updated)
+
+
+@receiver([post_save, post_delete], sender=SchoolYear)
+def invalidate_school_year_reports(sender, instance, **kwargs):
+    """The school year's dates and days set the dates of an attendance report."""
+    report_cache.invalidate_school_year(instance.id)
+
+
+@receiver([post_save, post_delete], sender=SchoolBreak)
+@receiver([post_save, post_delete], sender=GradeLevel)
+def invalidate_school_year_part_reports(sender, instance, **kwargs):
+    """Breaks and grade level names are shown on the reports of the school year."""
+    report_cache.invalidate_school_year(instance.school_year_id)
+
+
+@receiver(m2m_changed, sender=SchoolBreak.students.through)
+def invalidate_school_break_students_reports(sender, instance, action, **kwargs):
+    """A student specific break changes the attendance report of its students."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        if isinstance(instance, SchoolBreak):
+            report_cache.invalidate_school_year(instance.school_year_id)
+        else:
+            report_cache.invalidate_student(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_reports(sender, instance, **kwargs):
+    """Course names are shown on the progress and resource reports."""
+    report_cache.invalidate_course(instance.id)
+
+
+@receiver([post_save, post_delete], sender=CourseTask)
+@receiver([post_save, post_delete], sender=CourseResource)
+def invalidate_course_part_reports(sender, instance, **kwargs):
+    """Tasks and resources are listed on the progress and resource reports."""
+    report_cache.invalidate_course(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Coursework)
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=Grade)
+def invalidate_student_reports(sender, instance, **kwargs):
+    """Coursework and grades are the student's part of the reports."""
+    report_cache.invalidate_student(instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_student_name_reports(sender, instance, **kwargs):
+    """The student's name is on every report."""
+    report_cache.invalidate_student(instance.id)
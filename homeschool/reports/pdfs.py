@@ -1,7 +1,17 @@
+import hashlib
+import importlib.metadata
+import multiprocessing
+import os
+import tempfile
+import time
 import zipfile
-from dataclasses import asdict
-from io import BytesIO
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import IO, Any
 
+from django.conf import settings
 from django.contrib.staticfiles import finders
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -9,42 +19,265 @@ from django.utils import timezone
 from homeschool.schools.models import SchoolYear
 from homeschool.students.models import Enrollment
 
+from . import rendering
 from .contexts import (
     AttendanceReportContext,
     CourseworkReportContext,
     ProgressReportContext,
     ResourceReportContext,
+    SchoolYearReportData,
 )
+from .models import Bundle
 
+# Bundles up to this size stay in memory. Anything bigger spills to disk.
+BUNDLE_SPOOL_MAX_SIZE = 10 * 1024 * 1024
 
-def make_bundle(school_year: SchoolYear) -> bytes:
-    """Make the zip file bundle."""
-    enrollments = Enrollment.objects.filter(
-        grade_level__school_year=school_year
-    ).select_related("student", "grade_level", "grade_level__school_year")
+# The installed WeasyPrint release. It is read from the package metadata
+# so that the web process doesn't have to load WeasyPrint to get it.
+WEASYPRINT_VERSION = importlib.metadata.version("weasyprint")
 
-    zip_file_data = BytesIO()
-    with zipfile.ZipFile(zip_file_data, "w") as zip_file:
-        for enrollment in enrollments:
-            attendance_context = AttendanceReportContext.from_enrollment(
-                enrollment, timezone.localdate()
+# The CSS content of each static stylesheet
+# with the file path and modification time that it came from.
+_css_cache: dict[str, tuple[tuple, str]] = {}
+
+# Weasyprint doesn't render the Tailwind font properly.
+# The default font failed to render numbers.
+# Use a safe, albeit boring, font of Arial.
+# Also add page numbers.
+SITE_CSS_ADDITIONS = (
+    "\nhtml { font-family: Arial; }"
+    '\n@page { @bottom-center { content: counter(page) " / " counter(pages); } }'
+)
+
+
+@dataclass
+class BuiltReport:
+    name: str
+    fingerprint: str
+    pdf: bytes
+    seconds: float
+    reused: bool
+
+
+def make_bundle(
+    school_year: SchoolYear,
+    previous_bundle: IO[bytes] | None = None,
+    bundle: Bundle | None = None,
+) -> IO[bytes]:
+    """Make the zip file bundle.
+
+    The zip is written to a spooled temporary file as each PDF finishes
+    so that large bundles spill to disk instead of staying in memory.
+    The caller is responsible for closing the returned file.
+
+    When a previous build of the bundle is provided,
+    any report with an unchanged fingerprint is copied from it
+    instead of being written again.
+
+    When a bundle record is provided, the build progress is tracked on it.
+    """
+    report_data = SchoolYearReportData(school_year)
+    if bundle is not None:
+        bundle.start_build(len(report_data.enrollments) * len(BUNDLE_REPORTS))
+
+    bundle_file = tempfile.SpooledTemporaryFile(max_size=BUNDLE_SPOOL_MAX_SIZE)
+    try:
+        with (
+            zipfile.ZipFile(bundle_file, "w") as zip_file,
+            PreviousBundle(previous_bundle) as previous,
+        ):
+            reports = _render_reports(report_data)
+            for report in _write_pdfs(reports, previous):
+                zip_info = zipfile.ZipInfo(report.name, date_time=time.localtime()[:6])
+                zip_info.comment = report.fingerprint.encode()
+                zip_file.writestr(zip_info, report.pdf)
+                if bundle is not None:
+                    bundle.track_report(
+                        report.name,
+                        round(report.seconds, 3),
+                        len(report.pdf),
+                        report.reused,
+                    )
+    except Exception:
+        bundle_file.close()
+        raise
+
+    bundle_file.seek(0)
+    return bundle_file
+
+
+class PreviousBundle:
+    """The PDFs of an earlier bundle build keyed by their fingerprints.
+
+    Each zip entry stores the fingerprint of its report in the entry comment.
+    A bundle that is missing or isn't a zip file has no PDFs to reuse.
+    """
+
+    def __init__(self, bundle_file: IO[bytes] | None):
+        self.zip_file = None
+        self.infos_by_fingerprint = {}
+        if bundle_file is None:
+            return
+
+        try:
+            self.zip_file = zipfile.ZipFile(bundle_file)
+        except zipfile.BadZipFile:
+            return
+        self.infos_by_fingerprint = {
+            info.comment.decode(): info
+            for info in self.zip_file.infolist()
+            if info.comment
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.zip_file is not None:
+            self.zip_file.close()
+
+    def get(self, fingerprint: str) -> bytes | None:
+        """Get the PDF data for the fingerprint if it was built before."""
+        info = self.infos_by_fingerprint.get(fingerprint)
+        if info is None or self.zip_file is None:
+            return None
+        return self.zip_file.read(info)
+
+
+# The title, template, and context getter of each report for an enrollment.
+BUNDLE_REPORTS: list[
+    tuple[str, str, Callable[[SchoolYearReportData, Enrollment], Any]]
+] = [
+    (
+        "Attendance Report",
+        "reports/attendance_report_pdf.html",
+        lambda report_data, enrollment: report_data.get_attendance_context(
+            enrollment, timezone.localdate()
+        ),
+    ),
+    (
+        "Courses Report",
+        "reports/coursework_report_pdf.html",
+        SchoolYearReportData.get_coursework_context,
+    ),
+    (
+        "Progress Report",
+        "reports/progress_report_pdf.html",
+        SchoolYearReportData.get_progress_context,
+    ),
+    (
+        "Resource Report",
+        "reports/resource_report_pdf.html",
+        SchoolYearReportData.get_resource_context,
+    ),
+]
+
+
+def _render_reports(
+    report_data: SchoolYearReportData,
+) -> Iterator[tuple[str, str, rendering.PDFRenderer]]:
+    """Render the HTML of each report in the bundle with its PDF renderer.
+
+    The HTML is rendered in this process because the contexts need the database.
+    The data for every report is loaded up front for the whole school year.
+    """
+    school_year = report_data.school_year
+    renderers = {
+        template_name: get_renderer(template_name)
+        for _, template_name, _ in BUNDLE_REPORTS
+    }
+    for enrollment in report_data.enrollments:
+        for title, template_name, get_context in BUNDLE_REPORTS:
+            name = f"{school_year} - {enrollment.student} {title}.pdf"
+            context = get_context(report_data, enrollment)
+            rendered = render_to_string(template_name, asdict(context))
+            yield name, rendered, renderers[template_name]
+
+
+def _write_pdfs(
+    reports: Iterable[tuple[str, str, rendering.PDFRenderer]],
+    previous: PreviousBundle,
+) -> Iterator[BuiltReport]:
+    """Write the rendered reports to PDFs in the order of the reports.
+
+    Writing the PDFs is the slow, CPU bound part
+    so that work fans out to a pool of REPORTS_BUNDLE_WORKERS processes.
+    Only a couple of reports per worker are in flight at a time
+    to keep memory bounded no matter how big the bundle is.
+    Reports that match a fingerprint from the previous bundle are not written again.
+    """
+    workers = settings.REPORTS_BUNDLE_WORKERS
+    if workers <= 1:
+        for name, rendered, renderer in reports:
+            fingerprint = _get_fingerprint(rendered, renderer)
+            previous_pdf = previous.get(fingerprint)
+            if previous_pdf is None:
+                pdf, seconds = renderer.write_timed_pdf(rendered)
+                yield BuiltReport(name, fingerprint, pdf, seconds, reused=False)
+            else:
+                yield BuiltReport(name, fingerprint, previous_pdf, 0.0, reused=True)
+        return
+
+    with _get_executor(workers) as executor:
+        in_flight: deque[tuple[str, str, bytes | Future[tuple[bytes, float]]]] = deque()
+        for name, rendered, renderer in reports:
+            fingerprint = _get_fingerprint(rendered, renderer)
+            pending_pdf: bytes | Future[tuple[bytes, float]] | None = previous.get(
+                fingerprint
             )
-            name = f"{school_year} - {enrollment.student} Attendance Report.pdf"
-            zip_file.writestr(name, make_attendance_report(attendance_context))
+            if pending_pdf is None:
+                pending_pdf = executor.submit(renderer.write_timed_pdf, rendered)
+            in_flight.append((name, fingerprint, pending_pdf))
+            if len(in_flight) >= workers * 2:
+                yield _get_built_report(*in_flight.popleft())
+
+        while in_flight:
+            yield _get_built_report(*in_flight.popleft())
+
+
+def _get_built_report(
+    name: str, fingerprint: str, pending_pdf: bytes | Future[tuple[bytes, float]]
+) -> BuiltReport:
+    """Wait for the PDF if it is still being written."""
+    if isinstance(pending_pdf, Future):
+        pdf, seconds = pending_pdf.result()
+        return BuiltReport(name, fingerprint, pdf, seconds, reused=False)
+    return BuiltReport(name, fingerprint, pending_pdf, 0.0, reused=True)
 
-            coursework_context = CourseworkReportContext.from_enrollment(enrollment)
-            name = f"{school_year} - {enrollment.student} Courses Report.pdf"
-            zip_file.writestr(name, make_coursework_report(coursework_context))
 
-            progress_context = ProgressReportContext.from_enrollment(enrollment)
-            name = f"{school_year} - {enrollment.student} Progress Report.pdf"
-            zip_file.writestr(name, make_progress_report(progress_context))
+def _get_fingerprint(rendered: str, renderer: rendering.PDFRenderer) -> str:
+    """Get the fingerprint of a report.
+
+    The rendered HTML is a product of every input in the report context
+    (coursework, grades, breaks, resources)
+    so hashing it with the renderer identifies the PDF that it would produce.
+    A WeasyPrint upgrade can change that PDF so its version is hashed too.
+    """
+    digest = hashlib.sha256(WEASYPRINT_VERSION.encode())
+    digest.update(renderer.fingerprint.encode())
+    digest.update(rendered.encode())
+    return digest.hexdigest()
 
-            resource_context = ResourceReportContext.from_enrollment(enrollment)
-            name = f"{school_year} - {enrollment.student} Resource Report.pdf"
-            zip_file.writestr(name, make_resource_report(resource_context))
 
-    return zip_file_data.getbuffer()
+def _get_executor(workers: int) -> Executor:
+    """Get a process pool to write the bundle PDFs.
+
+    The workers are spawned rather than forked
+    because forking a process with running threads (like the Huey consumer)
+    can deadlock the child.
+
+    Each worker gets the CSS of every renderer once when it starts
+    so that the submitted reports only carry their renderer's name.
+    """
+    # Making the renderers adds their current CSS to this process.
+    for make_renderer in PDF_RENDERERS.values():
+        make_renderer()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=rendering.add_stylesheets,
+        initargs=(rendering.get_css_contents(),),
+    )
 
 
 def make_attendance_report(context: AttendanceReportContext) -> bytes:
@@ -84,24 +317,50 @@ def _make_report(template_name: str, context: dict) -> bytes:
 
     Return raw PDF data.
     """
-    site_css_path = finders.find("site.css")
-    # site.css should always be there and never return None. Ignore type check.
-    with open(site_css_path) as f:  # type: ignore
-        css_content = f.read()
-    # Weasyprint doesn't render the Tailwind font properly.
-    # The default font failed to render numbers.
-    # Use a safe, albeit boring, font of Arial.
-    css_content += "\nhtml { font-family: Arial; }"
-
-    # Add page numbers.
-    css_content += (
-        '\n@page { @bottom-center { content: counter(page) " / " counter(pages); } }'
-    )
+    rendered = render_to_string(template_name, context)
+    return get_renderer(template_name).write_pdf(rendered)
 
-    from weasyprint import CSS, HTML
 
-    rendered = render_to_string(template_name, context)
-    html = HTML(string=rendered)
-    io = BytesIO()
-    html.write_pdf(io, stylesheets=[CSS(string=css_content)])
-    return io.getvalue()
+# The renderers that REPORTS_PDF_RENDERERS can choose from for a report template.
+PDF_RENDERERS: dict[str, Callable[[], rendering.PDFRenderer]] = {
+    # WeasyPrint with the full site stylesheet can lay out any report.
+    "site": lambda: rendering.WeasyPrintRenderer("site", _get_css_content()),
+    # WeasyPrint with a small print stylesheet is much faster for plain tables.
+    "print": lambda: rendering.WeasyPrintRenderer(
+        "print", _get_static_css("report-print.css")
+    ),
+}
+
+
+def get_renderer(template_name: str) -> rendering.PDFRenderer:
+    """Get the PDF renderer for a report template.
+
+    A report uses the site renderer unless REPORTS_PDF_RENDERERS picks another.
+    """
+    renderer_name = settings.REPORTS_PDF_RENDERERS.get(template_name, "site")
+    return PDF_RENDERERS[renderer_name]()
+
+
+def _get_css_content() -> str:
+    """Get the site stylesheet for the reports."""
+    return _get_static_css("site.css", SITE_CSS_ADDITIONS)
+
+
+def _get_static_css(path: str, css_additions: str = "") -> str:
+    """Get the content of a static stylesheet.
+
+    The content is cached for the process
+    and only read again when the file is modified.
+    """
+    css_path = finders.find(path)
+    # The stylesheets should always be there and never return None.
+    # Ignore type check.
+    cache_key = (css_path, os.stat(css_path).st_mtime_ns)  # type: ignore
+    cached_key, css_content = _css_cache.get(path, (None, ""))
+    if cached_key == cache_key:
+        return css_content
+
+    with open(css_path) as f:  # type: ignore
+        css_content = f.read() + css_additions
+    _css_cache[path] = (cache_key, css_content)
+    return css_content
@@ -0,0 +1,105 @@
+"""Turn rendered report HTML into PDF data.
+
+The bundle process pool runs these functions in separate processes
+that don't set up Django, so this module must not import any Django code.
+"""
+
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Any
+
+# The CSS content of each renderer by name.
+# The parent process adds the CSS as it makes renderers
+# and each bundle worker gets a copy once when it starts
+# so that the CSS isn't pickled with every report.
+_css_contents: dict[str, str] = {}
+
+# The parsed stylesheet of each renderer by name
+# with the fingerprint of the CSS that it was parsed from.
+_stylesheets: dict[str, tuple[str, Any]] = {}
+
+
+def add_stylesheets(css_contents: dict[str, str]) -> None:
+    """Add the CSS content of renderers (keyed by name) to this process."""
+    _css_contents.update(css_contents)
+
+
+def get_css_contents() -> dict[str, str]:
+    """Get a copy of the CSS content of every renderer in this process."""
+    return dict(_css_contents)
+
+
+def write_pdf(rendered: str, name: str, fingerprint: str) -> bytes:
+    """Write the rendered HTML to a PDF with the stylesheet of a renderer.
+
+    Return raw PDF data.
+    """
+    from weasyprint import HTML
+
+    html = HTML(string=rendered)
+    io = BytesIO()
+    html.write_pdf(io, stylesheets=[get_stylesheet(name, fingerprint)])
+    return io.getvalue()
+
+
+def get_stylesheet(name: str, fingerprint: str):
+    """Get the parsed stylesheet of a renderer.
+
+    Parsing the full Tailwind CSS is expensive
+    so the parsed stylesheet of each renderer is reused until its CSS changes.
+    """
+    cached_fingerprint, stylesheet = _stylesheets.get(name, ("", None))
+    if cached_fingerprint == fingerprint:
+        return stylesheet
+
+    from weasyprint import CSS
+
+    stylesheet = CSS(string=_css_contents[name])
+    _stylesheets[name] = (fingerprint, stylesheet)
+    return stylesheet
+
+
+class PDFRenderer(ABC):
+    """A way to write rendered report HTML to PDF data.
+
+    Renderers are sent to the bundle process pool
+    so they must be picklable like the rest of this module.
+    """
+
+    # The fingerprint identifies how a renderer writes its PDFs
+    # so a bundle only reuses a PDF that the same renderer would write.
+    fingerprint = ""
+
+    @abstractmethod
+    def write_pdf(self, rendered: str) -> bytes:
+        """Write the rendered HTML to a PDF.
+
+        Return raw PDF data.
+        """
+
+    def write_timed_pdf(self, rendered: str) -> tuple[bytes, float]:
+        """Write the rendered HTML to a PDF and time how long it took.
+
+        Return raw PDF data and the seconds it took to write.
+        """
+        start = time.perf_counter()
+        pdf = self.write_pdf(rendered)
+        return pdf, time.perf_counter() - start
+
+
+class WeasyPrintRenderer(PDFRenderer):
+    """Write PDFs with WeasyPrint and a stylesheet.
+
+    The renderer only carries the name of its stylesheet.
+    The CSS content is looked up in the process that writes the PDF.
+    """
+
+    def __init__(self, name: str, css_content: str):
+        self.name = name
+        self.fingerprint = hashlib.sha256(css_content.encode()).hexdigest()
+        add_stylesheets({name: css_content})
+
+    def write_pdf(self, rendered: str) -> bytes:
+        return write_pdf(rendered, self.name, self.fingerprint)
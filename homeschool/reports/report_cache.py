@@ -0,0 +1,76 @@
+"""A cache of rendered report pages.
+
+A student's reports are opened and printed far more often
+than their coursework, grades, and resources change.
+
+Every report ETag includes a version token for the school year, the student,
+and each course of the grade level. When report data changes, the matching token
+is replaced so browsers get a fresh page and stale HTML ages out of the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from django.core.cache import cache
+
+from homeschool.core.cache_versions import VersionTokens
+from homeschool.courses.models import GradeLevelCoursesThroughModel
+from homeschool.students.models import Enrollment
+
+# Report pages are keyed by their ETag so they don't need to live long.
+# The timeout also limits how long a template change can take to appear.
+REPORT_TIMEOUT = 60 * 60 * 24
+
+versions = VersionTokens("report")
+
+
+def get_etag(report_name: str, enrollment: Enrollment, *parts) -> str:
+    """Get the ETag of a report for an enrollment.
+
+    Any extra parts (like the date or a filter) are mixed into the ETag.
+    """
+    course_ids = list(
+        GradeLevelCoursesThroughModel.objects.filter(
+            grade_level_id=enrollment.grade_level_id
+        ).values_list("course_id", flat=True)
+    )
+    school_year_key = versions.key("school_year", enrollment.grade_level.school_year_id)
+    student_key = versions.key("student", enrollment.student_id)
+    course_keys = [versions.key("course", course_id) for course_id in course_ids]
+    tokens = versions.get_many({school_year_key, student_key, *course_keys})
+
+    etag_parts = [
+        report_name,
+        str(enrollment.id),
+        tokens[school_year_key],
+        tokens[student_key],
+        *(tokens[course_key] for course_key in course_keys),
+        *(str(part) for part in parts),
+    ]
+    return hashlib.sha256(":".join(etag_parts).encode()).hexdigest()
+
+
+def get_html(etag: str) -> str | None:
+    """Get the cached report HTML for an ETag."""
+    return cache.get(f"report:{etag}")
+
+
+def set_html(etag: str, html: str) -> None:
+    """Store the report HTML under its ETag."""
+    cache.set(f"report:{etag}", html, timeout=REPORT_TIMEOUT)
+
+
+def invalidate_school_year(school_year_id) -> None:
+    """Invalidate the reports of every enrollment in a school year."""
+    versions.invalidate("school_year", school_year_id)
+
+
+def invalidate_course(course_id) -> None:
+    """Invalidate the reports of every enrollment with the course."""
+    versions.invalidate("course", course_id)
+
+
+def invalidate_student(student_id) -> None:
+    """Invalidate the reports of a student."""
+    versions.invalidate("student", student_id)
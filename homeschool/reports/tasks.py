@@ -1,14 +1,72 @@
+import datetime
+import logging
+from contextlib import nullcontext
+
+from django.utils import timezone
 from huey import crontab
-from huey.contrib.djhuey import db_periodic_task
+from huey.contrib.djhuey import HUEY, db_periodic_task, db_task
+from huey.exceptions import TaskLockedException
 
 from homeschool.reports import pdfs
 from homeschool.reports.models import Bundle
 
+logger = logging.getLogger(__name__)
+
+# A pending bundle that hasn't been built in this time is assumed to be stuck
+# (e.g., its task was lost when a worker restarted).
+STUCK_BUNDLE_AGE = datetime.timedelta(minutes=30)
+
+
+@db_task()
+def build_bundle(bundle_id):
+    """Build a pending PDF bundle.
+
+    The lock keeps a user request and the recovery sweep
+    from building the same bundle at the same time.
+    An existing bundle is passed along so its unchanged reports can be reused.
+    """
+    try:
+        with HUEY.lock_task(f"build-bundle-{bundle_id}"):
+            bundle = (
+                Bundle.objects.pending()
+                .filter(id=bundle_id)
+                .select_related("school_year")
+                .first()
+            )
+            if bundle is None:
+                return
+
+            logger.info("Building bundle %s for %s.", bundle.id, bundle.school_year)
+            with (
+                _open_previous_report(bundle) as previous_bundle,
+                pdfs.make_bundle(
+                    bundle.school_year, previous_bundle, bundle
+                ) as report_file,
+            ):
+                bundle.store(report_file)
+    except TaskLockedException:
+        logger.info("Bundle %s is already building.", bundle_id)
+
+
+def _open_previous_report(bundle):
+    """Open the report of an earlier build so its PDFs can be reused.
+
+    A report that is gone from storage can't be reused
+    so the bundle is built from scratch.
+    """
+    if not bundle.report:
+        return nullcontext()
+    try:
+        return bundle.report.open("rb")
+    except FileNotFoundError:
+        return nullcontext()
+
 
 @db_periodic_task(crontab(minute="0"))
-def build_bundle():
-    """Build any pending PDF bundles."""
-    for bundle in Bundle.objects.pending().select_related("school_year"):
-        print(f"Processing {bundle.school_year.id}...")
-        report_data = pdfs.make_bundle(bundle.school_year)
-        bundle.store(report_data)
+def requeue_stuck_bundles():
+    """Queue any pending bundles that weren't built after they were requested."""
+    cutoff = timezone.now() - STUCK_BUNDLE_AGE
+    stuck_bundles = Bundle.objects.pending().filter(updated_at__lt=cutoff)
+    for bundle_id in stuck_bundles.values_list("id", flat=True):
+        logger.warning("Requeuing stuck bundle %s.", bundle_id)
+        build_bundle(bundle_id)
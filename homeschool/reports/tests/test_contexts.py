@@ -1,8 +1,115 @@
-from homeschool.reports.contexts import CourseworkReportContext
-from homeschool.students.tests.factories import CourseworkFactory, EnrollmentFactory
+import copy
+import datetime
+
+from homeschool.courses.tests.factories import (
+    CourseFactory,
+    CourseResourceFactory,
+    CourseTaskFactory,
+)
+from homeschool.reports.contexts import (
+    AttendanceReportContext,
+    CourseworkReportContext,
+    ProgressReportContext,
+    ResourceReportContext,
+    SchoolYearReportData,
+)
+from homeschool.schools.models import SchoolYear
+from homeschool.schools.tests.factories import SchoolBreakFactory, SchoolYearFactory
+from homeschool.students.tests.factories import (
+    CourseworkFactory,
+    EnrollmentFactory,
+    GradeFactory,
+)
 from homeschool.test import TestCase
 
 
+class TestAttendanceReportContext(TestCase):
+    def test_counts_distinct_dates(self):
+        """Each date with work in the report counts once."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        task = CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        other_task = CourseTaskFactory(course=task.course)
+        day = school_year.start_date + datetime.timedelta(days=1)
+        CourseworkFactory(
+            student=enrollment.student, course_task=task, completed_date=day
+        )
+        CourseworkFactory(
+            student=enrollment.student, course_task=other_task, completed_date=day
+        )
+        # Work after today isn't in the report.
+        future_task = CourseTaskFactory(course=task.course)
+        CourseworkFactory(
+            student=enrollment.student,
+            course_task=future_task,
+            completed_date=day + datetime.timedelta(days=5),
+        )
+
+        context = AttendanceReportContext.from_enrollment(
+            enrollment, day + datetime.timedelta(days=2)
+        )
+
+        assert context.total_days_attended == 1
+        assert len(context.school_dates) == 4
+        assert [school_date["attended"] for school_date in context.school_dates] == [
+            False,
+            True,
+            False,
+            False,
+        ]
+
+    def test_school_dates(self):
+        """The school dates build a row for each date when accessed."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        start_date = school_year.start_date
+        SchoolBreakFactory(
+            school_year=school_year, start_date=start_date, end_date=start_date
+        )
+        today = start_date + datetime.timedelta(days=9)
+
+        context = AttendanceReportContext.from_enrollment(enrollment, today)
+
+        school_dates = context.school_dates
+        assert len(school_dates) == 10
+        assert school_dates[0] == {
+            "date": start_date,
+            "is_school_day": school_year.runs_on(start_date),
+            "is_break": True,
+            "attended": False,
+        }
+        assert school_dates[-1]["date"] == today
+        assert [row["date"] for row in school_dates[1:3]] == [
+            start_date + datetime.timedelta(days=1),
+            start_date + datetime.timedelta(days=2),
+        ]
+        assert list(school_dates)[9] == school_dates[9]
+        with self.assertRaises(IndexError):
+            school_dates[10]
+
+    def test_shared_by_asdict(self):
+        """The read only school dates are not copied."""
+        enrollment = EnrollmentFactory()
+        context = AttendanceReportContext.from_enrollment(
+            enrollment, enrollment.grade_level.school_year.start_date
+        )
+
+        assert copy.deepcopy(context.school_dates) is context.school_dates
+
+    def test_no_dates(self):
+        """A school year that hasn't started has no dates."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+
+        context = AttendanceReportContext.from_enrollment(
+            enrollment, school_year.start_date - datetime.timedelta(days=1)
+        )
+
+        assert not context.school_dates
+        assert list(context.school_dates) == []
+        assert context.total_days_attended == 0
+
+
 class TestCourseworkReportContext(TestCase):
     def test_course_has_tasks(self):
         """The courses have coursework tasks annotated to each course."""
@@ -18,3 +125,103 @@ class TestCourseworkReportContext(TestCase):
         expected_tasks = [(coursework.course_task, coursework)]
         course.tasks = expected_tasks
         assert context.courses == [course]
+
+
+class TestSchoolYearReportData(TestCase):
+    def make_enrollment(self, school_year):
+        """Make an enrollment with coursework, grades, and resources."""
+        enrollment = EnrollmentFactory(grade_level__school_year=school_year)
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        other_course = CourseFactory(grade_levels=[enrollment.grade_level])
+        for task_course in [course, other_course]:
+            task = CourseTaskFactory(course=task_course)
+            CourseworkFactory(
+                student=enrollment.student,
+                course_task=task,
+                completed_date=school_year.start_date,
+            )
+            GradeFactory(
+                student=enrollment.student,
+                graded_work__course_task=task,
+                score=80,
+            )
+            CourseResourceFactory(course=task_course)
+        return enrollment
+
+    def test_matches_enrollment_contexts(self):
+        """The contexts match the contexts built for a single enrollment."""
+        enrollment = self.make_enrollment(SchoolYearFactory())
+        school_year = enrollment.grade_level.school_year
+        other_enrollment = self.make_enrollment(school_year)
+        today = school_year.start_date + datetime.timedelta(days=3)
+
+        report_data = SchoolYearReportData(school_year)
+
+        assert set(report_data.enrollments) == {enrollment, other_enrollment}
+        for enrollment in report_data.enrollments:
+            attendance = report_data.get_attendance_context(enrollment, today)
+            expected_attendance = AttendanceReportContext.from_enrollment(
+                enrollment, today
+            )
+            assert list(attendance.school_dates) == list(
+                expected_attendance.school_dates
+            )
+            assert attendance.total_days_attended == 1
+
+            coursework = report_data.get_coursework_context(enrollment)
+            expected_coursework = CourseworkReportContext.from_enrollment(enrollment)
+            assert coursework.courses == expected_coursework.courses
+            assert [course.tasks for course in coursework.courses] == [
+                course.tasks for course in expected_coursework.courses
+            ]
+
+            progress = report_data.get_progress_context(enrollment)
+            expected_progress = ProgressReportContext.from_enrollment(enrollment)
+            assert progress == expected_progress
+            assert [
+                grade.coursework
+                for course_info in progress.courses
+                for grade in course_info["grades"]
+            ] == [
+                grade.coursework
+                for course_info in expected_progress.courses
+                for grade in course_info["grades"]
+            ]
+
+            resource = report_data.get_resource_context(enrollment)
+            expected_resource = ResourceReportContext.from_enrollment(enrollment)
+            assert resource == expected_resource
+
+    def test_constant_queries(self):
+        """The number of queries doesn't grow with the enrollments."""
+        enrollment = self.make_enrollment(SchoolYearFactory())
+        school_year = SchoolYear.objects.get(id=enrollment.grade_level.school_year_id)
+        today = school_year.start_date
+
+        with self.assertNumQueries(6):
+            self.build_contexts(SchoolYearReportData(school_year), today)
+
+        for _ in range(3):
+            self.make_enrollment(school_year)
+        school_year = SchoolYear.objects.get(id=school_year.id)
+        with self.assertNumQueries(6):
+            self.build_contexts(SchoolYearReportData(school_year), today)
+
+    def build_contexts(self, report_data, today):
+        for enrollment in report_data.enrollments:
+            report_data.get_attendance_context(enrollment, today)
+            report_data.get_coursework_context(enrollment)
+            report_data.get_progress_context(enrollment)
+            report_data.get_resource_context(enrollment)
+
+    def test_courses_are_not_shared(self):
+        """Students in the same grade level get their own coursework."""
+        enrollment = self.make_enrollment(SchoolYearFactory())
+        other_enrollment = EnrollmentFactory(grade_level=enrollment.grade_level)
+        report_data = SchoolYearReportData(enrollment.grade_level.school_year)
+
+        context = report_data.get_coursework_context(enrollment)
+        other_context = report_data.get_coursework_context(other_enrollment)
+
+        assert all(course.tasks for course in context.courses)
+        assert not any(course.tasks for course in other_context.courses)
@@ -1,3 +1,8 @@
+import datetime
+import io
+
+import time_machine
+
 from homeschool.reports.models import Bundle
 from homeschool.reports.tests.factories import BundleFactory
 from homeschool.test import TestCase
@@ -17,9 +22,96 @@ class TestBundle(TestCase):
         bundle = BundleFactory(status=Bundle.Status.PENDING)
         report_data = b"report"
 
-        bundle.store(report_data)
+        bundle.store(io.BytesIO(report_data))
 
         bundle.refresh_from_db()
         assert bundle.status == Bundle.Status.COMPLETE
         with bundle.report.open() as f:
             assert f.read() == report_data
+        assert bundle.build_seconds is None
+
+    def test_store_build_seconds(self):
+        """Storing the report records how long the build took."""
+        with time_machine.travel("2024-01-10 12:00:00", tick=False) as traveller:
+            bundle = BundleFactory(status=Bundle.Status.PENDING)
+            bundle.start_build(total_reports=4)
+            traveller.shift(datetime.timedelta(seconds=90))
+
+            bundle.store(io.BytesIO(b"report"))
+
+        bundle.refresh_from_db()
+        assert bundle.build_seconds == 90.0
+
+    def test_start_build(self):
+        """Starting a build resets the progress."""
+        bundle = BundleFactory(
+            build_seconds=10.0,
+            completed_reports=3,
+            report_timings=[{"name": "a.pdf"}],
+        )
+
+        bundle.start_build(total_reports=8)
+
+        bundle.refresh_from_db()
+        assert bundle.build_started_at is not None
+        assert bundle.build_seconds is None
+        assert bundle.total_reports == 8
+        assert bundle.completed_reports == 0
+        assert bundle.report_timings == []
+
+    def test_track_report(self):
+        """Each built report advances the progress."""
+        bundle = BundleFactory()
+        bundle.start_build(total_reports=4)
+
+        bundle.track_report("a.pdf", 1.5, 2048, reused=False)
+
+        bundle.refresh_from_db()
+        assert bundle.completed_reports == 1
+        assert bundle.report_timings == [
+            {"name": "a.pdf", "seconds": 1.5, "size": 2048, "reused": False}
+        ]
+        assert bundle.progress_percent == 25
+
+    def test_progress_percent_no_reports(self):
+        """A bundle without any reports has no progress."""
+        bundle = BundleFactory(total_reports=0)
+
+        assert bundle.progress_percent == 0
+
+    def test_slowest_report(self):
+        """The slowest report is the one with the longest render time."""
+        bundle = BundleFactory(
+            report_timings=[
+                {"name": "a.pdf", "seconds": 1.0, "size": 1, "reused": False},
+                {"name": "b.pdf", "seconds": 3.0, "size": 1, "reused": False},
+            ]
+        )
+
+        assert bundle.slowest_report == {
+            "name": "b.pdf",
+            "seconds": 3.0,
+            "size": 1,
+            "reused": False,
+        }
+        assert BundleFactory().slowest_report is None
+
+    def test_recreate(self):
+        """A built bundle is queued back up."""
+        bundle = BundleFactory(status=Bundle.Status.COMPLETE)
+
+        queued = bundle.recreate()
+
+        assert queued
+        assert bundle.status == Bundle.Status.PENDING
+        bundle.refresh_from_db()
+        assert bundle.status == Bundle.Status.PENDING
+
+    def test_recreate_pending(self):
+        """A pending bundle isn't queued again."""
+        bundle = BundleFactory(status=Bundle.Status.PENDING)
+
+        queued = bundle.recreate()
+
+        assert not queued
+        assert bundle.status == Bundle.Status.PENDING
@@ -1,9 +1,20 @@
 import io
+import os
+import pickle
+import re
+import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 
-from homeschool.reports import pdfs
+from django.conf import settings
+from django.test import override_settings
+
+from homeschool.courses.tests.factories import CourseTaskFactory
+from homeschool.reports import pdfs, rendering
+from homeschool.reports.tests.factories import BundleFactory
 from homeschool.schools.tests.factories import SchoolYearFactory
-from homeschool.students.tests.factories import EnrollmentFactory
+from homeschool.students.tests.factories import CourseworkFactory, EnrollmentFactory
 from homeschool.test import TestCase
 
 
@@ -13,7 +24,344 @@ class TestMakeBundle(TestCase):
         school_year = SchoolYearFactory()
         EnrollmentFactory(grade_level__school_year=school_year)
 
-        zip_data = pdfs.make_bundle(school_year)
-
-        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
+        with (
+            pdfs.make_bundle(school_year) as bundle_file,
+            zipfile.ZipFile(bundle_file) as zip_file,
+        ):
             assert zip_file.testzip() is None
+
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_writes_reports_in_order(self, mock_write_pdf):
+        """Each report is written to the zip under the student's name."""
+        school_year = SchoolYearFactory()
+        enrollment = EnrollmentFactory(grade_level__school_year=school_year)
+        mock_write_pdf.return_value = b"pdf"
+
+        with (
+            pdfs.make_bundle(school_year) as bundle_file,
+            zipfile.ZipFile(bundle_file) as zip_file,
+        ):
+            names = zip_file.namelist()
+        prefix = f"{school_year} - {enrollment.student}"
+        assert names == [
+            f"{prefix} Attendance Report.pdf",
+            f"{prefix} Courses Report.pdf",
+            f"{prefix} Progress Report.pdf",
+            f"{prefix} Resource Report.pdf",
+        ]
+        assert mock_write_pdf.call_count == 4
+
+    @override_settings(REPORTS_BUNDLE_WORKERS=2)
+    @mock.patch("homeschool.reports.pdfs._get_executor", autospec=True)
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_parallel(self, mock_write_pdf, mock_get_executor):
+        """The PDFs are written by a pool of workers."""
+        school_year = SchoolYearFactory()
+        EnrollmentFactory(grade_level__school_year=school_year)
+        EnrollmentFactory(grade_level__school_year=school_year)
+        mock_write_pdf.side_effect = lambda rendered, *args: rendered.encode()
+        mock_get_executor.return_value = ThreadPoolExecutor(max_workers=2)
+
+        with (
+            pdfs.make_bundle(school_year) as bundle_file,
+            zipfile.ZipFile(bundle_file) as zip_file,
+        ):
+            names = zip_file.namelist()
+            first_report = zip_file.read(names[0])
+
+        mock_get_executor.assert_called_once_with(2)
+        assert mock_write_pdf.call_count == 8
+        assert len(names) == 8
+        assert b"Attendance" in first_report
+
+    @mock.patch("homeschool.reports.pdfs.tempfile.SpooledTemporaryFile")
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_closes_file_on_error(self, mock_write_pdf, mock_spooled_file):
+        """A failed render doesn't leak the temporary file."""
+        school_year = SchoolYearFactory()
+        EnrollmentFactory(grade_level__school_year=school_year)
+        mock_write_pdf.side_effect = ValueError("boom")
+        bundle_file = io.BytesIO()
+        mock_spooled_file.return_value = bundle_file
+
+        with self.assertRaises(ValueError):
+            pdfs.make_bundle(school_year)
+
+        assert bundle_file.closed
+
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_reuses_unchanged_reports(self, mock_write_pdf):
+        """Only the reports with a changed fingerprint are written again."""
+        school_year = SchoolYearFactory()
+        enrollment = EnrollmentFactory(grade_level__school_year=school_year)
+        task = CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        mock_write_pdf.return_value = b"first"
+        previous_bundle = pdfs.make_bundle(school_year)
+        self.addCleanup(previous_bundle.close)
+        CourseworkFactory(student=enrollment.student, course_task=task)
+        mock_write_pdf.reset_mock()
+        mock_write_pdf.return_value = b"second"
+
+        with (
+            pdfs.make_bundle(school_year, previous_bundle) as bundle_file,
+            zipfile.ZipFile(bundle_file) as zip_file,
+        ):
+            pdfs_by_name = {name: zip_file.read(name) for name in zip_file.namelist()}
+
+        prefix = f"{school_year} - {enrollment.student}"
+        assert pdfs_by_name[f"{prefix} Courses Report.pdf"] == b"second"
+        assert pdfs_by_name[f"{prefix} Resource Report.pdf"] == b"first"
+        assert mock_write_pdf.call_count < 4
+
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_weasyprint_upgrade_rewrites_reports(self, mock_write_pdf):
+        """A new WeasyPrint version writes every report again."""
+        school_year = SchoolYearFactory()
+        EnrollmentFactory(grade_level__school_year=school_year)
+        mock_write_pdf.return_value = b"first"
+        with mock.patch("homeschool.reports.pdfs.WEASYPRINT_VERSION", "1.0"):
+            previous_bundle = pdfs.make_bundle(school_year)
+        self.addCleanup(previous_bundle.close)
+        mock_write_pdf.reset_mock()
+        mock_write_pdf.return_value = b"second"
+
+        with (
+            mock.patch("homeschool.reports.pdfs.WEASYPRINT_VERSION", "2.0"),
+            pdfs.make_bundle(school_year, previous_bundle) as bundle_file,
+            zipfile.ZipFile(bundle_file) as zip_file,
+        ):
+            reports = [zip_file.read(name) for name in zip_file.namelist()]
+
+        assert mock_write_pdf.call_count == 4
+        assert reports == [b"second"] * 4
+
+    @override_settings(REPORTS_BUNDLE_WORKERS=2)
+    @mock.patch("homeschool.reports.pdfs._get_executor", autospec=True)
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_parallel_reuses_reports(self, mock_write_pdf, mock_get_executor):
+        """The worker pool skips the reports from the previous bundle."""
+        school_year = SchoolYearFactory()
+        EnrollmentFactory(grade_level__school_year=school_year)
+        mock_get_executor.side_effect = lambda workers: ThreadPoolExecutor(workers)
+        mock_write_pdf.return_value = b"first"
+        previous_bundle = pdfs.make_bundle(school_year)
+        self.addCleanup(previous_bundle.close)
+        mock_write_pdf.reset_mock()
+
+        with (
+            pdfs.make_bundle(school_year, previous_bundle) as bundle_file,
+            zipfile.ZipFile(bundle_file) as zip_file,
+        ):
+            reports = [zip_file.read(name) for name in zip_file.namelist()]
+
+        mock_write_pdf.assert_not_called()
+        assert reports == [b"first"] * 4
+
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_tracks_progress(self, mock_write_pdf):
+        """The build progress and timings are recorded on the bundle."""
+        school_year = SchoolYearFactory()
+        enrollment = EnrollmentFactory(grade_level__school_year=school_year)
+        bundle = BundleFactory(school_year=school_year)
+        mock_write_pdf.return_value = b"pdf"
+
+        with pdfs.make_bundle(school_year, bundle=bundle):
+            pass
+
+        bundle.refresh_from_db()
+        assert bundle.total_reports == 4
+        assert bundle.completed_reports == 4
+        timing = bundle.report_timings[0]
+        assert (
+            timing["name"]
+            == f"{school_year} - {enrollment.student} Attendance Report.pdf"
+        )
+        assert timing["size"] == 3
+        assert not timing["reused"]
+
+    @override_settings(REPORTS_BUNDLE_WORKERS=2)
+    @mock.patch("homeschool.reports.pdfs._get_executor", autospec=True)
+    @mock.patch("homeschool.reports.pdfs.rendering.write_pdf", autospec=True)
+    def test_tracks_reused_reports(self, mock_write_pdf, mock_get_executor):
+        """Reports from the previous bundle are tracked as reused."""
+        school_year = SchoolYearFactory()
+        EnrollmentFactory(grade_level__school_year=school_year)
+        bundle = BundleFactory(school_year=school_year)
+        mock_get_executor.side_effect = lambda workers: ThreadPoolExecutor(workers)
+        mock_write_pdf.return_value = b"pdf"
+        previous_bundle = pdfs.make_bundle(school_year, bundle=bundle)
+        self.addCleanup(previous_bundle.close)
+        bundle.refresh_from_db()
+        assert not any(timing["reused"] for timing in bundle.report_timings)
+
+        with pdfs.make_bundle(school_year, previous_bundle, bundle):
+            pass
+
+        bundle.refresh_from_db()
+        assert bundle.completed_reports == 4
+        assert all(timing["reused"] for timing in bundle.report_timings)
+        assert all(timing["seconds"] == 0.0 for timing in bundle.report_timings)
+
+
+class TestPreviousBundle(TestCase):
+    def test_get(self):
+        """A PDF is found by the fingerprint in its zip entry comment."""
+        bundle_file = io.BytesIO()
+        with zipfile.ZipFile(bundle_file, "w") as zip_file:
+            zip_info = zipfile.ZipInfo("report.pdf")
+            zip_info.comment = b"abc123"
+            zip_file.writestr(zip_info, b"pdf")
+            zip_file.writestr("other.pdf", b"other pdf")
+
+        with pdfs.PreviousBundle(bundle_file) as previous:
+            assert previous.get("abc123") == b"pdf"
+            assert previous.get("") is None
+            assert previous.get("def456") is None
+
+    def test_not_a_zip(self):
+        """A file that isn't a zip has no reports to reuse."""
+        with pdfs.PreviousBundle(io.BytesIO(b"not a zip")) as previous:
+            assert previous.get("abc123") is None
+
+    def test_no_bundle(self):
+        """Without a previous bundle, there is nothing to reuse."""
+        with pdfs.PreviousBundle(None) as previous:
+            assert previous.get("abc123") is None
+
+
+class TestGetExecutor(TestCase):
+    def test_process_pool(self):
+        """The executor is a bounded process pool."""
+        executor = pdfs._get_executor(3)
+
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert executor._max_workers == 3  # type: ignore[attr-defined]
+        executor.shutdown()
+
+    def test_workers_get_stylesheets(self):
+        """Each worker starts with the CSS of every renderer."""
+        with pdfs._get_executor(1) as executor:
+            css_contents = executor.submit(rendering.get_css_contents).result()
+
+        assert css_contents == {
+            "site": pdfs._get_css_content(),
+            "print": pdfs._get_static_css("report-print.css"),
+        }
+
+
+class TestGetCSSContent(TestCase):
+    def setUp(self):
+        pdfs._css_cache.clear()
+        self.addCleanup(pdfs._css_cache.clear)
+
+    def test_cached_until_modified(self):
+        """The CSS is only read again when site.css changes."""
+        css_file = tempfile.NamedTemporaryFile("w", suffix=".css", delete=False)
+        self.addCleanup(os.remove, css_file.name)
+        with css_file:
+            css_file.write("body { color: red; }")
+
+        with mock.patch("homeschool.reports.pdfs.finders.find") as mock_find:
+            mock_find.return_value = css_file.name
+            css_content = pdfs._get_css_content()
+            stat = os.stat(css_file.name)
+            with open(css_file.name, "w") as f:
+                f.write("body { color: blue; }")
+            # Keep the same modification time to prove that the file isn't read.
+            os.utime(css_file.name, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            cached_css_content = pdfs._get_css_content()
+            os.utime(css_file.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+            modified_css_content = pdfs._get_css_content()
+
+        assert css_content.startswith("body { color: red; }")
+        assert "font-family: Arial" in css_content
+        assert cached_css_content is css_content
+        assert modified_css_content.startswith("body { color: blue; }")
+
+
+class TestGetRenderer(TestCase):
+    def test_site_renderer(self):
+        """A report uses the full site stylesheet by default."""
+        renderer = pdfs.get_renderer("reports/progress_report_pdf.html")
+
+        assert isinstance(renderer, rendering.WeasyPrintRenderer)
+        assert renderer.name == "site"
+        assert rendering.get_css_contents()["site"] == pdfs._get_css_content()
+
+    @override_settings(
+        REPORTS_PDF_RENDERERS={"reports/resource_report_pdf.html": "print"}
+    )
+    def test_configured_renderer(self):
+        """A report can be configured to use another renderer."""
+        renderer = pdfs.get_renderer("reports/resource_report_pdf.html")
+
+        assert isinstance(renderer, rendering.WeasyPrintRenderer)
+        assert renderer.name == "print"
+        assert rendering.get_css_contents()["print"] == pdfs._get_static_css(
+            "report-print.css"
+        )
+        assert (
+            renderer.fingerprint
+            != pdfs.get_renderer("reports/progress_report_pdf.html").fingerprint
+        )
+
+    def test_print_stylesheet_covers_templates(self):
+        """The print stylesheet styles every class of the reports that use it."""
+        css_content = pdfs._get_static_css("report-print.css")
+
+        for template_name in settings.REPORTS_PDF_RENDERERS:
+            template_path = settings.BASE_DIR / "templates" / template_name
+            for classes in re.findall(r'class="([^"]*)"', template_path.read_text()):
+                for css_class in classes.split():
+                    selector = "." + css_class.replace("/", "\\/") + " "
+                    assert selector in css_content, f"{css_class} in {template_name}"
+
+
+class TestPDFRenderer(TestCase):
+    def test_write_pdf(self):
+        """A renderer must write PDFs."""
+        with self.assertRaises(TypeError):
+            rendering.PDFRenderer()  # type: ignore[abstract]
+
+    @mock.patch("homeschool.reports.rendering.write_pdf", autospec=True)
+    def test_times_pdf(self, mock_write_pdf):
+        """The PDF data comes back with the time it took to write."""
+        mock_write_pdf.return_value = b"pdf"
+        renderer = rendering.WeasyPrintRenderer("test", "body {}")
+
+        pdf, seconds = renderer.write_timed_pdf("<p>Hi</p>")
+
+        assert pdf == b"pdf"
+        assert seconds >= 0
+        mock_write_pdf.assert_called_once_with(
+            "<p>Hi</p>", "test", renderer.fingerprint
+        )
+
+    def test_picklable(self):
+        """A renderer can be sent to the process pool without its CSS."""
+        renderer = rendering.WeasyPrintRenderer("test", "body { color: red; }")
+
+        pickled_renderer = pickle.dumps(renderer)
+        unpickled_renderer = pickle.loads(pickled_renderer)  # noqa: S301
+
+        assert b"color: red" not in pickled_renderer
+        assert unpickled_renderer.name == "test"
+        assert unpickled_renderer.fingerprint == renderer.fingerprint
+
+
+class TestGetStylesheet(TestCase):
+    def setUp(self):
+        rendering._stylesheets.clear()
+        self.addCleanup(rendering._stylesheets.clear)
+
+    def test_parsed_once(self):
+        """Each renderer's stylesheet is parsed once until its CSS changes."""
+        red = rendering.WeasyPrintRenderer("test", "body { color: red; }")
+        other = rendering.WeasyPrintRenderer("other", "body { color: red; }")
+
+        stylesheet = rendering.get_stylesheet("test", red.fingerprint)
+
+        assert rendering.get_stylesheet("test", red.fingerprint) is stylesheet
+        assert rendering.get_stylesheet("other", other.fingerprint) is not stylesheet
+        blue = rendering.WeasyPrintRenderer("test", "body { color: blue; }")
+        assert rendering.get_stylesheet("test", blue.fingerprint) is not stylesheet
@@ -0,0 +1,166 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from homeschool.courses.tests.factories import (
+    CourseFactory,
+    CourseResourceFactory,
+    CourseTaskFactory,
+    GradedWorkFactory,
+)
+from homeschool.reports import report_cache
+from homeschool.schools.tests.factories import SchoolBreakFactory
+from homeschool.students.tests.factories import (
+    CourseworkFactory,
+    EnrollmentFactory,
+    GradeFactory,
+)
+from homeschool.test import TestCase
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "report-cache-tests",
+        }
+    }
+)
+class TestReportCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_etag_is_stable(self):
+        """An unchanged report has the same ETag."""
+        enrollment = EnrollmentFactory()
+        CourseFactory(grade_levels=[enrollment.grade_level])
+        etag = report_cache.get_etag("progress", enrollment)
+
+        with self.assertNumQueries(1):
+            assert report_cache.get_etag("progress", enrollment) == etag
+
+    def test_etag_parts(self):
+        """The extra parts and the report name change the ETag."""
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("attendance", enrollment, datetime.date.today())
+
+        assert etag != report_cache.get_etag(
+            "attendance", enrollment, datetime.date.today() - datetime.timedelta(1)
+        )
+        assert etag != report_cache.get_etag("resource", enrollment)
+
+    def test_html(self):
+        """Report HTML is stored under the ETag."""
+        assert report_cache.get_html("an-etag") is None
+
+        report_cache.set_html("an-etag", "<h1>Report</h1>")
+
+        assert report_cache.get_html("an-etag") == "<h1>Report</h1>"
+
+    def test_invalidated_by_coursework(self):
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("attendance", enrollment)
+
+        CourseworkFactory(student=enrollment.student)
+
+        assert report_cache.get_etag("attendance", enrollment) != etag
+
+    def test_invalidated_by_grade(self):
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("progress", enrollment)
+
+        GradeFactory(student=enrollment.student)
+
+        assert report_cache.get_etag("progress", enrollment) != etag
+
+    def test_invalidated_by_student(self):
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("progress", enrollment)
+
+        enrollment.student.first_name = "Changed"
+        enrollment.student.save()
+
+        assert report_cache.get_etag("progress", enrollment) != etag
+
+    def test_invalidated_by_school_year(self):
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        etag = report_cache.get_etag("attendance", enrollment)
+
+        school_year.end_date += datetime.timedelta(days=1)
+        school_year.save()
+
+        assert report_cache.get_etag("attendance", enrollment) != etag
+
+    def test_invalidated_by_school_break(self):
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("attendance", enrollment)
+
+        SchoolBreakFactory(school_year=enrollment.grade_level.school_year)
+
+        assert report_cache.get_etag("attendance", enrollment) != etag
+
+    def test_invalidated_by_school_break_students(self):
+        enrollment = EnrollmentFactory()
+        school_break = SchoolBreakFactory(
+            school_year=enrollment.grade_level.school_year
+        )
+        etag = report_cache.get_etag("attendance", enrollment)
+
+        school_break.students.add(enrollment.student)
+
+        second_etag = report_cache.get_etag("attendance", enrollment)
+        assert second_etag != etag
+
+        enrollment.student.schoolbreak_set.remove(school_break)
+
+        assert report_cache.get_etag("attendance", enrollment) != second_etag
+
+    def test_invalidated_by_grade_level(self):
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("resource", enrollment)
+
+        enrollment.grade_level.name = "Changed"
+        enrollment.grade_level.save()
+
+        assert report_cache.get_etag("resource", enrollment) != etag
+
+    def test_invalidated_by_new_course(self):
+        enrollment = EnrollmentFactory()
+        etag = report_cache.get_etag("resource", enrollment)
+
+        CourseFactory(grade_levels=[enrollment.grade_level])
+
+        assert report_cache.get_etag("resource", enrollment) != etag
+
+    def test_invalidated_by_course(self):
+        enrollment = EnrollmentFactory()
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        etag = report_cache.get_etag("resource", enrollment)
+
+        course.name = "Changed"
+        course.save()
+
+        assert report_cache.get_etag("resource", enrollment) != etag
+
+    def test_invalidated_by_course_task(self):
+        enrollment = EnrollmentFactory()
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        GradedWorkFactory(course_task=task)
+        etag = report_cache.get_etag("progress", enrollment)
+
+        task.description = "Changed"
+        task.save()
+
+        assert report_cache.get_etag("progress", enrollment) != etag
+
+    def test_invalidated_by_course_resource(self):
+        enrollment = EnrollmentFactory()
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        etag = report_cache.get_etag("resource", enrollment)
+
+        CourseResourceFactory(course=course)
+
+        assert report_cache.get_etag("resource", enrollment) != etag
@@ -1,7 +1,12 @@
+import datetime
+import io
 from unittest import mock
 
+from django.utils import timezone
+from huey.contrib.djhuey import HUEY
+
 from homeschool.reports.models import Bundle
-from homeschool.reports.tasks import build_bundle
+from homeschool.reports.tasks import build_bundle, requeue_stuck_bundles
 from homeschool.reports.tests.factories import BundleFactory
 from homeschool.test import TestCase
 
@@ -9,13 +14,84 @@ from homeschool.test import TestCase
 class TestBuildBundle(TestCase):
     @mock.patch("homeschool.reports.tasks.pdfs.make_bundle", autospec=True)
     def test_completes_pending_bundle(self, mock_make_bundle):
-        """Any pending bundles are processed."""
-        bundle = BundleFactory(status=Bundle.Status.PENDING)
-        BundleFactory(status=Bundle.Status.COMPLETE)
-        mock_make_bundle.return_value = b"report"
+        """A pending bundle is processed."""
+        bundle = BundleFactory(status=Bundle.Status.PENDING, report=None)
+        mock_make_bundle.return_value = io.BytesIO(b"report")
 
-        build_bundle()
+        build_bundle(bundle.id)
 
-        mock_make_bundle.assert_called_once_with(bundle.school_year)
+        mock_make_bundle.assert_called_once_with(bundle.school_year, None, bundle)
         bundle.refresh_from_db()
         assert bundle.status == Bundle.Status.COMPLETE
+        assert mock_make_bundle.return_value.closed
+
+    @mock.patch("homeschool.reports.tasks.pdfs.make_bundle", autospec=True)
+    def test_passes_previous_bundle(self, mock_make_bundle):
+        """A rebuilt bundle gets its previous report to reuse."""
+        bundle = BundleFactory(status=Bundle.Status.PENDING, report__data=b"previous")
+        previous_name = bundle.report.name
+        mock_make_bundle.return_value = io.BytesIO(b"report")
+
+        build_bundle(bundle.id)
+
+        previous_bundle = mock_make_bundle.call_args.args[1]
+        assert previous_bundle.name == previous_name
+
+    @mock.patch("homeschool.reports.tasks.pdfs.make_bundle", autospec=True)
+    def test_missing_previous_bundle(self, mock_make_bundle):
+        """A previous report that is gone from storage is not reused."""
+        bundle = BundleFactory(status=Bundle.Status.PENDING, report__data=b"previous")
+        bundle.report.storage.delete(bundle.report.name)
+        mock_make_bundle.return_value = io.BytesIO(b"report")
+
+        build_bundle(bundle.id)
+
+        mock_make_bundle.assert_called_once_with(bundle.school_year, None, bundle)
+        bundle.refresh_from_db()
+        assert bundle.status == Bundle.Status.COMPLETE
+
+    @mock.patch("homeschool.reports.tasks.pdfs.make_bundle", autospec=True)
+    def test_skips_complete_bundle(self, mock_make_bundle):
+        """A bundle that was already built is not built again."""
+        bundle = BundleFactory(status=Bundle.Status.COMPLETE)
+
+        build_bundle(bundle.id)
+
+        mock_make_bundle.assert_not_called()
+
+    @mock.patch("homeschool.reports.tasks.pdfs.make_bundle", autospec=True)
+    def test_skips_building_bundle(self, mock_make_bundle):
+        """A bundle that is building in another task is not built twice."""
+        bundle = BundleFactory(status=Bundle.Status.PENDING)
+
+        with (
+            HUEY.lock_task(f"build-bundle-{bundle.id}"),
+            self.assertLogs("homeschool.reports.tasks", level="INFO") as logs,
+        ):
+            build_bundle(bundle.id)
+
+        mock_make_bundle.assert_not_called()
+        assert logs.output == [
+            f"INFO:homeschool.reports.tasks:Bundle {bundle.id} is already building."
+        ]
+
+
+class TestRequeueStuckBundles(TestCase):
+    @mock.patch("homeschool.reports.tasks.build_bundle", autospec=True)
+    def test_requeues_stuck_bundles(self, mock_build_bundle):
+        """Only the pending bundles that were waiting too long are queued."""
+        stuck_bundle = BundleFactory(status=Bundle.Status.PENDING)
+        BundleFactory(status=Bundle.Status.PENDING)
+        old_bundle = BundleFactory(status=Bundle.Status.COMPLETE)
+        long_ago = timezone.now() - datetime.timedelta(hours=1)
+        Bundle.objects.filter(id__in=[stuck_bundle.id, old_bundle.id]).update(
+            updated_at=long_ago
+        )
+
+        with self.assertLogs("homeschool.reports.tasks") as logs:
+            requeue_stuck_bundles()
+
+        mock_build_bundle.assert_called_once_with(stuck_bundle.id)
+        assert logs.records[0].getMessage() == (
+            f"Requeuing stuck bundle {stuck_bundle.id}."
+        )
@@ -1,6 +1,9 @@
 import datetime
+from unittest import mock
 
 import time_machine
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils import timezone
 
 from homeschool.courses.tests.factories import CourseFactory, CourseResourceFactory
@@ -26,6 +29,27 @@ class TestPDFsDashboard(TestCase):
 
         assert response.status_code == 200
 
+    def test_bundle_timings(self):
+        """The dashboard shows the build progress and timings of bundles."""
+        user = UserFactory(is_staff=True)
+        bundle = BundleFactory(
+            total_reports=4,
+            completed_reports=2,
+            build_seconds=12.5,
+            report_timings=[
+                {"name": "Fast.pdf", "seconds": 0.5, "size": 1024, "reused": False},
+                {"name": "Slow.pdf", "seconds": 9.25, "size": 2048, "reused": False},
+            ],
+        )
+
+        with self.login(user):
+            self.get_check_200("office:pdfs:dashboard")
+
+        assert list(self.get_context("bundles")) == [bundle]
+        self.assertResponseContains("2 / 4 (50%)", html=False)
+        self.assertResponseContains("12.5", html=False)
+        self.assertResponseContains("Slow.pdf (9.25s, 2.0\xa0KB)", html=False)
+
 
 class TestReportsIndex(TestCase):
     def test_get(self):
@@ -98,8 +122,38 @@ class TestBundleView(TestCase):
 
         assert self.get_context("bundle") == bundle
 
-    def test_post(self):
-        """POST create a new bundle."""
+    def test_get_pending_progress(self):
+        """A pending bundle shows how many reports are ready."""
+        user = self.make_user()
+        school_year = SchoolYearFactory(school__admin=user)
+        BundleFactory(
+            school_year=school_year,
+            status=Bundle.Status.PENDING,
+            total_reports=8,
+            completed_reports=3,
+        )
+
+        with self.login(user):
+            self.get_check_200("reports:bundle", school_year.pk)
+
+        self.assertResponseContains("3 of 8 reports are ready.", html=False)
+
+    def test_get_complete_build_time(self):
+        """A complete bundle shows how long it took to build."""
+        user = self.make_user()
+        school_year = SchoolYearFactory(school__admin=user)
+        BundleFactory(
+            school_year=school_year, status=Bundle.Status.COMPLETE, build_seconds=42.4
+        )
+
+        with self.login(user):
+            self.get_check_200("reports:bundle", school_year.pk)
+
+        self.assertResponseContains("It took 42 seconds to build.", html=False)
+
+    @mock.patch("homeschool.reports.views.tasks.build_bundle", autospec=True)
+    def test_post(self, mock_build_bundle):
+        """POST create a new bundle and queues it to build."""
         user = self.make_user()
         school_year = SchoolYearFactory(school__admin=user)
 
@@ -108,8 +162,24 @@ class TestBundleView(TestCase):
 
         self.response_302(response)
         assert school_year.bundle_set.count() == 1
+        bundle = school_year.bundle_set.get()
+        mock_build_bundle.assert_called_once_with(bundle.id)
+
+    @mock.patch("homeschool.reports.views.tasks.build_bundle", autospec=True)
+    def test_post_existing(self, mock_build_bundle):
+        """POST for an existing bundle doesn't queue another build."""
+        user = self.make_user()
+        school_year = SchoolYearFactory(school__admin=user)
+        BundleFactory(school_year=school_year, status=Bundle.Status.PENDING)
 
-    def test_post_recreate(self):
+        with self.login(user):
+            response = self.post("reports:bundle", school_year.pk)
+
+        self.response_302(response)
+        mock_build_bundle.assert_not_called()
+
+    @mock.patch("homeschool.reports.views.tasks.build_bundle", autospec=True)
+    def test_post_recreate(self, mock_build_bundle):
         """POST recreates a bundle."""
         user = self.make_user()
         school_year = SchoolYearFactory(school__admin=user)
@@ -122,6 +192,21 @@ class TestBundleView(TestCase):
         self.response_302(response)
         bundle.refresh_from_db()
         assert bundle.status == Bundle.Status.PENDING
+        mock_build_bundle.assert_called_once_with(bundle.id)
+
+    @mock.patch("homeschool.reports.views.tasks.build_bundle", autospec=True)
+    def test_post_recreate_pending(self, mock_build_bundle):
+        """Repeat requests to recreate a pending bundle don't stack up builds."""
+        user = self.make_user()
+        school_year = SchoolYearFactory(school__admin=user)
+        BundleFactory(school_year=school_year, status=Bundle.Status.PENDING)
+        data = {"recreate": "true"}
+
+        with self.login(user):
+            response = self.post("reports:bundle", school_year.pk, data=data)
+
+        self.response_302(response)
+        mock_build_bundle.assert_not_called()
 
 
 class TestOfficeAttendanceReport(TestCase):
@@ -370,3 +455,116 @@ class TestResourceReportView(TestCase):
         assert self.get_context("school_year") == enrollment.grade_level.school_year
         assert self.get_context("student") == enrollment.student
         assert list(self.get_context("resources")) == [resource]
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "report-view-tests",
+        }
+    }
+)
+class TestReportConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_etag(self):
+        """A report has an ETag that the browser must revalidate."""
+        user = self.make_user()
+        enrollment = EnrollmentFactory(grade_level__school_year__school=user.school)
+
+        with self.login(user):
+            response = self.get_check_200("reports:resource", pk=enrollment.id)
+
+        assert response.headers["ETag"]
+        assert "private" in response.headers["Cache-Control"]
+        assert "no-cache" in response.headers["Cache-Control"]
+
+    def test_not_modified(self):
+        """A browser with the current ETag gets a not modified response."""
+        user = self.make_user()
+        enrollment = EnrollmentFactory(grade_level__school_year__school=user.school)
+
+        with self.login(user):
+            response = self.get_check_200("reports:attendance", pk=enrollment.id)
+            etag = response.headers["ETag"]
+            response = self.get(
+                "reports:attendance",
+                pk=enrollment.id,
+                extra={"HTTP_IF_NONE_MATCH": etag},
+            )
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+    def test_new_login(self):
+        """A new login gets a fresh page with the new CSRF token."""
+        user = self.make_user()
+        enrollment = EnrollmentFactory(grade_level__school_year__school=user.school)
+
+        with self.login(user):
+            response = self.get_check_200("reports:attendance", pk=enrollment.id)
+            etag = response.headers["ETag"]
+        with self.login(user):
+            response = self.get_check_200(
+                "reports:attendance",
+                pk=enrollment.id,
+                extra={"HTTP_IF_NONE_MATCH": etag},
+            )
+
+        assert response.headers["ETag"] != etag
+
+    def test_pending_message(self):
+        """A pending message gets a fresh page so that the message is shown."""
+        user = self.make_user()
+        enrollment = EnrollmentFactory(grade_level__school_year__school=user.school)
+
+        with self.login(user):
+            response = self.get_check_200("reports:attendance", pk=enrollment.id)
+            etag = response.headers["ETag"]
+            self.post("settings:dashboard", data={"wants_announcements": "on"})
+            response = self.get_check_200(
+                "reports:attendance",
+                pk=enrollment.id,
+                extra={"HTTP_IF_NONE_MATCH": etag},
+            )
+
+        assert response.headers["ETag"] == etag
+        self.assertContains(response, "Your settings updated successfully.")
+
+    def test_modified(self):
+        """A change to the report data changes the ETag."""
+        user = self.make_user()
+        enrollment = EnrollmentFactory(grade_level__school_year__school=user.school)
+
+        with self.login(user):
+            response = self.get_check_200("reports:progress", pk=enrollment.id)
+            etag = response.headers["ETag"]
+            GradeFactory(
+                student=enrollment.student,
+                graded_work__course_task__course__grade_levels=[enrollment.grade_level],
+            )
+            response = self.get_check_200(
+                "reports:progress",
+                pk=enrollment.id,
+                extra={"HTTP_IF_NONE_MATCH": etag},
+            )
+
+        assert response.headers["ETag"] != etag
+        assert len(self.get_context("courses")) == 1
+
+    def test_cached_report(self):
+        """A repeat view of a report uses the cached report HTML."""
+        user = self.make_user()
+        enrollment = EnrollmentFactory(grade_level__school_year__school=user.school)
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        CourseResourceFactory(course=course, title="A cached resource")
+
+        with self.login(user):
+            self.get_check_200("reports:resource", pk=enrollment.id)
+            response = self.get_check_200("reports:resource", pk=enrollment.id)
+
+        template_names = [template.name for template in response.templates]
+        assert "reports/_resource_report.html" not in template_names
+        self.assertContains(response, "A cached resource")
@@ -1,10 +1,17 @@
+import hashlib
 from dataclasses import asdict
 
 from denied.authorizers import any_authorized, staff_authorized
 from denied.decorators import authorize
+from django.contrib import messages
 from django.http import HttpResponse, HttpResponseRedirect
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.safestring import mark_safe
 from django.views.decorators.http import require_POST
 
 from homeschool.schools.authorizers import school_year_authorized
@@ -12,7 +19,7 @@ from homeschool.schools.models import SchoolYear
 from homeschool.students.authorizers import enrollment_authorized
 from homeschool.students.models import Enrollment
 
-from . import pdfs
+from . import pdfs, report_cache, tasks
 from .contexts import (
     AttendanceReportContext,
     CourseworkReportContext,
@@ -24,7 +31,8 @@ from .models import Bundle
 
 @authorize(staff_authorized)
 def office_pdfs_dashboard(request):
-    context: dict = {}
+    bundles = Bundle.objects.select_related("school_year").order_by("-updated_at")
+    context = {"bundles": bundles[:20]}
     return render(request, "reports/pdfs_dashboard.html", context)
 
 
@@ -51,10 +59,12 @@ def get_bundle(request, pk):
     school_year = SchoolYear.objects.get(pk=pk)
 
     if request.method == "POST":
-        bundle, _ = Bundle.objects.get_or_create(school_year=school_year)
+        bundle, created = Bundle.objects.get_or_create(school_year=school_year)
 
-        if bundle and request.POST.get("recreate"):
-            bundle.recreate()
+        # Only queue a build when the bundle became pending
+        # so repeat clicks don't stack up duplicate builds.
+        if created or (request.POST.get("recreate") and bundle.recreate()):
+            tasks.build_bundle(bundle.id)
 
         return HttpResponseRedirect(reverse("reports:bundle", args=[school_year.id]))
 
@@ -94,8 +104,13 @@ def attendance_report(request, pk):
         "student", "grade_level", "grade_level__school_year"
     ).get(pk=pk)
     today = request.user.get_local_today()
-    context = asdict(AttendanceReportContext.from_enrollment(enrollment, today))
-    return render(request, "reports/attendance_report.html", context)
+    return _render_report(
+        request,
+        enrollment,
+        "attendance",
+        lambda: AttendanceReportContext.from_enrollment(enrollment, today),
+        today,
+    )
 
 
 @require_POST
@@ -145,10 +160,14 @@ def progress_report(request, pk):
     enrollment = Enrollment.objects.select_related(
         "student", "grade_level", "grade_level__school_year"
     ).get(pk=pk)
-    context = asdict(
-        ProgressReportContext.from_enrollment(enrollment, request.GET.get("course"))
+    course_id = request.GET.get("course")
+    return _render_report(
+        request,
+        enrollment,
+        "progress",
+        lambda: ProgressReportContext.from_enrollment(enrollment, course_id),
+        course_id,
     )
-    return render(request, "reports/progress_report.html", context)
 
 
 @require_POST
@@ -177,5 +196,63 @@ def resource_report(request, pk):
     enrollment = Enrollment.objects.select_related(
         "student", "grade_level", "grade_level__school_year"
     ).get(pk=pk)
-    context = asdict(ResourceReportContext.from_enrollment(enrollment))
-    return render(request, "reports/resource_report.html", context)
+    return _render_report(
+        request,
+        enrollment,
+        "resource",
+        lambda: ResourceReportContext.from_enrollment(enrollment),
+    )
+
+
+def _render_report(request, enrollment, report_name, get_report_context, *etag_parts):
+    """Render a report page for an enrollment as a conditional response.
+
+    A browser that has the current ETag gets a 304 without any report work.
+    Otherwise, the report body is rendered from the cache when possible
+    and only the page around it is rendered fresh.
+    """
+    report_etag = report_cache.get_etag(report_name, enrollment, *etag_parts)
+    etag = _get_page_etag(request, report_etag)
+    response = None
+    # Pending messages must be shown on a fresh page instead of being used up.
+    if not messages.get_messages(request):
+        response = get_conditional_response(request, etag=quote_etag(etag))
+    if response is None:
+        report_html = report_cache.get_html(report_etag)
+        if report_html is None:
+            report_html = render_to_string(
+                f"reports/_{report_name}_report.html",
+                asdict(get_report_context()),
+                request=request,
+            )
+            report_cache.set_html(report_etag, report_html)
+
+        context = {
+            "student": enrollment.student,
+            "grade_level": enrollment.grade_level,
+            "school_year": enrollment.grade_level.school_year,
+            # The HTML is from a template render so it is already escaped.
+            "report_html": mark_safe(report_html),  # noqa: S308
+        }
+        response = render(request, f"reports/{report_name}_report.html", context)
+
+    response.headers["ETag"] = quote_etag(etag)
+    # The page is specific to the user so it must be revalidated on every visit.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _get_page_etag(request, report_etag):
+    """Get the ETag of a report page from the ETag of its report.
+
+    The page around the report has the user's navigation and CSRF token,
+    so a new login or CSRF token must get a fresh page.
+    """
+    get_token(request)
+    etag_parts = [
+        report_etag,
+        str(request.user.id),
+        request.session.session_key or "",
+        request.META["CSRF_COOKIE"],
+    ]
+    return hashlib.sha256(":".join(etag_parts).encode()).hexdigest()
@@ -0,0 +1,78 @@
+"""A cache of forecast results.
+
+The inputs to a forecast (coursework, tasks, breaks, and days of the week)
+rarely change compared to how often forecasts are viewed.
+
+Every forecast key includes a version token for the school year, the course,
+and the student. When an input changes, the matching token is replaced
+so stale forecasts are never read again and age out of the cache.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+from django.core.cache import cache
+
+from homeschool.core.cache_versions import VersionTokens
+
+# Forecasts are keyed by the date so they don't need to live beyond a day.
+FORECAST_TIMEOUT = 60 * 60 * 24
+
+versions = VersionTokens("forecast")
+
+
+def get_keys(school_year_id, pairs, today: datetime.date) -> dict[tuple, str]:
+    """Get the cache keys for (student id, course id) pairs on a date."""
+    school_year_key = versions.key("school_year", school_year_id)
+    version_keys = {school_year_key}
+    for student_id, course_id in pairs:
+        version_keys.add(versions.key("student", student_id))
+        version_keys.add(versions.key("course", course_id))
+    tokens = versions.get_many(version_keys)
+
+    return {
+        (student_id, course_id): ":".join(
+            [
+                "forecast",
+                today.isoformat(),
+                tokens[school_year_key],
+                tokens[versions.key("course", course_id)],
+                tokens[versions.key("student", student_id)],
+            ]
+        )
+        for student_id, course_id in pairs
+    }
+
+
+def get_forecasts(keys: dict[tuple, str]) -> dict[tuple, dict]:
+    """Get any cached forecasts for the keys."""
+    cached_forecasts = cache.get_many(keys.values())
+    return {
+        pair: cached_forecasts[key]
+        for pair, key in keys.items()
+        if key in cached_forecasts
+    }
+
+
+def set_forecasts(keys: dict[tuple, str], forecasts: dict[tuple, dict]) -> None:
+    """Store the forecasts in the cache."""
+    cache.set_many(
+        {keys[pair]: forecast for pair, forecast in forecasts.items()},
+        timeout=FORECAST_TIMEOUT,
+    )
+
+
+def invalidate_school_year(school_year_id) -> None:
+    """Invalidate the forecasts for every student and course in a school year."""
+    versions.invalidate("school_year", school_year_id)
+
+
+def invalidate_course(course_id) -> None:
+    """Invalidate the forecasts of a course for every student."""
+    versions.invalidate("course", course_id)
+
+
+def invalidate_student(student_id) -> None:
+    """Invalidate the forecasts of every course for a student."""
+    versions.invalidate("student", student_id)
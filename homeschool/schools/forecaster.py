@@ -1,9 +1,13 @@
 import datetime
+from collections import defaultdict
 
 from django.utils import timezone
 
-from homeschool.courses.models import Course
-from homeschool.students.models import Coursework, Student
+from homeschool.courses.models import Course, CourseTask, GradeLevelCoursesThroughModel
+from homeschool.students.models import Coursework, Enrollment, Student
+
+from . import forecast_cache
+from .models import SchoolYear
 
 
 class Forecaster:
@@ -13,14 +17,7 @@ class Forecaster:
         self, student: Student, course: Course
     ) -> datetime.date | None:
         """Get the last forecast date of course for the student."""
-        task_items = self.get_task_items(student, course)
-        if not task_items:
-            return None
-
-        task_item = task_items[-1]
-        if "planned_date" in task_item:
-            return task_item["planned_date"]
-        return task_item["coursework"].completed_date
+        return self._get_last_date(self.get_task_items(student, course))
 
     def get_items_by_task(self, student: Student | None, course: Course) -> dict:
         """Get information about the tasks keyed by the task."""
@@ -29,28 +26,166 @@ class Forecaster:
         }
 
     def get_task_items(self, student, course):
+        coursework_by_task = self._get_course_work_by_task(student, course)
+
+        if student:
+            course_tasks = student.get_tasks_for(course).select_related("graded_work")
+        else:
+            course_tasks = course.course_tasks.all()
+
+        return self._build_task_items(
+            course.school_year, student, course, course_tasks, coursework_by_task
+        )
+
+    def forecast_school_year(self, school_year: SchoolYear) -> dict:
+        """Forecast every course for every student in the school year.
+
+        The forecast is keyed by student and then by course.
+        Each course has the last forecast date and the planned dates by task.
+
+        All the data comes from a fixed number of queries
+        rather than a set of queries per student and course.
+        """
+        enrollments = list(
+            Enrollment.objects.filter(grade_level__school_year=school_year)
+            .select_related("student", "grade_level")
+            .order_by("id")
+        )
+
+        courses_by_grade_level = defaultdict(list)
+        for grade_level_course in GradeLevelCoursesThroughModel.objects.filter(
+            grade_level__school_year=school_year
+        ).select_related("course"):
+            course = grade_level_course.course
+            # Avoid looking up the school year from the course.
+            course.school_year = school_year
+            courses_by_grade_level[grade_level_course.grade_level_id].append(course)
+
+        pairs = [
+            (enrollment, course)
+            for enrollment in enrollments
+            for course in courses_by_grade_level[enrollment.grade_level_id]
+        ]
+        course_forecasts = self._get_course_forecasts(school_year, pairs)
+
+        forecast: dict = {enrollment.student: {} for enrollment in enrollments}
+        for enrollment, course in pairs:
+            forecast[enrollment.student][course] = course_forecasts[
+                enrollment.student.id, course.id
+            ]
+        return forecast
+
+    def forecast_course(self, course: Course, enrollments: list[Enrollment]) -> dict:
+        """Get the planned dates keyed by task for each enrolled student in the course.
+
+        If there are no enrollments, a generic forecast is added to the None key.
+        """
+        if not enrollments:
+            return {
+                None: {
+                    course_task.id: item["planned_date"]
+                    for course_task, item in self.get_items_by_task(
+                        student=None, course=course
+                    ).items()
+                    if "planned_date" in item
+                }
+            }
+
+        course_forecasts = self._get_course_forecasts(
+            course.school_year, [(enrollment, course) for enrollment in enrollments]
+        )
+        return {
+            enrollment.student: course_forecasts[enrollment.student.id, course.id][
+                "planned_dates"
+            ]
+            for enrollment in enrollments
+        }
+
+    def _get_course_forecasts(self, school_year, pairs):
+        """Get the forecast for each (enrollment, course) pair.
+
+        The forecasts are keyed by (student id, course id).
+        Cached forecasts are used when the inputs haven't changed
+        so that only the missing forecasts need any queries.
+        """
         today = timezone.localdate()
+        cache_keys = forecast_cache.get_keys(
+            school_year.id,
+            [(enrollment.student.id, course.id) for enrollment, course in pairs],
+            today,
+        )
+        course_forecasts = forecast_cache.get_forecasts(cache_keys)
+
+        missing_pairs = [
+            (enrollment, course)
+            for enrollment, course in pairs
+            if (enrollment.student.id, course.id) not in course_forecasts
+        ]
+        if not missing_pairs:
+            return course_forecasts
+
+        course_ids = {course.id for _, course in missing_pairs}
+        tasks_by_course = defaultdict(list)
+        for course_task in CourseTask.objects.filter(
+            course__in=course_ids
+        ).select_related("graded_work"):
+            tasks_by_course[course_task.course_id].append(course_task)
+
+        coursework_by_student = self._get_coursework_by_student(
+            {enrollment.student for enrollment, _ in missing_pairs}, course_ids
+        )
+
+        new_forecasts = {}
+        for enrollment, course in missing_pairs:
+            student = enrollment.student
+            course_tasks = [
+                task
+                for task in tasks_by_course[course.id]
+                if task.grade_level_id in (None, enrollment.grade_level_id)
+            ]
+            task_items = self._build_task_items(
+                school_year,
+                student,
+                course,
+                course_tasks,
+                coursework_by_student[student.id],
+                today,
+            )
+            new_forecasts[student.id, course.id] = {
+                "last_forecast_date": self._get_last_date(task_items),
+                "planned_dates": {
+                    item["course_task"].id: item["planned_date"]
+                    for item in task_items
+                    if "planned_date" in item
+                },
+            }
+
+        forecast_cache.set_forecasts(cache_keys, new_forecasts)
+        course_forecasts.update(new_forecasts)
+        return course_forecasts
+
+    def _build_task_items(
+        self, school_year, student, course, course_tasks, coursework_by_task, today=None
+    ):
+        """Zip the course days with the tasks that still need to be done."""
+        if today is None:
+            today = timezone.localdate()
 
         # When the school year isn't in progress yet,
         # the offset calculations should come
         # relative to the start of the school year.
-        school_year = course.school_year
         if today < school_year.start_date:
             today = school_year.start_date
 
-        if not school_year.is_break(today, student=student) and course.runs_on(today):
+        school_calendar = school_year.get_calendar(student)
+        if not school_calendar.is_break(today) and course.runs_on(today):
             next_course_day = today
         else:
-            next_course_day = school_year.get_next_course_day(course, today, student)
+            next_course_day = school_calendar.get_next_course_day(
+                course.days_of_week, today
+            )
 
         course_is_running = course.is_running
-        coursework_by_task = self._get_course_work_by_task(student, course)
-
-        if student:
-            course_tasks = student.get_tasks_for(course).select_related("graded_work")
-        else:
-            course_tasks = course.course_tasks.all()
-
         task_items = []
         for course_task in course_tasks:
             task_item = {
@@ -61,21 +196,42 @@ class Forecaster:
                 coursework = coursework_by_task[course_task]
                 # Advance the next course day to deconflict with coursework.
                 if coursework.completed_date == next_course_day:
-                    next_course_day = school_year.get_next_course_day(
-                        course, next_course_day, student
+                    next_course_day = school_calendar.get_next_course_day(
+                        course.days_of_week, next_course_day
                     )
                 task_item["coursework"] = coursework
             elif course_is_running:
                 task_item["planned_date"] = next_course_day
-                next_course_day = school_year.get_next_course_day(
-                    course, next_course_day, student
+                next_course_day = school_calendar.get_next_course_day(
+                    course.days_of_week, next_course_day
                 )
             task_items.append(task_item)
 
         return task_items
 
+    def _get_last_date(self, task_items):
+        """Get the last date from the forecast task items."""
+        if not task_items:
+            return None
+
+        task_item = task_items[-1]
+        if "planned_date" in task_item:
+            return task_item["planned_date"]
+        return task_item["coursework"].completed_date
+
     def _get_course_work_by_task(self, student, course):
         coursework = Coursework.objects.filter(
             student=student, course_task__course=course
         ).select_related("course_task")
         return {c.course_task: c for c in coursework}
+
+    def _get_coursework_by_student(self, students, course_ids):
+        """Get the coursework keyed by task for each student in a single query."""
+        coursework_by_student: dict = {student.id: {} for student in students}
+        for coursework in Coursework.objects.filter(
+            student__in=students, course_task__course__in=course_ids
+        ).select_related("course_task"):
+            coursework_by_student[coursework.student_id][coursework.course_task] = (
+                coursework
+            )
+        return coursework_by_student
@@ -4,17 +4,20 @@ import datetime
 
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from hashid_field import HashidAutoField
 from ordered_model.models import OrderedModel
 
 from homeschool.core.models import DaysOfWeekModel
 from homeschool.core.schedules import Week
-from homeschool.students.models import Student
+from homeschool.students.models import Coursework, Enrollment, Student
 from homeschool.users.models import User
 
+from . import forecast_cache
+from .school_calendar import BreakIndex, SchoolCalendar
+
 
 class School(models.Model):
     """A school to hold students"""
@@ -48,7 +51,8 @@ class SchoolYear(DaysOfWeekModel):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._school_breaks_by_student = {}
+        self._break_index: BreakIndex | None = None
+        self._calendars_by_student: dict[Student | None, SchoolCalendar] = {}
 
     @classmethod
     def get_current_year_for(cls, user: User) -> SchoolYear | None:
@@ -97,27 +101,39 @@ class SchoolYear(DaysOfWeekModel):
 
         When student is None, get *all* the breaks.
         """
-        if student not in self._school_breaks_by_student:
-            self._school_breaks_by_student[student] = self._get_breaks_for_student(
-                student
+        student_id = int(student.id) if student else None
+        return self._get_break_index().get_break(break_date, student_id)
+
+    def _get_school_breaks(self, student: Student | None) -> list[SchoolBreak]:
+        """Get the school breaks that apply to the student.
+
+        When student is None, get *all* the breaks.
+        """
+        student_id = int(student.id) if student else None
+        return self._get_break_index().get_breaks(student_id)
+
+    def _get_break_index(self) -> BreakIndex:
+        """Get the index of breaks for every student.
+
+        The breaks and the ids of the students they apply to
+        come from a single query.
+        """
+        if self._break_index is None:
+            breaks_with_students: dict[SchoolBreak, set[int]] = {}
+            for school_break in self.breaks.annotate(student_id=F("students")):
+                student_ids = breaks_with_students.setdefault(school_break, set())
+                if school_break.student_id is not None:
+                    student_ids.add(int(school_break.student_id))
+            self._break_index = BreakIndex(breaks_with_students.items())
+        return self._break_index
+
+    def get_calendar(self, student: Student | None) -> SchoolCalendar:
+        """Get the calendar of break days for the student."""
+        if student not in self._calendars_by_student:
+            self._calendars_by_student[student] = SchoolCalendar(
+                self, self._get_school_breaks(student)
             )
-        return self._school_breaks_by_student[student].get(break_date)
-
-    def _get_breaks_for_student(
-        self, student: Student | None
-    ) -> dict[datetime.date, SchoolBreak]:
-        """Get the school breaks grouped by the dates."""
-        if student is None:
-            breaks = self.breaks.all()
-        else:
-            breaks = self.breaks.filter(Q(students=None) | Q(students=student))
-        breaks_by_date = {}
-        for school_break in breaks:
-            current_date = school_break.start_date
-            while current_date <= school_break.end_date:
-                breaks_by_date[current_date] = school_break
-                current_date = current_date + datetime.timedelta(days=1)
-        return breaks_by_date
+        return self._calendars_by_student[student]
 
     def get_task_count_in_range(self, course, start_date, end_date, student):
         """Get the task count for a course and factor in any breaks.
@@ -127,36 +143,29 @@ class SchoolYear(DaysOfWeekModel):
         if start_date > end_date:
             return 1 if course.runs_on(start_date) else 0
 
-        task_count = 0
-        date_to_check = start_date
-        while date_to_check <= end_date:
-            if not self.is_break(date_to_check, student=student) and course.runs_on(
-                date_to_check
-            ):
-                task_count += 1
-            date_to_check += datetime.timedelta(days=1)
-
-        return task_count
+        return self.get_calendar(student).count_course_days(
+            course.days_of_week, start_date, end_date
+        )
 
     def get_next_course_day(self, course, day, student):
         """Get the next course day after the provided day (considering breaks)."""
-        next_course_day = course.get_next_day_from(day)
-        # When the course isn't meeting the next day is the same. Bail early.
-        if next_course_day == day:
-            return day
-
-        while next_course_day < self.end_date:
-            if not self.is_break(next_course_day, student=student):
-                return next_course_day
-            next_course_day = course.get_next_day_from(next_course_day)
-
-        return next_course_day
+        return self.get_calendar(student).get_next_course_day(course.days_of_week, day)
 
     def get_schedules(self, today: datetime.date, week: Week) -> list:
-        """Get the week schedules for each student enrolled in the school year."""
+        """Get the week schedules for each student enrolled in the school year.
+
+        The tasks of every student are loaded together.
+        """
+        plans = {
+            student: student.plan_week_schedule(self, today, week)
+            for student in Student.get_students_for(self)
+        }
+        tasks_by_student = Student.get_students_tasks_in_windows(
+            {student: plan.task_windows for student, plan in plans.items()}
+        )
         schedules = []
-        for student in Student.get_students_for(self):
-            schedule = student.get_week_schedule(self, today, week)
+        for student, plan in plans.items():
+            schedule = plan.fill(tasks_by_student[student.id])
             schedule["week_dates"] = self._build_week_dates(week, student)
             schedules.append(schedule)
 
@@ -278,3 +287,44 @@ class SchoolBreak(models.Model):
         if break_date == self.end_date:
             return self.DateType.END
         return self.DateType.MIDDLE
+
+
+@receiver([post_save, post_delete], sender=SchoolYear)
+def invalidate_school_year_forecasts(sender, instance, **kwargs):
+    """Changing the school year's dates or days changes every forecast."""
+    forecast_cache.invalidate_school_year(instance.id)
+
+
+@receiver([post_save, post_delete], sender=SchoolBreak)
+def invalidate_school_break_forecasts(sender, instance, **kwargs):
+    """A break moves the planned dates of the school year."""
+    forecast_cache.invalidate_school_year(instance.school_year_id)
+
+
+@receiver(m2m_changed, sender=SchoolBreak.students.through)
+def invalidate_school_break_students_forecasts(sender, instance, action, **kwargs):
+    """A break moves the planned dates of the school year for its students."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        if isinstance(instance, SchoolBreak):
+            forecast_cache.invalidate_school_year(instance.school_year_id)
+        else:
+            forecast_cache.invalidate_student(instance.id)
+
+
+@receiver([post_save, post_delete], sender="courses.Course")
+def invalidate_course_forecasts(sender, instance, **kwargs):
+    """The days of a course set its planned dates."""
+    forecast_cache.invalidate_course(instance.id)
+
+
+@receiver([post_save, post_delete], sender="courses.CourseTask")
+def invalidate_course_task_forecasts(sender, instance, **kwargs):
+    """Adding, removing, or reordering tasks shifts the course forecast."""
+    forecast_cache.invalidate_course(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Coursework)
+@receiver([post_save, post_delete], sender=Enrollment)
+def invalidate_student_forecasts(sender, instance, **kwargs):
+    """Completed work and enrollments are the student's part of a forecast."""
+    forecast_cache.invalidate_student(instance.student_id)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .models import SchoolBreak, SchoolYear
+
+
+def _day_of_week(ordinal: int) -> int:
+    """Get the days of week bit for a date ordinal.
+
+    Ordinal 1 is a Monday so this lines up with DaysOfWeekModel
+    where Monday is the lowest bit and Sunday is the highest bit.
+    """
+    return 1 << ((ordinal - 1) % 7)
+
+
+def _count_days_of_week(days_of_week: int, start: int, end: int) -> int:
+    """Count the days between the start and end ordinals that match days of week.
+
+    Be inclusive of start and end.
+    """
+    if start > end:
+        return 0
+    full_weeks, remaining_days = divmod(end - start + 1, 7)
+    count = full_weeks * days_of_week.bit_count()
+    for ordinal in range(start, start + remaining_days):
+        if days_of_week & _day_of_week(ordinal):
+            count += 1
+    return count
+
+
+class BreakIndex:
+    """The school breaks of a school year sorted for date lookups.
+
+    Breaks are kept as intervals sorted by start date
+    so a lookup is a bisect instead of a dict entry for every break day.
+    The students of each break are stored as a bitset
+    so one index serves every student.
+    """
+
+    def __init__(self, breaks_with_students: Iterable[tuple[SchoolBreak, set[int]]]):
+        self._student_bits: dict[int, int] = {}
+        self._breaks: list[SchoolBreak] = []
+        self._start_ordinals: list[int] = []
+        # The furthest end of any break up to an index.
+        # This bounds the search for overlapping breaks.
+        self._max_end_ordinals: list[int] = []
+        # A break with a mask of zero applies to every student.
+        self._student_masks: list[int] = []
+
+        max_end_ordinal = 0
+        for school_break, student_ids in sorted(
+            breaks_with_students, key=lambda pair: pair[0].start_date
+        ):
+            max_end_ordinal = max(max_end_ordinal, school_break.end_date.toordinal())
+            self._breaks.append(school_break)
+            self._start_ordinals.append(school_break.start_date.toordinal())
+            self._max_end_ordinals.append(max_end_ordinal)
+            self._student_masks.append(self._get_student_mask(student_ids))
+
+    def _get_student_mask(self, student_ids: set[int]) -> int:
+        mask = 0
+        for student_id in student_ids:
+            if student_id not in self._student_bits:
+                self._student_bits[student_id] = 1 << len(self._student_bits)
+            mask |= self._student_bits[student_id]
+        return mask
+
+    def _applies_to(self, index: int, student_id: int | None) -> bool:
+        """Check if the break at the index applies to the student.
+
+        When student_id is None, every break applies.
+        """
+        if student_id is None or not self._student_masks[index]:
+            return True
+        return bool(self._student_masks[index] & self._student_bits.get(student_id, 0))
+
+    def get_break(
+        self, day: datetime.date, student_id: int | None
+    ) -> SchoolBreak | None:
+        """Get the break that contains the day for the student.
+
+        When breaks overlap, the break that starts last wins.
+        """
+        ordinal = day.toordinal()
+        index = bisect.bisect_right(self._start_ordinals, ordinal) - 1
+        while index >= 0 and self._max_end_ordinals[index] >= ordinal:
+            school_break = self._breaks[index]
+            if school_break.end_date.toordinal() >= ordinal and self._applies_to(
+                index, student_id
+            ):
+                return school_break
+            index -= 1
+        return None
+
+    def get_breaks(self, student_id: int | None) -> list[SchoolBreak]:
+        """Get the breaks that apply to the student in start date order."""
+        return [
+            school_break
+            for index, school_break in enumerate(self._breaks)
+            if self._applies_to(index, student_id)
+        ]
+
+
+class SchoolCalendar:
+    """The break days of a school year for a student.
+
+    Each day is stored by its offset from the first day of the calendar
+    so that break checks are a lookup and course day counts are arithmetic
+    instead of a walk over every date.
+    """
+
+    def __init__(self, school_year: SchoolYear, school_breaks: Iterable[SchoolBreak]):
+        school_breaks = list(school_breaks)
+        self.end_date = school_year.end_date
+        self._first_ordinal = min(
+            [school_year.start_date, *(b.start_date for b in school_breaks)]
+        ).toordinal()
+        self._last_ordinal = max(
+            [school_year.end_date, *(b.end_date for b in school_breaks)]
+        ).toordinal()
+
+        self._break_days = bytearray(self._last_ordinal - self._first_ordinal + 1)
+        for school_break in school_breaks:
+            start = school_break.start_date.toordinal() - self._first_ordinal
+            end = school_break.end_date.toordinal() - self._first_ordinal
+            self._break_days[start : end + 1] = b"\x01" * (end - start + 1)
+
+        # The course day data is computed once per days of week mask.
+        self._course_day_counts: dict[int, list[int]] = {}
+        self._course_days: dict[int, list[int]] = {}
+
+    def is_break(self, day: datetime.date) -> bool:
+        """Check if the day is a break day."""
+        ordinal = day.toordinal()
+        if self._first_ordinal <= ordinal <= self._last_ordinal:
+            return bool(self._break_days[ordinal - self._first_ordinal])
+        return False
+
+    def count_course_days(
+        self, days_of_week: int, start_date: datetime.date, end_date: datetime.date
+    ) -> int:
+        """Count the days that are not breaks and match the days of week.
+
+        Be inclusive of start and end.
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        count = 0
+
+        # Any days outside of the calendar can't be breaks.
+        count += _count_days_of_week(
+            days_of_week, start, min(end, self._first_ordinal - 1)
+        )
+        count += _count_days_of_week(
+            days_of_week, max(start, self._last_ordinal + 1), end
+        )
+
+        low, high = max(start, self._first_ordinal), min(end, self._last_ordinal)
+        if low <= high:
+            course_day_counts = self._get_course_day_counts(days_of_week)
+            count += (
+                course_day_counts[high - self._first_ordinal + 1]
+                - course_day_counts[low - self._first_ordinal]
+            )
+        return count
+
+    def get_next_course_day(
+        self, days_of_week: int, day: datetime.date
+    ) -> datetime.date:
+        """Get the next course day after the provided day (considering breaks).
+
+        Breaks are only considered before the end of the school year.
+        When the days of week are empty, the day is returned.
+        """
+        if not days_of_week:
+            return day
+
+        next_ordinal = day.toordinal() + 1
+        while not days_of_week & _day_of_week(next_ordinal):
+            next_ordinal += 1
+
+        end_ordinal = self.end_date.toordinal()
+        if next_ordinal < self._first_ordinal or next_ordinal >= end_ordinal:
+            return datetime.date.fromordinal(next_ordinal)
+
+        course_days = self._get_course_days(days_of_week)
+        index = bisect.bisect_left(course_days, next_ordinal)
+        if index < len(course_days) and course_days[index] < end_ordinal:
+            return datetime.date.fromordinal(course_days[index])
+
+        # Every remaining course day is a break.
+        # Fall back to the first course day on or after the end of the school year.
+        next_ordinal = end_ordinal
+        while not days_of_week & _day_of_week(next_ordinal):
+            next_ordinal += 1
+        return datetime.date.fromordinal(next_ordinal)
+
+    def _get_course_day_counts(self, days_of_week: int) -> list[int]:
+        """Get the running count of course days from the start of the calendar.
+
+        The count at index i is the number of course days before offset i.
+        """
+        if days_of_week not in self._course_day_counts:
+            course_day_counts = [0]
+            count = 0
+            for offset, is_break_day in enumerate(self._break_days):
+                ordinal = self._first_ordinal + offset
+                if not is_break_day and days_of_week & _day_of_week(ordinal):
+                    count += 1
+                course_day_counts.append(count)
+            self._course_day_counts[days_of_week] = course_day_counts
+        return self._course_day_counts[days_of_week]
+
+    def _get_course_days(self, days_of_week: int) -> list[int]:
+        """Get the sorted ordinals of course days that are not breaks."""
+        if days_of_week not in self._course_days:
+            self._course_days[days_of_week] = [
+                self._first_ordinal + offset
+                for offset, is_break_day in enumerate(self._break_days)
+                if not is_break_day
+                and days_of_week & _day_of_week(self._first_ordinal + offset)
+            ]
+        return self._course_days[days_of_week]
@@ -2,13 +2,19 @@ import datetime
 
 import time_machine
 from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils import timezone
 
 from homeschool.courses.models import Course
 from homeschool.courses.tests.factories import CourseFactory, CourseTaskFactory
 from homeschool.schools.forecaster import Forecaster
 from homeschool.schools.models import SchoolYear
-from homeschool.schools.tests.factories import SchoolYearFactory
+from homeschool.schools.tests.factories import (
+    GradeLevelFactory,
+    SchoolBreakFactory,
+    SchoolYearFactory,
+)
 from homeschool.students.tests.factories import CourseworkFactory, EnrollmentFactory
 from homeschool.test import TestCase
 
@@ -113,3 +119,203 @@ class TestForecaster(TestCase):
 
         task_item = items[0]
         assert "planned_date" not in task_item
+
+    @time_machine.travel("2021-03-10")  # Wednesday
+    def test_forecast_school_year(self):
+        """The school year forecast matches the individual course forecasts."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        school_year = enrollment.grade_level.school_year
+        other_grade_level = GradeLevelFactory(school_year=school_year)
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        CourseworkFactory(student=student, course_task=task)
+        CourseTaskFactory(course=course)
+        CourseTaskFactory(course=course, grade_level=other_grade_level)
+        other_course = CourseFactory(grade_levels=[enrollment.grade_level])
+        CourseTaskFactory(course=other_course)
+        forecaster = Forecaster()
+
+        forecast = forecaster.forecast_school_year(school_year)
+
+        assert list(forecast[student]) == [course, other_course]
+        course_forecast = forecast[student][course]
+        assert course_forecast["planned_dates"] == self.get_planned_dates(
+            forecaster, student, course
+        )
+        assert course_forecast["last_forecast_date"] == datetime.date(2021, 3, 11)
+
+    def test_forecast_school_year_queries(self):
+        """The school year forecast doesn't grow queries with more courses."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        for _ in range(3):
+            CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        forecaster = Forecaster()
+
+        with self.assertNumQueries(5):
+            forecaster.forecast_school_year(school_year)
+
+    @time_machine.travel("2021-03-10")  # Wednesday
+    def test_forecast_course(self):
+        """A course forecast matches the individual student forecasts."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        other_enrollment = EnrollmentFactory(
+            grade_level__school_year=enrollment.grade_level.school_year
+        )
+        course = CourseFactory(
+            grade_levels=[enrollment.grade_level, other_enrollment.grade_level]
+        )
+        task = CourseTaskFactory(course=course)
+        CourseworkFactory(student=student, course_task=task)
+        CourseTaskFactory(course=course, grade_level=other_enrollment.grade_level)
+        forecaster = Forecaster()
+
+        forecasts = forecaster.forecast_course(course, [enrollment, other_enrollment])
+
+        assert forecasts[student] == self.get_planned_dates(forecaster, student, course)
+        assert forecasts[other_enrollment.student] == self.get_planned_dates(
+            forecaster, other_enrollment.student, course
+        )
+
+    @time_machine.travel("2021-03-10")  # Wednesday
+    def test_forecast_course_no_enrollments(self):
+        """A course with no enrollments has a generic forecast."""
+        enrollment = EnrollmentFactory()
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        forecaster = Forecaster()
+
+        forecasts = forecaster.forecast_course(course, [])
+
+        assert forecasts[None][task.id] == datetime.date.today()
+
+    def get_planned_dates(self, forecaster, student, course):
+        """Get the planned dates from the individual student forecast."""
+        return {
+            item["course_task"].id: item["planned_date"]
+            for item in forecaster.get_task_items(student, course)
+            if "planned_date" in item
+        }
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "forecaster-tests",
+        }
+    }
+)
+class TestForecasterCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_forecast_cached(self):
+        """A repeated forecast comes from the cache."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        forecaster = Forecaster()
+        forecast = forecaster.forecast_school_year(school_year)
+
+        with self.assertNumQueries(2):
+            cached_forecast = forecaster.forecast_school_year(school_year)
+
+        assert cached_forecast == forecast
+
+    def test_forecast_invalidated_by_coursework(self):
+        """New coursework replaces a cached forecast."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        forecaster = Forecaster()
+        forecaster.forecast_course(course, [enrollment])
+
+        CourseworkFactory(student=student, course_task=task)
+
+        forecasts = forecaster.forecast_course(course, [enrollment])
+        assert forecasts[student] == {}
+
+    def test_forecast_invalidated_by_course_task(self):
+        """A new task replaces a cached forecast."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        forecaster = Forecaster()
+        forecaster.forecast_course(course, [enrollment])
+
+        task = CourseTaskFactory(course=course)
+
+        forecasts = forecaster.forecast_course(course, [enrollment])
+        assert task.id in forecasts[student]
+
+    @time_machine.travel("2021-03-10")  # Wednesday
+    def test_forecast_invalidated_by_school_break(self):
+        """A new break replaces a cached forecast."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        school_year = enrollment.grade_level.school_year
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        forecaster = Forecaster()
+        forecaster.forecast_course(course, [enrollment])
+
+        SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2021, 3, 10),
+            end_date=datetime.date(2021, 3, 10),
+        )
+
+        # A fresh course has no school year calendar from the first forecast.
+        course = Course.objects.get(id=course.id)
+        forecasts = forecaster.forecast_course(course, [enrollment])
+        assert forecasts[student][task.id] == datetime.date(2021, 3, 11)
+
+    @time_machine.travel("2021-03-10")  # Wednesday
+    def test_forecast_invalidated_by_school_break_students(self):
+        """Changing the students of a break replaces a cached forecast."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        school_year = enrollment.grade_level.school_year
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        other_enrollment = EnrollmentFactory(grade_level=enrollment.grade_level)
+        school_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2021, 3, 10),
+            end_date=datetime.date(2021, 3, 10),
+        )
+        school_break.students.add(other_enrollment.student)
+        forecaster = Forecaster()
+        forecaster.forecast_course(course, [enrollment])
+
+        school_break.students.add(student)
+
+        course = Course.objects.get(id=course.id)
+        forecasts = forecaster.forecast_course(course, [enrollment])
+        assert forecasts[student][task.id] == datetime.date(2021, 3, 11)
+
+        student.schoolbreak_set.remove(school_break)
+
+        course = Course.objects.get(id=course.id)
+        forecasts = forecaster.forecast_course(course, [enrollment])
+        assert forecasts[student][task.id] == datetime.date(2021, 3, 10)
+
+    @time_machine.travel("2021-03-10")  # Wednesday
+    def test_forecast_invalidated_by_course_days(self):
+        """Changing the course days replaces a cached forecast."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        forecaster = Forecaster()
+        forecaster.forecast_course(course, [enrollment])
+
+        course.days_of_week = Course.FRIDAY
+        course.save()
+
+        forecasts = forecaster.forecast_course(course, [enrollment])
+        assert forecasts[student][task.id] == datetime.date(2021, 3, 12)
@@ -1,6 +1,8 @@
 import datetime
 
 from dateutil.relativedelta import MO, SU, relativedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from homeschool.core.schedules import Week
@@ -12,7 +14,11 @@ from homeschool.schools.tests.factories import (
     SchoolFactory,
     SchoolYearFactory,
 )
-from homeschool.students.tests.factories import StudentFactory
+from homeschool.students.tests.factories import (
+    CourseworkFactory,
+    EnrollmentFactory,
+    StudentFactory,
+)
 from homeschool.test import TestCase
 
 
@@ -247,6 +253,34 @@ class TestSchoolYear(TestCase):
 
         assert school_break is None
 
+    def test_get_break_single_query(self):
+        """The breaks for every student are loaded in a single query."""
+        school_break = SchoolBreakFactory()
+        school_year = SchoolYear.objects.get(id=school_break.school_year.id)
+        student = StudentFactory()
+        other_student = StudentFactory()
+        school_break.students.add(student)
+        everyone_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=school_break.end_date + datetime.timedelta(days=1),
+            end_date=school_break.end_date + datetime.timedelta(days=1),
+        )
+
+        with self.assertNumQueries(1):
+            student_break = school_year.get_break(
+                school_break.start_date, student=student
+            )
+            other_student_break = school_year.get_break(
+                school_break.start_date, student=other_student
+            )
+            other_student_everyone_break = school_year.get_break(
+                everyone_break.start_date, student=other_student
+            )
+
+        assert student_break == school_break
+        assert other_student_break is None
+        assert other_student_everyone_break == everyone_break
+
     def test_is_break(self):
         """A school year can check if a date is a break day."""
         school_break = SchoolBreakFactory()
@@ -346,6 +380,42 @@ class TestSchoolYear(TestCase):
 
         assert next_course_day == school_year.start_date
 
+    def test_get_schedules(self):
+        """Each student gets their own tasks from one query of task windows."""
+        today = datetime.date(2021, 7, 19)  # A Monday
+        school = SchoolFactory()
+        school_year = SchoolYearFactory(
+            school=school,
+            start_date=today - datetime.timedelta(days=30),
+            end_date=today + datetime.timedelta(days=300),
+        )
+        grade_level = GradeLevelFactory(school_year=school_year)
+        student, other_student = (
+            EnrollmentFactory(grade_level=grade_level, student__school=school).student
+            for _ in range(2)
+        )
+        course = CourseFactory(grade_levels=[grade_level])
+        first_task, second_task = CourseTaskFactory.create_batch(2, course=course)
+        CourseworkFactory(
+            student=student,
+            course_task=first_task,
+            completed_date=today - datetime.timedelta(days=3),
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            schedules = school_year.get_schedules(today, Week(today))
+
+        window_queries = [
+            query for query in context.captured_queries if "ROW_NUMBER" in query["sql"]
+        ]
+        assert len(window_queries) == 1
+        first_days = {
+            schedule["student"]: schedule["courses"][0]["days"][0]
+            for schedule in schedules
+        }
+        assert first_days[student]["task"] == second_task
+        assert first_days[other_student]["task"] == first_task
+
 
 class TestGradeLevel(TestCase):
     def test_factory(self):
@@ -0,0 +1,172 @@
+import datetime
+
+from homeschool.schools.models import SchoolYear
+from homeschool.schools.school_calendar import BreakIndex, SchoolCalendar
+from homeschool.schools.tests.factories import SchoolBreakFactory, SchoolYearFactory
+from homeschool.test import TestCase
+
+
+class TestBreakIndex(TestCase):
+    def test_get_break(self):
+        """A break is found for any day in its range."""
+        school_break = SchoolBreakFactory(
+            start_date=datetime.date(2022, 1, 5), end_date=datetime.date(2022, 1, 7)
+        )
+        index = BreakIndex([(school_break, set())])
+
+        assert index.get_break(datetime.date(2022, 1, 4), None) is None
+        assert index.get_break(datetime.date(2022, 1, 5), None) == school_break
+        assert index.get_break(datetime.date(2022, 1, 7), 1) == school_break
+        assert index.get_break(datetime.date(2022, 1, 8), None) is None
+
+    def test_get_break_overlapping(self):
+        """A long break is found past a later, shorter break inside of it."""
+        long_break = SchoolBreakFactory(
+            start_date=datetime.date(2022, 1, 3), end_date=datetime.date(2022, 1, 14)
+        )
+        school_year = long_break.school_year
+        short_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2022, 1, 5),
+            end_date=datetime.date(2022, 1, 6),
+        )
+        index = BreakIndex([(short_break, set()), (long_break, set())])
+
+        assert index.get_break(datetime.date(2022, 1, 5), None) == short_break
+        assert index.get_break(datetime.date(2022, 1, 10), None) == long_break
+
+    def test_get_break_for_student(self):
+        """A break for specific students only applies to those students."""
+        school_break = SchoolBreakFactory(
+            start_date=datetime.date(2022, 1, 5), end_date=datetime.date(2022, 1, 5)
+        )
+        other_break = SchoolBreakFactory(
+            school_year=school_break.school_year,
+            start_date=datetime.date(2022, 1, 5),
+            end_date=datetime.date(2022, 1, 5),
+        )
+        index = BreakIndex([(school_break, {1, 2}), (other_break, {3})])
+        day = datetime.date(2022, 1, 5)
+
+        assert index.get_break(day, 1) == school_break
+        assert index.get_break(day, 3) == other_break
+        assert index.get_break(day, 4) is None
+        assert index.get_break(day, None) is not None
+        assert index.get_breaks(2) == [school_break]
+        assert index.get_breaks(None) == [school_break, other_break]
+
+
+class TestSchoolCalendar(TestCase):
+    # A Monday through a Saturday.
+    start_date = datetime.date(2022, 1, 3)
+    end_date = datetime.date(2022, 1, 29)
+
+    def make_school_year(self):
+        return SchoolYearFactory(start_date=self.start_date, end_date=self.end_date)
+
+    def test_is_break(self):
+        """A calendar knows which days are breaks."""
+        school_year = self.make_school_year()
+        school_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2022, 1, 5),
+            end_date=datetime.date(2022, 1, 6),
+        )
+
+        calendar = SchoolCalendar(school_year, [school_break])
+
+        assert not calendar.is_break(datetime.date(2022, 1, 4))
+        assert calendar.is_break(datetime.date(2022, 1, 5))
+        assert calendar.is_break(datetime.date(2022, 1, 6))
+        assert not calendar.is_break(datetime.date(2022, 1, 7))
+        assert not calendar.is_break(datetime.date(2021, 12, 1))
+        assert not calendar.is_break(datetime.date(2022, 3, 1))
+
+    def test_count_course_days(self):
+        """The count of course days skips breaks and non-course days."""
+        school_year = self.make_school_year()
+        school_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2022, 1, 5),
+            end_date=datetime.date(2022, 1, 12),
+        )
+        calendar = SchoolCalendar(school_year, [school_break])
+        monday_wednesday = SchoolYear.MONDAY + SchoolYear.WEDNESDAY
+
+        count = calendar.count_course_days(
+            monday_wednesday, self.start_date, datetime.date(2022, 1, 19)
+        )
+
+        # Jan 3, 17, and 19 are course days. Jan 5, 10, and 12 are breaks.
+        assert count == 3
+
+    def test_count_course_days_outside_calendar(self):
+        """Days outside of the calendar are counted without breaks."""
+        school_year = self.make_school_year()
+        calendar = SchoolCalendar(school_year, [])
+
+        count = calendar.count_course_days(
+            SchoolYear.MONDAY, datetime.date(2021, 12, 1), datetime.date(2022, 2, 28)
+        )
+
+        assert count == 13
+
+    def test_get_next_course_day(self):
+        """The next course day skips breaks."""
+        school_year = self.make_school_year()
+        school_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2022, 1, 4),
+            end_date=datetime.date(2022, 1, 5),
+        )
+        calendar = SchoolCalendar(school_year, [school_break])
+
+        next_course_day = calendar.get_next_course_day(
+            SchoolYear.ALL_DAYS, self.start_date
+        )
+
+        assert next_course_day == datetime.date(2022, 1, 6)
+
+    def test_get_next_course_day_no_days(self):
+        """With no days of the week, the next course day is the same day."""
+        calendar = SchoolCalendar(self.make_school_year(), [])
+
+        next_course_day = calendar.get_next_course_day(
+            SchoolYear.NO_DAYS, self.start_date
+        )
+
+        assert next_course_day == self.start_date
+
+    def test_get_next_course_day_before_calendar(self):
+        """A day before the calendar has no breaks to consider."""
+        calendar = SchoolCalendar(self.make_school_year(), [])
+
+        next_course_day = calendar.get_next_course_day(
+            SchoolYear.MONDAY, datetime.date(2021, 12, 1)
+        )
+
+        assert next_course_day == datetime.date(2021, 12, 6)
+
+    def test_get_next_course_day_after_end(self):
+        """Breaks don't apply after the end of the school year."""
+        calendar = SchoolCalendar(self.make_school_year(), [])
+
+        next_course_day = calendar.get_next_course_day(SchoolYear.MONDAY, self.end_date)
+
+        assert next_course_day == datetime.date(2022, 1, 31)
+
+    def test_get_next_course_day_remaining_breaks(self):
+        """When the rest of the year is a break, skip to after the year ends."""
+        school_year = self.make_school_year()
+        school_break = SchoolBreakFactory(
+            school_year=school_year,
+            start_date=datetime.date(2022, 1, 10),
+            end_date=self.end_date,
+        )
+        calendar = SchoolCalendar(school_year, [school_break])
+
+        next_course_day = calendar.get_next_course_day(
+            SchoolYear.MONDAY, self.start_date
+        )
+
+        assert next_course_day == datetime.date(2022, 1, 31)
@@ -160,31 +160,20 @@ def move_grade_level_up(request, pk):
 def school_year_forecast(request, pk):
     school_year = SchoolYear.objects.get(pk=pk)
 
-    enrollments = Enrollment.objects.filter(
-        grade_level__school_year=school_year
-    ).select_related(
-        "grade_level",
-        "grade_level__school_year",
-        "student",
-    )
-    students = []
-    for enrollment in enrollments:
-        student_info = {"student": enrollment.student, "courses": []}
-
-        for course in enrollment.grade_level.get_ordered_courses():
-            # Ugly performance optimization to save some queries.
-            enrollment.student._enrollment_by_course_cache[course] = enrollment
-
-            forecaster = Forecaster()
-            course_info = {
-                "course": course,
-                "last_forecast_date": forecaster.get_last_forecast_date(
-                    enrollment.student, course
-                ),
-            }
-            student_info["courses"].append(course_info)
-
-        students.append(student_info)
+    forecast = Forecaster().forecast_school_year(school_year)
+    students = [
+        {
+            "student": student,
+            "courses": [
+                {
+                    "course": course,
+                    "last_forecast_date": course_forecast["last_forecast_date"],
+                }
+                for course, course_forecast in course_forecasts.items()
+            ],
+        }
+        for student, course_forecasts in forecast.items()
+    ]
 
     context = {
         "schoolyear": school_year,
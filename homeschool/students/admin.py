@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from homeschool.students.models import Coursework, Enrollment, Grade, Student
+from homeschool.students.models import (
+    Coursework,
+    Enrollment,
+    Grade,
+    Student,
+    StudentCourseProgress,
+)
 
 
 @admin.register(Student)
@@ -23,3 +29,9 @@ class GradeAdmin(admin.ModelAdmin):
 class CourseworkAdmin(admin.ModelAdmin):
     list_display = ("id", "course_task", "completed_date")
     raw_id_fields = ("course_task",)
+
+
+@admin.register(StudentCourseProgress)
+class StudentCourseProgressAdmin(admin.ModelAdmin):
+    list_display = ("id", "student", "course", "completed_count", "last_completed_date")
+    raw_id_fields = ("student", "course", "next_task")
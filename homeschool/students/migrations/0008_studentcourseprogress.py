@@ -0,0 +1,112 @@
+# Generated by Django 6.1 on 2026-10-18 03:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_progress(apps, schema_editor):
+    """Create the progress for every student and course with coursework."""
+    Coursework = apps.get_model("students", "Coursework")
+    CourseTask = apps.get_model("courses", "CourseTask")
+    Enrollment = apps.get_model("students", "Enrollment")
+    StudentCourseProgress = apps.get_model("students", "StudentCourseProgress")
+
+    summaries = (
+        Coursework.objects.values("student", "course_task__course")
+        .annotate(
+            completed_count=Count("id"),
+            last_completed_date=Max("completed_date"),
+            last_task_order=Max("course_task__order"),
+        )
+        .order_by()
+    )
+    for summary in summaries:
+        student_id = summary["student"]
+        course_id = summary["course_task__course"]
+        enrollment = Enrollment.objects.filter(
+            student=student_id, grade_level__courses=course_id
+        ).first()
+        next_task = None
+        if enrollment:
+            next_task = (
+                CourseTask.objects.filter(course=course_id)
+                .filter(
+                    Q(grade_level__isnull=True)
+                    | Q(grade_level=enrollment.grade_level_id)
+                )
+                .exclude(coursework__student=student_id)
+                .order_by("order")
+                .first()
+            )
+        StudentCourseProgress.objects.create(
+            student_id=student_id,
+            course_id=course_id,
+            completed_count=summary["completed_count"],
+            last_completed_date=summary["last_completed_date"],
+            last_task_order=summary["last_task_order"],
+            next_task=next_task,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0006_coursetask_resource"),
+        ("students", "0007_alter_enrollment_student"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudentCourseProgress",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("completed_count", models.PositiveIntegerField(default=0)),
+                ("last_completed_date", models.DateField(blank=True, null=True)),
+                ("last_task_order", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="courses.course",
+                    ),
+                ),
+                (
+                    "next_task",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="courses.coursetask",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="course_progress",
+                        to="students.student",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "student course progress",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("student", "course"),
+                        name="progress_per_student_course",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
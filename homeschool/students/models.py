@@ -4,8 +4,11 @@ import datetime
 from typing import TYPE_CHECKING
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from hashid_field import HashidAutoField
 
 from homeschool.core.schedules import Week
@@ -63,33 +66,39 @@ class Student(models.Model):
         The schedule is calculated from the user's point of view in time
         as of today. The week is not necessarily *this* week.
         """
+        plan = self.plan_week_schedule(school_year, today, week)
+        return plan.fill(self.get_tasks_in_windows(plan.task_windows))
+
+    def plan_week_schedule(self, school_year, today, week):
+        """Plan the student's week schedule without loading its tasks.
+
+        The plan has the task windows to load so that the tasks
+        of many students can be loaded together.
+        """
+        from .schedules import WeekSchedulePlan
+
         week_dates = school_year.get_week_dates_for(week)
         week_end_date = school_year.last_school_day_for(week)
         week_coursework = self.get_week_coursework(week)
 
         courses = self.get_active_courses(school_year)
-        completed_task_ids = list(
-            Coursework.objects.filter(
-                student=self, course_task__course__in=courses
-            ).values_list("course_task_id", flat=True)
+        # Courses that aren't running don't appear on current or future weeks.
+        running_courses = [
+            course for course in courses if course.is_running or week_end_date <= today
+        ]
+        task_windows = self._get_week_task_windows(
+            running_courses,
+            school_year,
+            today,
+            week.first_day,
+            week_end_date,
+            len(week_dates),
         )
+        task_slots: dict = {course.id: [] for course in running_courses}
         course_schedules = []
-        for course in courses:
-            if week_end_date > today and not course.is_running:
-                continue
-
+        for course in running_courses:
             course_schedule = {"course": course, "days": []}
 
-            course_tasks = self._build_course_tasks(
-                course,
-                school_year,
-                completed_task_ids,
-                today,
-                week.first_day,
-                week_end_date,
-                len(week_dates),
-            )
-
             # Tasks should only appear *after* the last coursework date.
             last_coursework_date = self.get_last_coursework_date(
                 week_coursework, course
@@ -122,54 +131,139 @@ class Student(models.Model):
                     course_schedule_item["coursework"] = coursework_list
                 elif (
                     course.runs_on(week_date)
-                    and course_tasks
+                    and course in task_windows
                     and (
                         last_coursework_date is None or week_date > last_coursework_date
                     )
                     # Any tasks left for the week should only appear on or after today.
                     and week_date >= today
                 ):
-                    course_schedule_item["task"] = course_tasks.pop()
+                    task_slots[course.id].append(course_schedule_item)
             course_schedules.append(course_schedule)
-        return {"student": self, "courses": course_schedules}
+        return WeekSchedulePlan(
+            schedule={"student": self, "courses": course_schedules},
+            task_windows=task_windows,
+            task_slots=task_slots,
+        )
 
-    def _build_course_tasks(
+    def _get_week_task_windows(
         self,
-        course,
+        courses,
         school_year,
-        completed_task_ids,
         today,
         week_start_date,
         week_end_date,
         task_limit,
     ):
-        """Build a list of course tasks that can be added to the schedule.
-
-        The tasks are returned in reverse order so they can be popped
-        like a stack for performance.
-        """
-        course_tasks: list = []
+        """Get the windows of the course tasks that can be added to the schedule."""
         # Only show tasks on current or future weeks.
         if week_end_date < today:
-            return course_tasks
+            return {}
 
-        task_index = self._get_course_task_index(
-            course, today, week_start_date, school_year
+        unfinished_coursework_counts = self._get_unfinished_coursework_counts(
+            courses, today, week_start_date, school_year
         )
+        return {
+            course: (
+                self._get_course_task_index(
+                    course,
+                    today,
+                    week_start_date,
+                    school_year,
+                    unfinished_coursework_counts,
+                ),
+                task_limit,
+            )
+            for course in courses
+        }
+
+    def get_tasks_in_windows(self, task_windows):
+        """Get a window of incomplete tasks for multiple courses.
 
-        # Doing this query in a loop is definitely an N+1 bug.
-        # If it's possible to do a single query of all tasks
-        # that groups by course then that would be better.
-        # No need to over-optimize until that's a real issue.
-        # I brought this up on the forum. It doesn't look like it's easy to fix.
-        # https://forum.djangoproject.com/t/grouping-by-foreignkey-with-a-limit-per-group/979
-        course_tasks = list(
-            self.get_tasks_for(course).exclude(id__in=completed_task_ids)[
-                task_index : task_index + task_limit
-            ]
+        task_windows maps a course to an (offset, limit) pair
+        that slices the course's incomplete tasks.
+        """
+        return Student.get_students_tasks_in_windows({self: task_windows})[self.id]
+
+    @classmethod
+    def get_students_tasks_in_windows(
+        cls, task_windows_by_student, incomplete_task_filters=None
+    ):
+        """Get windows of incomplete tasks for multiple students and courses.
+
+        task_windows_by_student maps a student to their task windows
+        like the ones for get_tasks_in_windows.
+        incomplete_task_filters maps a student id then a course id
+        to a filter of the incomplete tasks.
+        When not provided, the filters come from the students' course progress.
+        The tasks are keyed by student id then by course id.
+
+        Every window is fetched in a single query.
+        The tasks are joined to the enrollment of each student
+        so that they can be numbered within each student and course
+        and filtered on that row number.
+        """
+        from homeschool.courses.models import CourseTask
+
+        if incomplete_task_filters is None:
+            incomplete_task_filters = StudentCourseProgress.get_incomplete_task_filters(
+                list(task_windows_by_student),
+                list(
+                    {
+                        course
+                        for task_windows in task_windows_by_student.values()
+                        for course in task_windows
+                    }
+                ),
+            )
+
+        tasks_by_student: dict = {}
+        tasks_filter = Q()
+        window_filter = Q()
+        for student, task_windows in task_windows_by_student.items():
+            tasks_by_student[student.id] = {course.id: [] for course in task_windows}
+            for course, (offset, limit) in task_windows.items():
+                enrollment = student._get_enrollment_for(course)
+                if not enrollment:
+                    continue
+                tasks_filter |= (
+                    Q(course=course, course__grade_levels__enrollments=enrollment)
+                    & (
+                        Q(grade_level__isnull=True)
+                        | Q(grade_level=enrollment.grade_level_id)
+                    )
+                    & incomplete_task_filters[student.id][course.id]
+                )
+                window_filter |= Q(
+                    course=course,
+                    window_student_id=student.id,
+                    task_number__gt=offset,
+                    task_number__lte=offset + limit,
+                )
+
+        if not window_filter:
+            return tasks_by_student
+
+        tasks = (
+            CourseTask.objects.filter(tasks_filter)
+            .annotate(
+                window_student_id=F("course__grade_levels__enrollments__student"),
+                task_number=Window(
+                    RowNumber(),
+                    partition_by=[
+                        F("course__grade_levels__enrollments__student"),
+                        F("course"),
+                    ],
+                    order_by=F("order").asc(),
+                ),
+            )
+            .filter(window_filter)
+            .select_related("graded_work", "resource")
+            .order_by("course", "order")
         )
-        course_tasks.reverse()  # for the performance of pop below.
-        return course_tasks
+        for task in tasks:
+            tasks_by_student[task.window_student_id][task.course_id].append(task)
+        return tasks_by_student
 
     def get_active_courses(self, school_year):
         """Get the active courses from the school year."""
@@ -221,7 +315,28 @@ class Student(models.Model):
 
         return week_coursework
 
-    def _get_course_task_index(self, course, today, week_start_date, school_year):
+    def _get_unfinished_coursework_counts(
+        self, courses, today, week_start_date, school_year
+    ):
+        """Get the coursework counts that offset unfinished tasks this week.
+
+        The counts are only needed when looking at a future week
+        during the active part of the current week.
+        """
+        if week_start_date <= today:
+            return {}
+
+        last_school_day_this_week = school_year.last_school_day_for(Week(today))
+        if today > last_school_day_this_week:
+            return {}
+
+        return self.get_coursework_counts_by_course(
+            courses, today, last_school_day_this_week
+        )
+
+    def _get_course_task_index(
+        self, course, today, week_start_date, school_year, coursework_counts
+    ):
         """Get the db index of course tasks.
 
         This is based on the last completed coursework for the course.
@@ -241,12 +356,7 @@ class Student(models.Model):
             remaining_tasks = school_year.get_task_count_in_range(
                 course, today, last_school_day_this_week, self
             )
-            completed_tasks = Coursework.objects.filter(
-                student=self,
-                course_task__course=course,
-                completed_date__gte=today,
-                completed_date__lte=last_school_day_this_week,
-            ).count()
+            completed_tasks = coursework_counts.get(course.id, 0)
             unfinished_tasks_this_week = max(remaining_tasks - completed_tasks, 0)
         else:
             # On the weekend, don't count unfinished tasks and roll everything forward.
@@ -262,6 +372,23 @@ class Student(models.Model):
         )
         return unfinished_tasks_this_week + tasks_between
 
+    def get_coursework_counts_by_course(self, courses, start_date, end_date):
+        """Get the count of coursework for each course in one query.
+
+        Be inclusive of start and end date.
+        """
+        coursework_counts = (
+            Coursework.objects.filter(
+                student=self,
+                course_task__course__in=courses,
+                completed_date__range=[start_date, end_date],
+            )
+            .values("course_task__course")
+            .annotate(coursework_count=Count("id"))
+            .values_list("course_task__course", "coursework_count")
+        )
+        return dict(coursework_counts)
+
     def get_last_coursework_date(
         self, week_coursework: dict, course: Course
     ) -> datetime.date | None:
@@ -296,6 +423,16 @@ class Student(models.Model):
 
         This includes any general or grade level specific task.
         """
+        enrollment = self._get_enrollment_for(course)
+        if enrollment:
+            return course.course_tasks.filter(
+                Q(grade_level__isnull=True) | Q(grade_level=enrollment.grade_level)
+            ).select_related("resource")
+        else:
+            return course.course_tasks.none()
+
+    def _get_enrollment_for(self, course):
+        """Get the enrollment that connects the student to the course."""
         enrollment = self._enrollment_by_course_cache.get(course)
         if not enrollment:
             enrollment = (
@@ -305,12 +442,7 @@ class Student(models.Model):
                 .select_related("grade_level")
                 .first()
             )
-        if enrollment:
-            return course.course_tasks.filter(
-                Q(grade_level__isnull=True) | Q(grade_level=enrollment.grade_level)
-            ).select_related("resource")
-        else:
-            return course.course_tasks.none()
+        return enrollment
 
     def get_incomplete_task_count_in_range(
         self, course, start_date, end_date, school_year
@@ -397,3 +529,229 @@ class Grade(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     graded_work = models.ForeignKey("courses.GradedWork", on_delete=models.CASCADE)
     score = models.PositiveIntegerField(default=0)
+
+
+class StudentCourseProgress(models.Model):
+    """A student's progress through a course
+
+    The progress is derived from the student's coursework and the course's tasks.
+    It is kept up to date as either changes so that schedules can find
+    the incomplete tasks without excluding every completed task.
+    A student with no progress for a course has not completed any of its tasks.
+    """
+
+    class Meta:
+        verbose_name_plural = "student course progress"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "course"], name="progress_per_student_course"
+            )
+        ]
+
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="course_progress"
+    )
+    course = models.ForeignKey(
+        "courses.Course", on_delete=models.CASCADE, related_name="+"
+    )
+    completed_count = models.PositiveIntegerField(default=0)
+    last_completed_date = models.DateField(null=True, blank=True)
+    last_task_order = models.PositiveIntegerField(null=True, blank=True)
+    next_task = models.ForeignKey(
+        "courses.CourseTask",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+
+    @property
+    def is_in_order(self) -> bool:
+        """Check if the tasks were completed in order.
+
+        When they were, every task after the last completed task is incomplete.
+        """
+        return (
+            self.next_task is None
+            or self.last_task_order is None
+            or self.next_task.order > self.last_task_order
+        )
+
+    @classmethod
+    def refresh(cls, student_id, course_id, *, create: bool = True) -> None:
+        """Recompute the progress from the coursework and tasks of the course.
+
+        Set create to False to only update existing progress.
+        """
+        from homeschool.courses.models import CourseTask
+
+        summary = Coursework.objects.filter(
+            student=student_id, course_task__course=course_id
+        ).aggregate(
+            completed_count=Count("id"),
+            last_completed_date=Max("completed_date"),
+            last_task_order=Max("course_task__order"),
+        )
+        enrollment = Enrollment.objects.filter(
+            student=student_id, grade_level__courses=course_id
+        ).first()
+        next_task = None
+        if enrollment:
+            next_task = (
+                CourseTask.objects.filter(course=course_id)
+                .filter(
+                    Q(grade_level__isnull=True)
+                    | Q(grade_level=enrollment.grade_level_id)
+                )
+                .incomplete_for(student_id)
+                .order_by("order")
+                .first()
+            )
+        fields = {**summary, "next_task": next_task}
+
+        if create:
+            cls.objects.update_or_create(
+                student_id=student_id, course_id=course_id, defaults=fields
+            )
+        else:
+            cls.objects.filter(student=student_id, course=course_id).update(**fields)
+
+    @classmethod
+    def refresh_course(cls, course_id) -> None:
+        """Recompute the progress of every student in the course."""
+        for student_id in cls.objects.filter(course=course_id).values_list(
+            "student_id", flat=True
+        ):
+            cls.refresh(student_id, course_id, create=False)
+
+    @classmethod
+    def get_incomplete_task_filters(
+        cls, students: list[Student], courses: list[Course]
+    ) -> dict:
+        """Get the filters that select the incomplete tasks of each course.
+
+        The filters are keyed by student id then by course id.
+        When tasks were completed in order, the filter is a range of task order.
+        Only the courses with tasks completed out of order
+        need to check for the student's coursework.
+        """
+        from homeschool.courses.models import CourseTask
+
+        filters: dict = {
+            student.id: {course.id: Q() for course in courses} for student in students
+        }
+        for progress in cls.objects.filter(
+            student__in=students, course__in=courses
+        ).select_related("next_task"):
+            if not progress.is_in_order:
+                filters[progress.student_id][progress.course_id] = Q(
+                    CourseTask.get_incomplete_condition(progress.student_id)
+                )
+            elif progress.last_task_order is not None:
+                filters[progress.student_id][progress.course_id] = Q(
+                    order__gt=progress.last_task_order
+                )
+        return filters
+
+
+@receiver(post_save, sender=Coursework)
+def update_progress_for_coursework(sender, instance, raw, **kwargs):
+    """Completed work changes the student's progress."""
+    if not raw:
+        StudentCourseProgress.refresh(
+            instance.student_id, instance.course_task.course_id
+        )
+
+
+class _ProgressRefresh:
+    """The progress to refresh when the current transaction commits.
+
+    A delete can cascade to many tasks and coursework.
+    Collecting the changes refreshes each student's progress in a course once
+    instead of once for every deleted row.
+    """
+
+    def __init__(self) -> None:
+        self.course_ids: set = set()
+        self.student_course_ids: set[tuple] = set()
+
+    @classmethod
+    def add(cls, course_id, student_id=None) -> None:
+        """Refresh a course for a student or for every student on commit."""
+        connection = transaction.get_connection()
+        pending = [
+            callback
+            for _, callback, _ in connection.run_on_commit
+            if isinstance(callback, cls)
+        ]
+        refresh = pending[0] if pending else cls()
+        if student_id is None:
+            refresh.course_ids.add(course_id)
+        else:
+            refresh.student_course_ids.add((student_id, course_id))
+        if not pending:
+            # Outside of a transaction, this refreshes immediately.
+            transaction.on_commit(refresh)
+
+    def __call__(self) -> None:
+        course_ids = self.course_ids | {
+            course_id for _, course_id in self.student_course_ids
+        }
+        # Only existing progress is refreshed so progress that was deleted
+        # along with its student or course is skipped.
+        for student_id, course_id in StudentCourseProgress.objects.filter(
+            course__in=course_ids
+        ).values_list("student_id", "course_id"):
+            if (
+                course_id in self.course_ids
+                or (student_id, course_id) in self.student_course_ids
+            ):
+                StudentCourseProgress.refresh(student_id, course_id, create=False)
+
+
+def _is_deleted_from(origin, *labels: str) -> bool:
+    """Check if a delete started from an instance or queryset of the models."""
+    model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    meta = getattr(model, "_meta", None)
+    return meta is not None and meta.label in labels
+
+
+@receiver(post_delete, sender=Coursework)
+def update_progress_for_deleted_coursework(sender, instance, origin=None, **kwargs):
+    """Removed work changes the student's progress.
+
+    The progress is deleted along with a course or student,
+    and a deleted task refreshes the progress of its whole course.
+    """
+    if not _is_deleted_from(
+        origin, "courses.Course", "courses.CourseTask", "students.Student"
+    ):
+        _ProgressRefresh.add(instance.course_task.course_id, instance.student_id)
+
+
+@receiver(post_save, sender="courses.CourseTask")
+def update_progress_for_course_task(sender, instance, raw, **kwargs):
+    """Adding or moving tasks changes the next task."""
+    if not raw:
+        StudentCourseProgress.refresh_course(instance.course_id)
+
+
+@receiver(post_delete, sender="courses.CourseTask")
+def update_progress_for_deleted_course_task(sender, instance, origin=None, **kwargs):
+    """Removing tasks changes the next task.
+
+    The remaining tasks are renumbered after the delete,
+    so the progress is refreshed when the delete commits.
+    """
+    if not _is_deleted_from(origin, "courses.Course"):
+        _ProgressRefresh.add(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def update_progress_for_enrollment(sender, instance, raw=False, origin=None, **kwargs):
+    """The grade level of a student decides which tasks are next."""
+    if not raw and not _is_deleted_from(origin, "students.Student"):
+        for course_id in StudentCourseProgress.objects.filter(
+            student=instance.student_id
+        ).values_list("course_id", flat=True):
+            StudentCourseProgress.refresh(instance.student_id, course_id, create=False)
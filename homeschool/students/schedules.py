@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from django.db.models import Count
+
+from .models import Coursework, Enrollment, Student, StudentCourseProgress
+
+if TYPE_CHECKING:  # pragma: no cover
+    from homeschool.schools.models import SchoolYear
+
+
+class DailyScheduleBuilder:
+    """Build the daily schedules for the students of a school year.
+
+    The data for every student is loaded in batches
+    so the number of queries doesn't grow as students or courses are added.
+    """
+
+    def __init__(
+        self, school_year: SchoolYear, today: datetime.date, day: datetime.date
+    ):
+        self.school_year = school_year
+        self.today = today
+        self.day = day
+
+    def build(self, students: list[Student]) -> list[dict]:
+        """Build the schedule for each student."""
+        schedules: list[dict] = []
+        scheduled_students = []
+        for student in students:
+            is_break = self.school_year.is_break(self.day, student=student)
+            schedules.append({"student": student, "courses": [], "is_break": is_break})
+            if not is_break:
+                scheduled_students.append(student)
+
+        if not scheduled_students:
+            return schedules
+
+        courses_by_student = self._get_courses_by_student(scheduled_students)
+        all_courses = {
+            course for courses in courses_by_student.values() for course in courses
+        }
+        day_coursework = self._get_day_coursework(scheduled_students)
+        incomplete_task_filters = StudentCourseProgress.get_incomplete_task_filters(
+            scheduled_students, list(all_courses)
+        )
+        coursework_counts = self._get_coursework_counts(scheduled_students, all_courses)
+
+        task_windows_by_student: dict = {}
+        for schedule in schedules:
+            student = schedule["student"]
+            if schedule["is_break"]:
+                continue
+
+            task_windows = task_windows_by_student[student] = {}
+            for course in courses_by_student[student]:
+                course_schedule = {"course": course}
+                if course.id in day_coursework[student.id]:
+                    course_schedule["coursework"] = day_coursework[student.id][
+                        course.id
+                    ]
+                elif course.runs_on(self.day):
+                    task_windows[course] = (
+                        self._get_task_index(
+                            student, course, coursework_counts[student.id]
+                        ),
+                        1,
+                    )
+                schedule["courses"].append(course_schedule)
+
+        tasks_by_student = Student.get_students_tasks_in_windows(
+            task_windows_by_student, incomplete_task_filters
+        )
+        for schedule in schedules:
+            student = schedule["student"]
+            if schedule["is_break"]:
+                continue
+
+            task_windows = task_windows_by_student[student]
+            for course_schedule in schedule["courses"]:
+                course = course_schedule["course"]
+                if course not in task_windows:
+                    continue
+                if tasks_by_student[student.id][course.id]:
+                    course_schedule["task"] = tasks_by_student[student.id][course.id][0]
+                else:
+                    course_schedule["no_scheduled_task"] = True
+
+        return schedules
+
+    def _get_courses_by_student(self, students):
+        """Get the active courses for each student.
+
+        The enrollment is cached on the student for any later task lookups.
+        """
+        enrollments = Enrollment.objects.filter(
+            student__in=students, grade_level__school_year=self.school_year
+        ).select_related("grade_level")
+        enrollment_by_student_id = {
+            enrollment.student_id: enrollment for enrollment in enrollments
+        }
+
+        courses_by_grade_level: dict = {}
+        courses_by_student: dict = {}
+        for student in students:
+            enrollment = enrollment_by_student_id.get(student.id)
+            if not enrollment:
+                courses_by_student[student] = []
+                continue
+
+            grade_level = enrollment.grade_level
+            grade_level.school_year = self.school_year
+            if grade_level.id not in courses_by_grade_level:
+                courses_by_grade_level[grade_level.id] = (
+                    grade_level.get_active_courses()
+                )
+            courses = courses_by_grade_level[grade_level.id]
+            student._enrollment_by_course_cache.update(
+                {course: enrollment for course in courses}
+            )
+            courses_by_student[student] = courses
+        return courses_by_student
+
+    def _get_day_coursework(self, students):
+        """Get the coursework completed on the day keyed by student then course."""
+        day_coursework: dict = {student.id: defaultdict(list) for student in students}
+        coursework_qs = (
+            Coursework.objects.filter(student__in=students, completed_date=self.day)
+            .order_by("course_task__id")
+            .select_related("course_task")
+        )
+        for coursework in coursework_qs:
+            day_coursework[coursework.student_id][
+                coursework.course_task.course_id
+            ].append(coursework)
+        return day_coursework
+
+    def _get_coursework_counts(self, students, courses):
+        """Get the count of coursework from today to the day.
+
+        The counts are keyed by student then course.
+        """
+        coursework_counts: dict = {student.id: {} for student in students}
+        counts = (
+            Coursework.objects.filter(
+                student__in=students,
+                course_task__course__in=courses,
+                completed_date__range=[self.today, self.day],
+            )
+            .values("student", "course_task__course")
+            .annotate(coursework_count=Count("id"))
+            .values_list("student", "course_task__course", "coursework_count")
+        )
+        for student_id, course_id, count in counts:
+            coursework_counts[student_id][course_id] = count
+        return coursework_counts
+
+    def _get_task_index(self, student, course, coursework_counts):
+        """Get the index of the day's task among the incomplete tasks."""
+        task_count = self.school_year.get_task_count_in_range(
+            course, self.today, self.day, student
+        )
+        incomplete_task_count = task_count - coursework_counts.get(course.id, 0)
+        return max(incomplete_task_count - 1, 0)
+
+
+@dataclass
+class WeekSchedulePlan:
+    """A student's week schedule that is waiting for its tasks.
+
+    The task slots are the schedule days of each course that get the next task
+    in the order of the days.
+    """
+
+    schedule: dict
+    task_windows: dict
+    task_slots: dict
+
+    def fill(self, tasks_by_course: dict) -> dict:
+        """Put the tasks of each course into the schedule."""
+        for course_id, course_schedule_items in self.task_slots.items():
+            tasks = tasks_by_course.get(course_id, [])
+            for course_schedule_item, task in zip(
+                course_schedule_items, tasks, strict=False
+            ):
+                course_schedule_item["task"] = task
+        return self.schedule
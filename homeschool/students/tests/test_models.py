@@ -1,13 +1,15 @@
 import datetime
+from unittest import mock
 
 import pytest
 import time_machine
 from dateutil.relativedelta import MO, SA, SU, relativedelta
 from django.db import IntegrityError
+from django.db.models import Q
 from django.utils import timezone
 
 from homeschool.core.schedules import Week
-from homeschool.courses.models import Course
+from homeschool.courses.models import Course, CourseTask
 from homeschool.courses.tests.factories import (
     CourseFactory,
     CourseTaskFactory,
@@ -20,7 +22,7 @@ from homeschool.schools.tests.factories import (
     SchoolFactory,
     SchoolYearFactory,
 )
-from homeschool.students.models import Enrollment
+from homeschool.students.models import Enrollment, StudentCourseProgress
 from homeschool.students.tests.factories import (
     CourseworkFactory,
     EnrollmentFactory,
@@ -242,6 +244,81 @@ class TestStudent(TestCase):
 
         assert list(course_tasks) == []
 
+    def test_get_tasks_in_windows(self):
+        """The student can get a window of incomplete tasks for many courses."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        other_grade_level = GradeLevelFactory(
+            school_year=enrollment.grade_level.school_year
+        )
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        complete_task = CourseTaskFactory(course=course)
+        CourseworkFactory(student=student, course_task=complete_task)
+        CourseTaskFactory(course=course)
+        task_1 = CourseTaskFactory(course=course)
+        CourseTaskFactory(course=course, grade_level=other_grade_level)
+        task_2 = CourseTaskFactory(course=course, grade_level=enrollment.grade_level)
+        CourseTaskFactory(course=course)
+        other_course = CourseFactory(grade_levels=[enrollment.grade_level])
+        other_task = CourseTaskFactory(course=other_course)
+        CourseTaskFactory(course=other_course)
+        task_windows = {course: (1, 2), other_course: (0, 1)}
+
+        # The queries are the progress, two enrollments, and the tasks.
+        with self.assertNumQueries(4):
+            tasks_by_course = student.get_tasks_in_windows(task_windows)
+
+        assert tasks_by_course == {
+            course.id: [task_1, task_2],
+            other_course.id: [other_task],
+        }
+
+    def test_get_tasks_in_windows_unenrolled(self):
+        """An unenrolled student has no tasks in any window."""
+        student = StudentFactory()
+        course_task = CourseTaskFactory()
+
+        tasks_by_course = student.get_tasks_in_windows({course_task.course: (0, 5)})
+
+        assert tasks_by_course == {course_task.course.id: []}
+
+    def test_get_tasks_in_windows_out_of_order(self):
+        """Tasks completed out of order are still excluded from the window."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task_1 = CourseTaskFactory(course=course)
+        task_2 = CourseTaskFactory(course=course)
+        task_3 = CourseTaskFactory(course=course)
+        task_4 = CourseTaskFactory(course=course)
+        CourseworkFactory(student=student, course_task=task_2)
+
+        tasks_by_course = student.get_tasks_in_windows({course: (0, 3)})
+
+        assert tasks_by_course == {course.id: [task_1, task_3, task_4]}
+
+    def test_get_coursework_counts_by_course(self):
+        """The student can get coursework counts for many courses at once."""
+        student = StudentFactory()
+        today = timezone.localdate()
+        coursework = CourseworkFactory(student=student, completed_date=today)
+        course = coursework.course_task.course
+        CourseworkFactory(
+            student=student, course_task__course=course, completed_date=today
+        )
+        CourseworkFactory(
+            student=student,
+            course_task__course=course,
+            completed_date=today + datetime.timedelta(days=2),
+        )
+        other_course = CourseFactory()
+
+        counts = student.get_coursework_counts_by_course(
+            [course, other_course], today, today + datetime.timedelta(days=1)
+        )
+
+        assert counts == {course.id: 2}
+
     def test_get_incomplete_task_count_in_range(self):
         """The student can get the count of incomplete tasks for a course."""
         enrollment = EnrollmentFactory(
@@ -351,3 +428,128 @@ class TestGrade(TestCase):
         grade = GradeFactory(score=score)
 
         assert grade.score == score
+
+
+class TestStudentCourseProgress(TestCase):
+    def make_course(self, task_count=3):
+        enrollment = EnrollmentFactory()
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        tasks = [CourseTaskFactory(course=course) for _ in range(task_count)]
+        return enrollment.student, course, tasks
+
+    def test_coursework_creates_progress(self):
+        """Completing a task records the student's progress."""
+        student, course, tasks = self.make_course()
+        today = timezone.localdate()
+
+        CourseworkFactory(student=student, course_task=tasks[0], completed_date=today)
+
+        progress = StudentCourseProgress.objects.get(student=student, course=course)
+        assert progress.completed_count == 1
+        assert progress.last_completed_date == today
+        assert progress.last_task_order == tasks[0].order
+        assert progress.next_task == tasks[1]
+        assert progress.is_in_order
+
+    def test_out_of_order(self):
+        """Skipping a task is not in order."""
+        student, course, tasks = self.make_course()
+
+        CourseworkFactory(student=student, course_task=tasks[1])
+
+        progress = StudentCourseProgress.objects.get(student=student, course=course)
+        assert progress.next_task == tasks[0]
+        assert not progress.is_in_order
+
+    def test_deleted_coursework_updates_progress(self):
+        """Removing coursework rolls back the progress."""
+        student, course, tasks = self.make_course()
+        CourseworkFactory(student=student, course_task=tasks[0])
+        coursework = CourseworkFactory(student=student, course_task=tasks[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            coursework.delete()
+
+        progress = StudentCourseProgress.objects.get(student=student, course=course)
+        assert progress.completed_count == 1
+        assert progress.next_task == tasks[1]
+
+    def test_new_task_updates_progress(self):
+        """A new task becomes the next task after all work is done."""
+        student, course, tasks = self.make_course(task_count=1)
+        CourseworkFactory(student=student, course_task=tasks[0])
+        progress = StudentCourseProgress.objects.get(student=student, course=course)
+        assert progress.next_task is None
+
+        task = CourseTaskFactory(course=course)
+
+        progress.refresh_from_db()
+        assert progress.next_task == task
+
+    def test_deleted_task_updates_progress(self):
+        """Removing a task refreshes the progress once for each student."""
+        student, course, tasks = self.make_course()
+        other_enrollment = EnrollmentFactory(grade_level=course.grade_levels.get())
+        for task in tasks[:2]:
+            CourseworkFactory(student=student, course_task=task)
+            CourseworkFactory(student=other_enrollment.student, course_task=task)
+
+        with (
+            mock.patch.object(
+                StudentCourseProgress,
+                "refresh",
+                wraps=StudentCourseProgress.refresh,
+            ) as refresh,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            CourseTask.objects.filter(id__in=[tasks[0].id, tasks[1].id]).delete()
+
+        assert refresh.call_count == 2
+        progress = StudentCourseProgress.objects.get(student=student, course=course)
+        assert progress.completed_count == 0
+        assert progress.next_task == tasks[2]
+
+    def test_delete_course_queries(self):
+        """Deleting a course does not refresh the progress of its coursework.
+
+        The remaining queries are the delete itself and reordering the tasks.
+        """
+        student, course, tasks = self.make_course(task_count=10)
+        other_enrollment = EnrollmentFactory(grade_level=course.grade_levels.get())
+        for task in tasks:
+            CourseworkFactory(student=student, course_task=task)
+            CourseworkFactory(student=other_enrollment.student, course_task=task)
+
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(22):
+            course.delete()
+
+        assert not StudentCourseProgress.objects.exists()
+
+    def test_enrollment_updates_progress(self):
+        """A student without an enrollment has no next task."""
+        student, course, tasks = self.make_course()
+        CourseworkFactory(student=student, course_task=tasks[0])
+
+        student.enrollments.all().delete()
+
+        progress = StudentCourseProgress.objects.get(student=student, course=course)
+        assert progress.next_task is None
+        assert progress.completed_count == 1
+
+    def test_get_incomplete_task_filters(self):
+        """In order progress filters by task order and other progress by coursework."""
+        student, course, tasks = self.make_course()
+        CourseworkFactory(student=student, course_task=tasks[0])
+        other_student, other_course, other_tasks = self.make_course()
+        CourseworkFactory(student=other_student, course_task=other_tasks[1])
+
+        filters = StudentCourseProgress.get_incomplete_task_filters(
+            [student, other_student], [course, other_course]
+        )
+
+        assert filters[student.id][course.id] == Q(order__gt=tasks[0].order)
+        assert filters[student.id][other_course.id] == Q()
+        incomplete_tasks = CourseTask.objects.filter(
+            filters[other_student.id][other_course.id], course=other_course
+        )
+        assert list(incomplete_tasks) == [other_tasks[0], other_tasks[2]]
@@ -0,0 +1,121 @@
+import datetime
+
+import time_machine
+
+from homeschool.courses.tests.factories import CourseFactory, CourseTaskFactory
+from homeschool.schools.models import SchoolYear
+from homeschool.schools.tests.factories import SchoolBreakFactory
+from homeschool.students.schedules import DailyScheduleBuilder
+from homeschool.students.tests.factories import (
+    CourseworkFactory,
+    EnrollmentFactory,
+    StudentFactory,
+)
+from homeschool.test import TestCase
+
+
+@time_machine.travel("2021-03-10")  # Wednesday
+class TestDailyScheduleBuilder(TestCase):
+    today = datetime.date(2021, 3, 10)
+
+    def test_build(self):
+        """The schedule has the coursework or the next task for each course."""
+        enrollment = EnrollmentFactory()
+        student = enrollment.student
+        school_year = enrollment.grade_level.school_year
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        task = CourseTaskFactory(course=course)
+        coursework = CourseworkFactory(
+            student=student, course_task=task, completed_date=self.today
+        )
+        other_course = CourseFactory(grade_levels=[enrollment.grade_level])
+        CourseTaskFactory(course=other_course)
+        other_task = CourseTaskFactory(course=other_course)
+        builder = DailyScheduleBuilder(
+            school_year, self.today, self.today + datetime.timedelta(days=1)
+        )
+
+        schedules = builder.build([student])
+
+        assert schedules == [
+            {
+                "student": student,
+                "is_break": False,
+                "courses": [
+                    {"course": course, "no_scheduled_task": True},
+                    {"course": other_course, "task": other_task},
+                ],
+            }
+        ]
+        builder = DailyScheduleBuilder(school_year, self.today, self.today)
+        schedules = builder.build([student])
+        assert schedules[0]["courses"][0] == {
+            "course": course,
+            "coursework": [coursework],
+        }
+
+    def test_build_break(self):
+        """A student on a break has no courses."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        SchoolBreakFactory(
+            school_year=school_year, start_date=self.today, end_date=self.today
+        )
+        builder = DailyScheduleBuilder(school_year, self.today, self.today)
+
+        schedules = builder.build([enrollment.student])
+
+        assert schedules == [
+            {"student": enrollment.student, "courses": [], "is_break": True}
+        ]
+
+    def test_build_unenrolled(self):
+        """A student that isn't enrolled has no courses."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        student = StudentFactory(school=school_year.school)
+        builder = DailyScheduleBuilder(school_year, self.today, self.today)
+
+        schedules = builder.build([student])
+
+        assert schedules == [{"student": student, "courses": [], "is_break": False}]
+
+    def test_build_queries(self):
+        """The number of queries doesn't grow as students or courses are added."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        other_enrollment = EnrollmentFactory(grade_level=enrollment.grade_level)
+        students = [enrollment.student, other_enrollment.student]
+        for _ in range(2):
+            CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        builder = DailyScheduleBuilder(school_year, self.today, self.today)
+        with self.assertNumQueries(7):
+            builder.build(students)
+
+        for _ in range(3):
+            CourseTaskFactory(course__grade_levels=[enrollment.grade_level])
+        students.append(EnrollmentFactory(grade_level=enrollment.grade_level).student)
+        school_year = SchoolYear.objects.get(id=school_year.id)
+        builder = DailyScheduleBuilder(school_year, self.today, self.today)
+        with self.assertNumQueries(7):
+            builder.build(students)
+
+    def test_build_students_windows(self):
+        """Each student gets their own next task for a shared course."""
+        enrollment = EnrollmentFactory()
+        school_year = enrollment.grade_level.school_year
+        other_enrollment = EnrollmentFactory(grade_level=enrollment.grade_level)
+        course = CourseFactory(grade_levels=[enrollment.grade_level])
+        first_task, second_task = CourseTaskFactory.create_batch(2, course=course)
+        CourseworkFactory(
+            student=enrollment.student,
+            course_task=first_task,
+            completed_date=self.today - datetime.timedelta(days=1),
+        )
+        builder = DailyScheduleBuilder(school_year, self.today, self.today)
+
+        schedules = builder.build([enrollment.student, other_enrollment.student])
+
+        assert schedules[0]["courses"] == [{"course": course, "task": second_task}]
+        assert schedules[1]["courses"] == [{"course": course, "task": first_task}]
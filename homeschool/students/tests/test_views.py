@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.contrib.messages import get_messages
 
 from homeschool.courses.tests.factories import (
@@ -378,6 +380,20 @@ class TestGradeView(TestCase):
         grade = Grade.objects.get(student=student, graded_work=graded_work)
         assert grade.score == 100
 
+    @mock.patch("homeschool.students.views.report_cache")
+    def test_grade_invalidates_reports(self, mock_report_cache):
+        """New grades replace the student's cached reports."""
+        user = self.make_user()
+        student = StudentFactory(school=user.school)
+        grade_level = GradeLevelFactory(school_year__school=user.school)
+        graded_work = GradedWorkFactory(course_task__course__grade_levels=[grade_level])
+        data = {f"graded_work-{student.id}-{graded_work.id}": "100"}
+
+        with self.login(user):
+            self.post("students:grade", data=data)
+
+        mock_report_cache.invalidate_student.assert_called_once_with(student.id)
+
     def test_grades_in_course_order(self):
         """The grades are in the course order set by the user.
 
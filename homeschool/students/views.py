@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 from denied.authorizers import any_authorized
 from denied.decorators import authorize
 from django.contrib import messages
+from django.db.models import Exists, OuterRef
 from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
 from django.template.defaultfilters import pluralize
@@ -15,6 +16,7 @@ from homeschool.core.view_helpers import flash_info
 from homeschool.courses.mixins import CourseTaskMixin
 from homeschool.courses.models import Course, GradedWork
 from homeschool.custom_typing import AuthenticatedHttpRequest
+from homeschool.reports import report_cache
 from homeschool.schools.authorizers import school_year_authorized
 from homeschool.schools.models import GradeLevel, SchoolYear
 
@@ -195,25 +197,31 @@ class GradeView(TemplateView):
         student = enrollment.student
         courses = enrollment.grade_level.get_ordered_courses()
 
-        completed_task_ids = Coursework.objects.filter(
-            student=student, course_task__course__in=courses
-        ).values_list("course_task_id", flat=True)
-
-        graded_work = GradedWork.objects.filter(
-            course_task__in=completed_task_ids
-        ).select_related("course_task", "course_task__course", "course_task__resource")
+        # Find the completed but ungraded work with correlated subqueries
+        # so the query doesn't grow with the student's coursework.
+        graded_work = (
+            GradedWork.objects.filter(course_task__course__in=courses)
+            .filter(
+                Exists(
+                    Coursework.objects.filter(
+                        student=student, course_task=OuterRef("course_task")
+                    )
+                )
+            )
+            .exclude(
+                Exists(
+                    Grade.objects.filter(student=student, graded_work=OuterRef("pk"))
+                )
+            )
+            .select_related(
+                "course_task", "course_task__course", "course_task__resource"
+            )
+        )
         # Sort the graded work based on the order of the ordered courses.
-        sorted_work = sorted(
+        return sorted(
             graded_work, key=lambda work: courses.index(work.course_task.course)
         )
 
-        already_graded_work_ids = set(
-            Grade.objects.filter(
-                student=student, graded_work__in=graded_work
-            ).values_list("graded_work_id", flat=True)
-        )
-        return [work for work in sorted_work if work.id not in already_graded_work_ids]
-
     def post(self, request, *args, **kwargs):
         self.persist_grades()
         success_url = request.GET.get("next", reverse("core:daily"))
@@ -251,6 +259,9 @@ class GradeView(TemplateView):
 
         if grades:
             grades_created = len(Grade.objects.bulk_create(grades))
+            # bulk_create skips the post_save signal that clears stale reports.
+            for student_id in {grade.student_id for grade in grades}:
+                report_cache.invalidate_student(student_id)
             message = f"Saved {grades_created} grade{pluralize(grades_created)}."
             messages.add_message(self.request, messages.SUCCESS, message)
 
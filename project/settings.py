@@ -130,6 +130,20 @@ LOGIN_URL = "/login"
 LOGIN_REDIRECT_URL = "core:dashboard"
 LOGOUT_REDIRECT_URL = "/"
 
+# Caches
+# The web process runs a single Gunicorn worker
+# so the local memory cache is shared by every request.
+# Each active student needs room for a forecast per course, a few report pages,
+# and the version tokens of the forecast and report caches.
+# A culled version token invalidates everything keyed by it,
+# so the cache is sized well beyond the Django default of 300 entries.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": env.int("CACHE_MAX_ENTRIES", 10_000)},
+    }
+}
+
 # Database
 DATABASES = {
     "default": {
@@ -252,6 +266,13 @@ ANYMAIL = {
 
 # django-hashid-field
 HASHID_FIELD_SALT = env.str("HASHID_FIELD_SALT")
+# Lazy hashids only encode when the string is needed.
+# They hash like their strings, so ids used as dict keys or in sets are still encoded.
+# The savings are for ids that are only loaded, compared, or passed to queries.
+HASHID_FIELD_LAZY = env.bool("HASHID_FIELD_LAZY", False)
+# The number of ids that each hashid codec keeps in its encode and decode caches.
+# A full codec uses about 5 MiB at this size.
+HASHID_FIELD_CACHE_SIZE = env.int("HASHID_FIELD_CACHE_SIZE", 16384)
 
 # django-hijack
 HIJACK_LOGOUT_REDIRECT_URL = "/office/users/user/"
@@ -304,6 +325,16 @@ HUEY = {
     "immediate": False,
 }
 
+# Reports
+# The number of processes that render the PDFs of a report bundle in parallel.
+REPORTS_BUNDLE_WORKERS = env.int("REPORTS_BUNDLE_WORKERS", 4)
+# The PDF renderer of each report template. Unlisted reports use "site".
+# See PDF_RENDERERS in homeschool.reports.pdfs for the available renderers.
+REPORTS_PDF_RENDERERS = {
+    "reports/attendance_report_pdf.html": "print",
+    "reports/resource_report_pdf.html": "print",
+}
+
 # Sentry
 SENTRY_ENABLED = env.bool("SENTRY_ENABLED", True)
 SENTRY_DSN = env.str("SENTRY_DSN")
@@ -27,12 +27,23 @@ STORAGES = {
     },
 }
 
+# Tests that need a cache should opt in to a fresh one
+# so that cached data never leaks between tests.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    }
+}
+
 HUEY = {
     "huey_class": "huey.SqliteHuey",
     "filename": ":memory:",
     "immediate": True,
 }
 
+# Render bundle PDFs in the test process instead of starting a process pool.
+REPORTS_BUNDLE_WORKERS = 1
+
 # Make sure that tests are never sending real emails.
 MAILERS["default"]["BACKEND"] = (  # noqa: F405
     "django.core.mail.backends.locmem.EmailBackend"